@@ -11,6 +11,7 @@ class UserAdmin(DjangoUserAdmin):
 	search_fields = ("email", "first_name", "last_name", "matricula", "departamento", "carrera")
 	fieldsets = (
 		(None, {"fields": ("email", "password", "matricula", "role")}),
+		("Contacto", {"fields": ("telefono", "contactoEmergencia")}),
 		("Permisos", {"fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions")} ),
 		("Fechas", {"fields": ("last_login", "date_joined")}),
 	)
@@ -53,4 +54,18 @@ class ReservationAdmin(admin.ModelAdmin):
 class LoanAdmin(admin.ModelAdmin):
 	list_display = ("id", "equipo", "user", "fechaPrestamo", "fechaDevolucion", "status")
 	list_filter = ("status",)
-	search_fields = ("equipo__nombre", "user__email")
\ No newline at end of file
+	search_fields = ("equipo__nombre", "user__email")
+
+
+@admin.register(models.Notificacion)
+class NotificacionAdmin(admin.ModelAdmin):
+	list_display = ("id", "user", "tipo", "objetoId", "status", "created_at", "fechaEnvio", "intentos")
+	list_filter = ("tipo", "status")
+	search_fields = ("user__email",)
+
+
+@admin.register(models.Imagen)
+class ImagenAdmin(admin.ModelAdmin):
+	list_display = ("id", "equipo", "lab", "contentType", "bytes", "status", "created_at")
+	list_filter = ("status", "contentType")
+	list_select_related = ("equipo", "lab")
@@ -0,0 +1,31 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate
+
+
+def _ensure_search_indexes(sender, using, apps, **kwargs):
+    from sistema_buap_api import search
+
+    search.ensure_search_indexes(using, apps)
+
+
+def _delete_image_files(sender, instance, **kwargs):
+    from sistema_buap_api import images
+
+    images.schedule_file_cleanup(instance)
+
+
+def _discard_from_typeahead(sender, instance, **kwargs):
+    from sistema_buap_api import typeahead
+
+    typeahead.index.discard(sender._meta.model_name, instance.pk)
+
+
+class SistemaBuapApiConfig(AppConfig):
+    name = "sistema_buap_api"
+    default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        post_migrate.connect(_ensure_search_indexes, sender=self)
+        for model_name in ("equipo", "lab"):
+            post_delete.connect(_discard_from_typeahead, sender=self.get_model(model_name))
+        post_delete.connect(_delete_image_files, sender=self.get_model("imagen"))
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework.views import APIView
+
+from sistema_buap_api.middleware.metrics import track_queries
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def db_executor():
+    """Pool de hilos para el trabajo bloqueante de las vistas async (ASYNC_DB_THREADS)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ASYNC_DB_THREADS", 16),
+                    thread_name_prefix="async-db",
+                )
+    return _executor
+
+
+def _with_connections(func, *args, **kwargs):
+    # Los hilos del pool no reciben request_started/request_finished: se
+    # aplican aquí CONN_MAX_AGE, las verificaciones y la devolución al pool.
+    close_old_connections()
+    try:
+        with track_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Ejecuta `func` (ORM, SMTP, almacenamiento) en el pool sin bloquear el event loop."""
+    return await sync_to_async(_with_connections, thread_sensitive=False, executor=db_executor())(
+        func, *args, **kwargs
+    )
+
+
+class AsyncAPIView(APIView):
+    """APIView con handlers `async def`.
+
+    Autenticación, permisos y throttling de DRF son síncronos y pueden
+    consultar la base, igual que el ORM: todo eso pasa por `self.sync()`.
+    Bajo ASGI `sync()` usa el pool de `db_executor()` y el event loop queda
+    libre para otras conexiones; bajo WSGI corre en el hilo de la petición,
+    como cualquier vista síncrona.
+    """
+
+    async def sync(self, func, *args, **kwargs):
+        if isinstance(self.request._request, ASGIRequest):
+            return await run_blocking(func, *args, **kwargs)
+        return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.sync(self.initial, request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,45 @@
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+
+from sistema_buap_api import models
+
+
+ACTIVE_RESERVATION_STATUSES = (
+    models.Reservacion.ReservacionStatus.PENDIENTE,
+    models.Reservacion.ReservacionStatus.APROBADO,
+)
+
+
+def overlapping_reservations(lab, fecha, horaInicio, horaFin, exclude_pk=None):
+    overlaps = models.Reservacion.objects.filter(lab=lab, fecha=fecha, status__in=ACTIVE_RESERVATION_STATUSES)
+    if exclude_pk is not None:
+        overlaps = overlaps.exclude(pk=exclude_pk)
+    return overlaps.filter(Q(horaInicio__lt=horaFin) & Q(horaFin__gt=horaInicio))
+
+
+def lab_availability(lab_id, fecha, horaInicio=None, horaFin=None):
+    """Horarios ocupados de un laboratorio en una fecha y, si se da el rango, si está libre."""
+    lab = get_object_or_404(models.Lab.objects.only("id", "status"), pk=lab_id)
+    ocupado = list(
+        models.Reservacion.objects.filter(lab=lab, fecha=fecha, status__in=ACTIVE_RESERVATION_STATUSES)
+        .order_by("horaInicio")
+        .values("horaInicio", "horaFin", "status")
+    )
+    activo = lab.status == models.Lab.LabStatus.ACTIVO
+    disponible = activo
+    if horaInicio is not None and horaFin is not None:
+        disponible = activo and not any(
+            slot["horaInicio"] < horaFin and slot["horaFin"] > horaInicio for slot in ocupado
+        )
+    return {"lab": lab.id, "fecha": fecha, "activo": activo, "disponible": disponible, "ocupado": ocupado}
+
+
+def equipment_availability(equipo_id, cantidad=1):
+    equipo = get_object_or_404(models.Equipo.objects.only("id", "status", "cantidadDisponible"), pk=equipo_id)
+    return {
+        "equipo": equipo.id,
+        "status": equipo.status,
+        "cantidadDisponible": equipo.cantidadDisponible,
+        "cantidadSolicitada": cantidad,
+        "disponible": equipo.status == models.Equipo.EquipoStatus.DISPONIBLE and equipo.cantidadDisponible >= cantidad,
+    }
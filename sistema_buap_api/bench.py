@@ -0,0 +1,48 @@
+import math
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Resumen en milisegundos de una lista de duraciones en segundos."""
+    count = len(samples)
+    return {
+        "count": count,
+        "mean_ms": (sum(samples) / count * 1000) if count else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """Crea las bases de datos de prueba para que los benchmarks no toquen datos reales."""
+    setup_test_environment()
+    old_names = []
+    try:
+        for alias in connections:
+            connection = connections[alias]
+            if connection.settings_dict.get("TEST", {}).get("MIRROR"):
+                continue
+            old_names.append((connection, connection.settings_dict["NAME"]))
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False)
+        for alias in connections:
+            mirror = connections[alias].settings_dict.get("TEST", {}).get("MIRROR")
+            if mirror:
+                connections[alias].creation.set_as_test_mirror(connections[mirror].settings_dict)
+        yield
+    finally:
+        for connection, old_name in reversed(old_names):
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
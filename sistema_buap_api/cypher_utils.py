@@ -1,28 +1,106 @@
 import base64
-from cryptography.fernet import Fernet, InvalidToken
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Sal e iteraciones con las que se cifró desde el principio; siguen siendo el
+# valor por defecto de CRYPTO_SALT y CRYPTO_KDF_ITERATIONS.
+LEGACY_SALT = b'hdjk'
+LEGACY_ITERATIONS = 1000
+
+
+@lru_cache(maxsize=16)
+def _derive(password, salt, iterations):
+    # PBKDF2 es caro a propósito: se calcula una vez por clave y proceso, no
+    # en cada llamada. Fernet no guarda estado y se comparte entre hilos.
+    key = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iterations, backend=default_backend()).derive(password)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+@lru_cache(maxsize=4)
+def _multi_fernet(key_specs):
+    return MultiFernet([_derive(*spec) for spec in key_specs])
+
+
+def key_specs():
+    """(password, salt, iterations) de cada clave configurada; la primera es la actual.
+
+    Las de CRYPTO_PREVIOUS_PASSWORDS solo se usan para descifrar lo que aún no
+    se ha rotado (comando rotate_encryption_keys).
+    """
+    if not getattr(settings, "CRYPTO_PASSWORD", ""):
+        raise ImproperlyConfigured("Definir CRYPTO_PASSWORD para cifrar y descifrar datos.")
+    salt = getattr(settings, "CRYPTO_SALT", LEGACY_SALT.decode())
+    iterations = getattr(settings, "CRYPTO_KDF_ITERATIONS", LEGACY_ITERATIONS)
+    specs = [(settings.CRYPTO_PASSWORD.encode('utf-8'), salt.encode('utf-8'), iterations)]
+    previous_salt = getattr(settings, "CRYPTO_PREVIOUS_SALT", None) or salt
+    previous_iterations = getattr(settings, "CRYPTO_PREVIOUS_KDF_ITERATIONS", None) or iterations
+    for password in getattr(settings, "CRYPTO_PREVIOUS_PASSWORDS", ()):
+        spec = (password.encode('utf-8'), previous_salt.encode('utf-8'), previous_iterations)
+        if spec not in specs:
+            specs.append(spec)
+    return tuple(specs)
+
 
 class CypherUtils:
 
+    @staticmethod
+    def cipher():
+        """MultiFernet de las claves configuradas: cifra con la actual y descifra con cualquiera.
+
+        Queda en caché por combinación de claves, así que cambiar la
+        configuración (p. ej. override_settings) usa las claves nuevas.
+        """
+        return _multi_fernet(key_specs())
+
     @staticmethod
     def encripta(plaintext):
-        password = settings.CRYPTO_PASSWORD
-        enc_bytes =  CypherUtils.encrypt1(plaintext.encode('utf-8'), password.encode('utf-8'))
-        return enc_bytes.decode('utf-8')
+        return CypherUtils.cipher().encrypt(plaintext.encode('utf-8')).decode('utf-8')
 
     @staticmethod
     def desencripta(cyphertext):
-        password = settings.CRYPTO_PASSWORD
-        denc_bytes =  CypherUtils.decrypt1(cyphertext.encode('utf-8'), password.encode('utf-8'))
-        return denc_bytes.decode('utf-8')
+        return CypherUtils.cipher().decrypt(cyphertext.encode('utf-8')).decode('utf-8')
+
+    @staticmethod
+    def encriptaLote(plaintexts):
+        """Cifra muchos valores con una sola instancia; None se conserva como None."""
+        cipher = CypherUtils.cipher()
+        return [
+            None if value is None else cipher.encrypt(value.encode('utf-8')).decode('utf-8')
+            for value in plaintexts
+        ]
+
+    @staticmethod
+    def desencriptaLote(cyphertexts):
+        """Descifra muchos valores con una sola instancia; None se conserva como None."""
+        cipher = CypherUtils.cipher()
+        return [
+            None if value is None else cipher.decrypt(value.encode('utf-8')).decode('utf-8')
+            for value in cyphertexts
+        ]
+
+    @staticmethod
+    def esClaveActual(cyphertext):
+        """True si el token ya está cifrado con la clave actual (no necesita rotarse)."""
+        try:
+            _derive(*key_specs()[0]).decrypt(cyphertext.encode('utf-8'))
+        except InvalidToken:
+            return False
+        return True
+
+    @staticmethod
+    def rota(cyphertext):
+        """Vuelve a cifrar con la clave actual un token de cualquier clave configurada."""
+        return CypherUtils.cipher().rotate(cyphertext.encode('utf-8')).decode('utf-8')
 
     @staticmethod
-    def cipherFernet(password):
-        key = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b'hdjk', iterations=1000, backend=default_backend()).derive(password)
-        return Fernet(base64.urlsafe_b64encode(key))
+    def cipherFernet(password, salt=LEGACY_SALT, iterations=LEGACY_ITERATIONS):
+        return _derive(password, salt, iterations)
 
     @staticmethod
     def encrypt1(plaintext, password):
@@ -30,4 +108,4 @@ class CypherUtils:
 
     @staticmethod
     def decrypt1(ciphertext, password):
-        return CypherUtils.cipherFernet(password).decrypt(ciphertext)
\ No newline at end of file
+        return CypherUtils.cipherFernet(password).decrypt(ciphertext)
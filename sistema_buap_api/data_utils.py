@@ -1,7 +1,3 @@
-from sistema_buap_api.models import *
-import json
-import requests
-import datetime
 import random
 import string
 
@@ -56,6 +52,14 @@ class DataUtils:
                 return "video/x-m4v"
             elif ".webm" in file_name:
                 return "video/webm"
+            elif ".jpg" in file_name or ".jpeg" in file_name:
+                return "image/jpeg"
+            elif ".png" in file_name:
+                return "image/png"
+            elif ".gif" in file_name:
+                return "image/gif"
+            elif ".webp" in file_name:
+                return "image/webp"
         else:
             return ""
 
@@ -66,6 +70,9 @@ class DataUtils:
 
     @staticmethod
     def is_url_image(image_url):
+        # requests solo se carga si se usa: no forma parte del arranque.
+        import requests
+
         image_formats = ("image/png", "image/jpeg", "image/jpg")
         r = requests.head(image_url)
         print("Content type:: "+str(r.headers["content-type"]))
@@ -0,0 +1,9 @@
+from django.db.backends.mysql import base
+
+from sistema_buap_api.db_backends.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, raw):
+        # Sin reconectar: si el servidor cerró la conexión, el pool abre otra.
+        raw.ping(False)
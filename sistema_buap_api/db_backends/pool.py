@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from sistema_buap_api import metrics
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Conexiones de la base compartidas por los hilos de un worker.
+
+    Como máximo `size` conexiones abiertas por proceso: un hilo que pide
+    conexión con todas ocupadas espera hasta `timeout` segundos. Antes de
+    entregar una conexión reutilizada se comprueba con `ping`; las que fallan
+    o pasan de `recycle` segundos se cierran y se abre otra.
+    """
+
+    def __init__(self, alias, size, timeout=10, recycle=300):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self.in_use = 0
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def checkout(self, connect, ping):
+        """Devuelve (conexión, instante de creación)."""
+        if not self._slots.acquire(blocking=False):
+            started = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            metrics.inc("db_pool_wait_seconds_total", time.monotonic() - started, alias=self.alias)
+            if not acquired:
+                metrics.inc("db_pool_timeouts_total", alias=self.alias)
+                raise PoolTimeout(f"Sin conexiones libres en el pool de '{self.alias}' tras {self.timeout} s.")
+        try:
+            raw, born = self._reuse(ping)
+            if raw is None:
+                raw, born = connect(), time.monotonic()
+                metrics.inc("db_pool_checkouts_total", alias=self.alias, result="created")
+            else:
+                metrics.inc("db_pool_checkouts_total", alias=self.alias, result="reused")
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return raw, born
+
+    def _reuse(self, ping):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None, None
+                # LIFO: la conexión usada más recientemente es la que menos
+                # probablemente cerró el servidor por inactividad.
+                raw, born = self._idle.pop()
+            if self.recycle and time.monotonic() - born > self.recycle:
+                self._discard(raw, "recycled")
+                continue
+            try:
+                ping(raw)
+            except Exception:
+                self._discard(raw, "failed_check")
+                continue
+            return raw, born
+
+    def checkin(self, raw, born, reusable=True):
+        with self._lock:
+            self.in_use -= 1
+            keep = reusable and len(self._idle) < self.size
+            if keep:
+                self._idle.append((raw, born))
+        if not keep:
+            self._discard(raw, "released" if reusable else "broken")
+        self._slots.release()
+
+    def _discard(self, raw, reason):
+        metrics.inc("db_pool_discarded_total", alias=self.alias, reason=reason)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _ in idle:
+            self._discard(raw, "released")
+
+
+# Un pool por base de datos destino: si cambia NAME (p. ej. la base de pruebas)
+# las conexiones a la base anterior no se reutilizan.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    options = settings_dict.get("POOL") or {}
+    if not options.get("SIZE"):
+        return None
+    key = (alias, *(settings_dict.get(name) for name in ("NAME", "USER", "HOST", "PORT")))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    alias,
+                    options["SIZE"],
+                    timeout=options.get("TIMEOUT", 10),
+                    recycle=options.get("RECYCLE", 300),
+                )
+    return pool
+
+
+def pool_stats():
+    return [
+        {"alias": pool.alias, "size": pool.size, "in_use": pool.in_use, "idle": pool.idle}
+        for pool in list(_pools.values())
+    ]
+
+
+def _collect():
+    samples = []
+    for stats in pool_stats():
+        labels = {"alias": stats["alias"]}
+        samples.append(("db_pool_size", labels, stats["size"]))
+        samples.append(("db_pool_connections", {**labels, "state": "in_use"}, stats["in_use"]))
+        samples.append(("db_pool_connections", {**labels, "state": "idle"}, stats["idle"]))
+    return samples
+
+
+metrics.registry.register_collector(_collect)
+
+
+class PooledDatabaseWrapperMixin:
+    """Toma las conexiones del pool del worker en lugar de abrir una nueva.
+
+    Se activa con la clave POOL de la configuración de la base
+    (`{"SIZE": ..., "TIMEOUT": ..., "RECYCLE": ...}`); sin ella se comporta
+    como el backend original. Con pool conviene CONN_MAX_AGE = 0: al terminar
+    cada petición Django "cierra" la conexión y vuelve al pool.
+    """
+
+    _pool = None
+    _pool_born = None
+
+    def ping_connection(self, raw):
+        cursor = raw.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            raw, self._pool_born = pool.checkout(
+                partial(super().get_new_connection, conn_params), self.ping_connection
+            )
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+        self._pool = pool
+        return raw
+
+    def _close(self):
+        pool, self._pool = self._pool, None
+        if pool is None or self.connection is None:
+            return super()._close()
+        # Solo se devuelve una conexión limpia: fuera de transacción, con el
+        # autocommit original y sin errores pendientes. Las demás se cierran.
+        reusable = (
+            not self.in_atomic_block
+            and not self.errors_occurred
+            and self.autocommit == self.settings_dict["AUTOCOMMIT"]
+        )
+        pool.checkin(self.connection, self._pool_born, reusable)
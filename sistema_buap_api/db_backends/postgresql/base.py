@@ -0,0 +1,13 @@
+from django.db.backends.postgresql import base
+
+from sistema_buap_api.db_backends.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, raw):
+        if raw.closed:
+            raise self.Database.InterfaceError("La conexión está cerrada.")
+        super().ping_connection(raw)
+        if not raw.autocommit:
+            # El SELECT abrió una transacción; no se deja abierta.
+            raw.rollback()
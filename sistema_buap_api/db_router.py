@@ -0,0 +1,90 @@
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from sistema_buap_api import metrics
+
+
+# Estado de la petición actual: None fuera de una lectura segura; dentro, un
+# dict con la base elegida para toda la petición (se elige una sola vez).
+_read_state = contextvars.ContextVar("replica_read_state", default=None)
+
+# Réplicas marcadas como caídas: alias -> instante (monotonic) del próximo intento.
+_down_until = {}
+
+
+def replica_aliases():
+    return getattr(settings, "REPLICA_DATABASES", [])
+
+
+def _is_healthy(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _down_until[alias] = time.monotonic() + getattr(settings, "REPLICA_RETRY_SECONDS", 30)
+        connections[alias].close()
+        metrics.inc("db_replica_failures_total", alias=alias)
+        return False
+    _down_until.pop(alias, None)
+    return True
+
+
+def _choose_replica():
+    aliases = list(replica_aliases())
+    random.shuffle(aliases)
+    for alias in aliases:
+        if _is_healthy(alias):
+            return alias
+    if aliases:
+        metrics.inc("db_replica_fallbacks_total")
+    return DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """Envía las lecturas del bloque a una réplica sana (o al primario si no hay)."""
+    token = _read_state.set({"alias": None})
+    try:
+        yield
+    finally:
+        _read_state.reset(token)
+
+
+def pin_to_primary():
+    """A partir de aquí, el resto de la petición lee del primario."""
+    state = _read_state.get()
+    if state is not None:
+        state["alias"] = DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Lecturas a réplicas dentro de `replica_reads()`; todo lo demás al primario.
+
+    Una escritura dentro del bloque fija el resto de la petición al primario,
+    para que lo que se acaba de escribir se lea de vuelta sin retraso.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _read_state.get()
+        if state is None:
+            return None
+        if state["alias"] is None:
+            state["alias"] = _choose_replica()
+        return state["alias"]
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
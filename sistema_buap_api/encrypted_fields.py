@@ -0,0 +1,305 @@
+import hashlib
+import hmac
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldError
+from django.db import models
+from django.db.models import lookups
+
+
+class Ciphertext(str):
+    """Token Fernet tal como viene de la base, todavía sin descifrar.
+
+    `.values()` y `.values_list()` lo entregan así; en instancias de modelo el
+    descriptor lo cambia por el texto plano al primer acceso.
+    """
+
+    batch = None
+
+
+class _Batch:
+    """Tokens de un mismo campo cargados en una misma consulta.
+
+    Al leer el campo en cualquiera de las filas se descifran todas con una
+    sola instancia de MultiFernet (desencriptaLote); los campos que no se
+    leen nunca se descifran.
+    """
+
+    def __init__(self, attname, instances):
+        self.attname = attname
+        self.instances = instances
+
+    def resolve(self):
+        from sistema_buap_api.cypher_utils import CypherUtils
+
+        pending = [obj for obj in self.instances if isinstance(obj.__dict__.get(self.attname), Ciphertext)]
+        self.instances = ()
+        tokens = [obj.__dict__[self.attname] for obj in pending]
+        for obj, token, value in zip(pending, tokens, CypherUtils.desencriptaLote(tokens)):
+            _remember(obj, self.attname, token, value)
+
+
+def _remember(instance, attname, token, value):
+    # Se guarda el token junto al texto plano: si el valor no cambia, save()
+    # escribe el mismo token en lugar de volver a cifrar.
+    instance.__dict__[attname] = value
+    instance.__dict__.setdefault("_encrypted_tokens", {})[attname] = (token, value)
+
+
+class EncryptedAttribute:
+    """Descriptor de EncryptedTextField: descifra al leer, no al cargar la fila."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        attname = self.field.attname
+        if attname not in instance.__dict__:
+            # Campo diferido con .only()/.defer(), igual que DeferredAttribute.
+            instance.refresh_from_db(fields=[attname])
+        value = instance.__dict__[attname]
+        if isinstance(value, Ciphertext):
+            if value.batch is not None:
+                value.batch.resolve()
+            else:
+                from sistema_buap_api.cypher_utils import CypherUtils
+
+                _remember(instance, attname, value, CypherUtils.desencripta(value))
+            value = instance.__dict__[attname]
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class EncryptedTextField(models.TextField):
+    """Texto cifrado en reposo con CypherUtils (Fernet).
+
+    En la base queda el token; el modelo expone el texto plano. `max_length`
+    valida el texto plano (el token es más largo). Las búsquedas por
+    igualdad van por un BlindIndexField: el mismo valor cifra distinto cada
+    vez, así que comparar la columna no encuentra nada.
+    """
+
+    encrypted = True
+    descriptor_class = EncryptedAttribute
+
+    def from_db_value(self, value, expression, connection):
+        if not value:
+            return value
+        return Ciphertext(value)
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        token, plaintext = model_instance.__dict__.get("_encrypted_tokens", {}).get(self.attname, (None, None))
+        if token is not None and value == plaintext:
+            return token
+        return value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if not value:
+            return value
+        if isinstance(value, Ciphertext):
+            return str.__str__(value)
+        from sistema_buap_api.cypher_utils import CypherUtils
+
+        return CypherUtils.encripta(value)
+
+
+class _PlaintextLookupBlocked:
+    # Comparar tokens Fernet nunca coincide: mejor un error que un filtro vacío.
+    def get_prep_lookup(self):
+        if self.lookup_name == "exact" and self.rhs in ("", None):
+            return super().get_prep_lookup()
+        raise FieldError(
+            f"{self.lhs.target.name} está cifrado y no admite __{self.lookup_name}; "
+            "para igualdad usa filter_blind() con su BlindIndexField."
+        )
+
+
+for _lookup in (
+    lookups.Exact, lookups.IExact, lookups.Contains, lookups.IContains, lookups.StartsWith,
+    lookups.IStartsWith, lookups.EndsWith, lookups.IEndsWith, lookups.In, lookups.GreaterThan,
+    lookups.GreaterThanOrEqual, lookups.LessThan, lookups.LessThanOrEqual, lookups.Regex, lookups.IRegex,
+):
+    EncryptedTextField.register_lookup(type(_lookup.__name__, (_PlaintextLookupBlocked, _lookup), {}))
+
+
+def digits(value):
+    """Normalización para teléfonos: solo los dígitos."""
+    return re.sub(r"\D", "", value)
+
+
+@lru_cache(maxsize=4)
+def _derived_index_key(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password, salt + b"|blind-index", iterations)
+
+
+def blind_index_key():
+    # CRYPTO_BLIND_INDEX_KEY fija el índice aunque se rote CRYPTO_PASSWORD; sin
+    # ella se deriva de la clave actual y rotar obliga a recalcular índices.
+    explicit = getattr(settings, "CRYPTO_BLIND_INDEX_KEY", "")
+    if explicit:
+        return explicit.encode("utf-8")
+    from sistema_buap_api.cypher_utils import key_specs
+
+    return _derived_index_key(*key_specs()[0])
+
+
+class BlindIndexField(models.CharField):
+    """HMAC-SHA256 del valor normalizado de un EncryptedTextField (`source`).
+
+    Permite `filter_blind(telefono=...)` con un índice normal de la base, sin
+    descifrar filas. El HMAC incluye modelo y campo, así que el mismo valor en
+    dos columnas no se puede correlacionar. Revela qué filas comparten valor.
+    """
+
+    def __init__(self, *args, source=None, normalize=None, **kwargs):
+        kwargs.setdefault("max_length", 64)
+        kwargs.setdefault("db_index", True)
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("blank", True)
+        kwargs.setdefault("default", "")
+        self.source = source
+        self.normalize = normalize
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        if self.normalize is not None:
+            kwargs["normalize"] = self.normalize
+        for key, default in (("max_length", 64), ("db_index", True), ("editable", False), ("blank", True), ("default", "")):
+            if kwargs.get(key) == default:
+                kwargs.pop(key)
+        return name, path, args, kwargs
+
+    def compute(self, value):
+        if not value:
+            return ""
+        if self.normalize is not None:
+            value = self.normalize(value)
+        message = f"{self.model._meta.label_lower}.{self.source}\x00{value}".encode("utf-8")
+        return hmac.new(blind_index_key(), message, hashlib.sha256).hexdigest()
+
+    def pre_save(self, model_instance, add):
+        source = model_instance._meta.get_field(self.source)
+        current = model_instance.__dict__.get(self.attname)
+        if current is not None and isinstance(model_instance.__dict__.get(source.attname), Ciphertext):
+            # El valor no se ha leído ni cambiado: el índice guardado sigue valiendo.
+            return current
+        value = self.compute(getattr(model_instance, source.attname))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def blind_indexes_for(model, names):
+    """BlindIndexField de `model` cuyo campo de origen está en `names` y ellos no."""
+    names = set(names)
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(field, BlindIndexField) and field.source in names and field.name not in names
+    ]
+
+
+class EncryptedModelMixin:
+    """Mantiene los índices ciegos en `save(update_fields=...)`.
+
+    Si se guarda un campo cifrado sin su índice, la columna recibe el token
+    nuevo y el índice conserva el valor anterior: filter_blind() fallaría.
+    Los índices dependientes se agregan a `update_fields`.
+    """
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if update_fields is not None:
+            indexes = blind_indexes_for(type(self), update_fields)
+            if indexes:
+                update_fields = [*update_fields, *(index.name for index in indexes)]
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
+
+def attach_batches(model, instances):
+    """Agrupa por campo los tokens de `instances` para descifrarlos en lote al primer acceso."""
+    encrypted = [field.attname for field in model._meta.concrete_fields if getattr(field, "encrypted", False)]
+    if not encrypted or not instances or not isinstance(instances[0], models.Model):
+        return
+    for attname in encrypted:
+        members = [obj for obj in instances if isinstance(obj.__dict__.get(attname), Ciphertext)]
+        if len(members) < 2:
+            continue
+        batch = _Batch(attname, members)
+        for obj in members:
+            obj.__dict__[attname].batch = batch
+
+
+class EncryptedQuerySet(models.QuerySet):
+    """QuerySet para modelos con EncryptedTextField.
+
+    Al iterar, los tokens de cada campo cifrado se descifran en lote la
+    primera vez que se lee el campo en cualquier fila. `filter_blind()` filtra
+    por igualdad usando los índices ciegos; `update()` y `bulk_update()` los
+    mantienen.
+    """
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if fetched:
+            attach_batches(self.model, self._result_cache)
+
+    def iterator(self, chunk_size=None):
+        size = chunk_size or 2000
+        chunk = []
+        for obj in super().iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == size:
+                attach_batches(self.model, chunk)
+                yield from chunk
+                chunk = []
+        attach_batches(self.model, chunk)
+        yield from chunk
+
+    def _blind_index(self, name):
+        for field in self.model._meta.concrete_fields:
+            if isinstance(field, BlindIndexField) and field.source == name:
+                return field
+        raise FieldError(f"{name} no tiene BlindIndexField en {self.model._meta.label}.")
+
+    def filter_blind(self, **conditions):
+        """filter() por igualdad (o `__in`) sobre campos cifrados, vía sus índices ciegos."""
+        translated = {}
+        for key, value in conditions.items():
+            name, _, lookup = key.partition("__")
+            index = self._blind_index(name)
+            if lookup == "in":
+                translated[f"{index.name}__in"] = [index.compute(item) for item in value]
+            elif lookup in ("", "exact"):
+                translated[index.name] = index.compute(value)
+            else:
+                raise FieldError(f"filter_blind solo admite igualdad e __in, no __{lookup}.")
+        return self.filter(**translated)
+
+    def update(self, **kwargs):
+        for field in self.model._meta.concrete_fields:
+            if isinstance(field, BlindIndexField) and field.source in kwargs and field.name not in kwargs:
+                value = kwargs[field.source]
+                if value is not None and not isinstance(value, str):
+                    raise FieldError(f"update() de {field.source} requiere un valor literal para su índice ciego.")
+                kwargs[field.name] = field.compute(value)
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        indexes = blind_indexes_for(self.model, fields)
+        if indexes:
+            # bulk_update() no llama a pre_save(): el índice se calcula aquí.
+            for obj in objs:
+                for index in indexes:
+                    index.pre_save(obj, add=False)
+            fields = [*fields, *(index.name for index in indexes)]
+        return super().bulk_update(objs, fields, batch_size=batch_size)
@@ -0,0 +1,148 @@
+import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+# Campos cuyo to_representation devuelve el valor tal cual viene de la base
+# (str, int o bool ya convertidos por el backend).
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _uses_iso(field, default):
+    output_format = getattr(field, "format", default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+class ListPlan:
+    """Plan precompilado para serializar filas de `.values_list()`.
+
+    Produce exactamente los mismos valores que el ModelSerializer para los
+    campos simples, sin instanciar modelos ni llamar a to_representation por
+    campo. Los campos sin conversor propio usan el de DRF.
+    """
+
+    def __init__(self, names, columns, kinds, fields):
+        self.names = names
+        self.columns = columns
+        self._kinds = kinds
+        self._fields = fields
+        self._build = _compile_builder(names, kinds)
+
+    def _converters(self):
+        # La zona horaria se resuelve por petición, igual que DateTimeField.
+        current_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        converters = []
+        for kind, field in zip(self._kinds, self._fields):
+            if kind == "identity":
+                converters.append(None)
+            elif kind == "iso":
+                converters.append(_isoformat)
+            elif kind == "datetime" and current_timezone is not None:
+                converters.append(_datetime_converter(field, current_timezone))
+            else:
+                converters.append(field.to_representation)
+        return converters
+
+    def serialize(self, rows):
+        return self._build(rows, *(converter for converter in self._converters() if converter is not None))
+
+
+def _datetime_converter(field, current_timezone):
+    if current_timezone is datetime.timezone.utc or getattr(current_timezone, "key", None) == "UTC":
+        # Caso común: la base ya entrega UTC y la zona activa es UTC.
+        def convert(value):
+            if value.utcoffset() is None:
+                return field.to_representation(value)
+            return value.astimezone(datetime.timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+        return convert
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _compile_builder(names, kinds):
+    """Genera una función que arma todas las filas con una list comprehension.
+
+    Evita el bucle por campo: cada columna se lee por índice y solo las que
+    tienen conversor lo llaman (respetando None, como DRF).
+    """
+    parameters, items = [], []
+    for index, (name, kind) in enumerate(zip(names, kinds)):
+        if kind == "identity":
+            items.append(f"{name!r}: row[{index}]")
+        else:
+            converter = f"convert_{index}"
+            parameters.append(converter)
+            items.append(f"{name!r}: None if row[{index}] is None else {converter}(row[{index}])")
+    source = (
+        f"def build(rows, {', '.join(parameters)}):\n"
+        f"    return [{{{', '.join(items)}}} for row in rows]\n"
+    )
+    namespace = {}
+    exec(compile(source, "<fastpath>", "exec"), namespace)
+    return namespace["build"]
+
+
+@lru_cache(maxsize=None)
+def plan_for(serializer_class, field_names=None):
+    """Devuelve un ListPlan para el serializer, o None si tiene campos no planos.
+
+    `field_names` limita (y ordena según el serializer) los campos incluidos.
+    """
+    model = serializer_class.Meta.model
+    names, columns, kinds, fields = [], [], [], []
+    for name, field in serializer_class().fields.items():
+        if field.write_only or (field_names is not None and name not in field_names):
+            continue
+        if isinstance(field, serializers.BaseSerializer) or field.source == "*" or "." in field.source:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+        if getattr(model_field, "encrypted", False):
+            # .values_list() entrega el token cifrado, no el texto.
+            return None
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is not None:
+            return None
+
+        if isinstance(field, serializers.DateTimeField):
+            kind = "datetime" if _uses_iso(field, api_settings.DATETIME_FORMAT) else "field"
+        elif isinstance(field, serializers.DateField):
+            kind = "iso" if _uses_iso(field, api_settings.DATE_FORMAT) else "field"
+        elif isinstance(field, serializers.TimeField):
+            kind = "iso" if _uses_iso(field, api_settings.TIME_FORMAT) else "field"
+        elif isinstance(field, IDENTITY_FIELDS):
+            kind = "identity"
+        else:
+            kind = "field"
+        names.append(name)
+        columns.append(model_field.attname)
+        kinds.append(kind)
+        fields.append(field)
+    return ListPlan(tuple(names), tuple(columns), tuple(kinds), tuple(fields))
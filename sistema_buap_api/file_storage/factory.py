@@ -1,14 +1,18 @@
-import datetime
 from django.conf import settings
-import os
-from django.http import HttpResponse, Http404
-from sistema_buap_api.file_storage.file_system_storage import FileSystemStorage
-from sistema_buap_api.file_storage.google_cloud_bucket_storage import GoogleCloudBucketStorage
+
 
 class FileStorageFactory:
 
     @staticmethod
     def create():
-        #TODO: Aqui se puede elegir que tipo de storage usar
+        # FILE_STORAGE_BACKEND elige el storage: "gcs" (bucket de Google Cloud) o
+        # "filesystem" (disco local, sin acceso a la nube). Import diferido: el
+        # backend (y su SDK) se carga al crear el storage.
+        if settings.FILE_STORAGE_BACKEND == "filesystem":
+            from sistema_buap_api.file_storage.file_system_storage import FileSystemStorage
+
+            return FileSystemStorage()
+
+        from sistema_buap_api.file_storage.google_cloud_bucket_storage import GoogleCloudBucketStorage
+
         return GoogleCloudBucketStorage()
-        #return FileSystemStorage()
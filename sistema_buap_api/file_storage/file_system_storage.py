@@ -1,10 +1,110 @@
-import datetime
-from django.conf import settings
+import hashlib
 import os
-from django.http import HttpResponse, Http404
+import re
+import tempfile
+
+from django.conf import settings
+
+from sistema_buap_api import metrics
+
+
+# Nombre de un archivo guardado: sha256 del contenido más la extensión original.
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}(\.[A-Za-z0-9]{1,16})?$")
+
+READ_CHUNK = 1024 * 1024
+
+# El nombre es el hash del contenido: una URL nunca cambia de contenido.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
 
 class FileSystemStorage():
+    """Almacén local direccionado por contenido.
+
+    Cada archivo se guarda como `<raíz>/ab/cd/<sha256><ext>`: dos subidas
+    iguales ocupan un solo archivo. Se escribe a un temporal en la misma raíz
+    y se mueve con `os.replace`, así que nunca queda un archivo a medias con
+    el nombre final. Misma interfaz que GoogleCloudBucketStorage; la URL
+    pública la atiende views.files.FileDownloadView.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or settings.FILE_STORAGE_ROOT
+
+    def path(self, key):
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Nombre de archivo inválido: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def url(self, key):
+        return settings.FILE_STORAGE_URL + key
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def open_file(self, file_name, bucket_name=None):
+        return open(self.path(file_name), "rb")
+
+    def save_file(
+        self, file_object, file_name, container_folder=None, prefix_folder=None, bucket_name=None, cache_control=None
+    ):
+        # container_folder, prefix_folder, bucket_name y cache_control existen por
+        # compatibilidad con el storage de GCS: aquí la ubicación la decide el
+        # contenido y FileDownloadView ya sirve todo con caché inmutable.
+        extension = os.path.splitext(file_name)[1].lower()
+        if not re.match(r"^(\.[a-z0-9]{1,16})?$", extension):
+            extension = ""
+
+        temp_dir = os.path.join(self.root, ".tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        if hasattr(file_object, "seek"):
+            file_object.seek(0)
+        chunks = file_object.chunks(READ_CHUNK) if hasattr(file_object, "chunks") else iter(
+            lambda: file_object.read(READ_CHUNK), b""
+        )
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+
+            key = digest.hexdigest() + extension
+            path = self.path(key)
+            if os.path.exists(path):
+                metrics.inc("file_storage_dedup_total")
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        return {"public_url": self.url(key), "name": key}
+
+    def save_files(self, files, container_folder=None, prefix_folder=None, bucket_name=None):
+        # En disco local no hay latencia de red que ocultar: uno tras otro.
+        return [
+            self.save_file(file_object, file_name, container_folder, prefix_folder, bucket_name)
+            for file_object, file_name in files
+        ]
+
+    def delete_file(self, file_name, bucket_name=None):
+        """Borra el contenido `file_name` (la clave de `save_file`).
+
+        Por la deduplicación, otros registros pueden apuntar al mismo
+        contenido: quien borra debe comprobar antes que ya nadie lo usa.
+        """
+        try:
+            os.unlink(self.path(file_name))
+        except FileNotFoundError:
+            pass
+        return True
 
-    def save_file(self, file_stream, file_name):
-        #TODO: Yet to implement...
-        return None
\ No newline at end of file
+    def delete_files(self, file_names, bucket_name=None):
+        for file_name in file_names:
+            self.delete_file(file_name)
+        return True
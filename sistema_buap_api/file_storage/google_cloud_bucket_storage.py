@@ -1,35 +1,114 @@
-import datetime
-from django.conf import settings
 import os
-from django.http import HttpResponse, Http404
-from google.cloud import storage
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from sistema_buap_api.data_utils import DataUtils
 
+
+# El tamaño de bloque de las subidas reanudables debe ser múltiplo de 256 KiB.
+CHUNK_ALIGNMENT = 256 * 1024
+
+# Máximo de operaciones por petición batch que acepta la API JSON de GCS.
+BATCH_LIMIT = 100
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def _storage():
+    # google-cloud-storage tarda cientos de ms en importarse; se carga al
+    # usar el bucket por primera vez y no en el arranque del worker.
+    from google.cloud import storage
+    return storage
+
+
+def get_client():
+    """Cliente de GCS compartido por todo el proceso, creado al primer uso.
+
+    Crear un `storage.Client()` resuelve credenciales y abre una sesión HTTP
+    nueva; reutilizarlo mantiene las conexiones vivas entre subidas. Tras un
+    fork (workers de gunicorn) cada proceso crea el suyo. Con
+    STORAGE_EMULATOR_HOST apunta a un servidor local sin credenciales.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = _storage().Client()
+                _client_pid = os.getpid()
+    return _client
+
+
+def _chunk_size(size):
+    # Archivos conocidos y pequeños van en una sola petición; el resto se sube
+    # por bloques (subida reanudable) sin cargar el archivo completo en memoria.
+    chunk = getattr(settings, "GCS_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+    chunk = max(CHUNK_ALIGNMENT, chunk // CHUNK_ALIGNMENT * CHUNK_ALIGNMENT)
+    if size is not None and size <= chunk:
+        return None
+    return chunk
+
+
+def _stream_size(file_object):
+    # UploadedFile de Django expone `size`; a otros streams con seek se les
+    # mide el largo. Si no se conoce, la subida va por bloques.
+    size = getattr(file_object, "size", None)
+    if size is not None:
+        return size
+    try:
+        size = file_object.seek(0, os.SEEK_END)
+        file_object.seek(0)
+    except (AttributeError, OSError):
+        return None
+    return size
+
+
 class GoogleCloudBucketStorage():
 
+    def _bucket_name(self, bucket_name):
+        return bucket_name or getattr(settings, "GOOGLE_CLOUD_BUCKET", None)
+
     def delete_file(self, file_name, bucket_name=None):
+        bucket_name = self._bucket_name(bucket_name)
         if not bucket_name:
-            if settings.GOOGLE_CLOUD_BUCKET:
-                bucket_name = settings.GOOGLE_CLOUD_BUCKET
-            else:
-                return {}
+            return {}
 
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        bucket = get_client().bucket(bucket_name)
         blob = bucket.blob(file_name)
         blob.delete()
 
         return True
 
-    def save_file(self, file_object, file_name, container_folder=None, prefix_folder=None, bucket_name=None,):
+    def delete_files(self, file_names, bucket_name=None):
+        """Borra varios archivos en peticiones batch de hasta 100; los que no existen se ignoran."""
+        bucket_name = self._bucket_name(bucket_name)
+        if not bucket_name:
+            return {}
+
+        client = get_client()
+        bucket = client.bucket(bucket_name)
+        file_names = list(file_names)
+        for start in range(0, len(file_names), BATCH_LIMIT):
+            with client.batch(raise_exception=False):
+                for file_name in file_names[start:start + BATCH_LIMIT]:
+                    bucket.delete_blob(file_name)
+
+        return True
+
+    def open_file(self, file_name, bucket_name=None):
+        """Abre el archivo para lectura por bloques, sin descargarlo completo."""
+        bucket = get_client().bucket(self._bucket_name(bucket_name))
+        return bucket.blob(file_name).open("rb")
 
+    def save_file(
+        self, file_object, file_name, container_folder=None, prefix_folder=None, bucket_name=None, cache_control=None
+    ):
 
+        bucket_name = self._bucket_name(bucket_name)
         if not bucket_name:
-            if settings.GOOGLE_CLOUD_BUCKET:
-                bucket_name = settings.GOOGLE_CLOUD_BUCKET
-            else:
-                return {}
-
+            return {}
 
         content_type = DataUtils.get_file_mimetype(file_name)
 
@@ -39,16 +118,37 @@ class GoogleCloudBucketStorage():
         if prefix_folder:
             file_name = prefix_folder + "/" + file_name
 
-        file_stream = file_object.read()
+        size = _stream_size(file_object)
 
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(file_name)
+        bucket = get_client().bucket(bucket_name)
+        blob = bucket.blob(file_name, chunk_size=_chunk_size(size))
+        if cache_control:
+            # Se guarda como metadato del objeto y GCS lo envía al descargarlo.
+            blob.cache_control = cache_control
 
-        blob.upload_from_string(
-            file_stream,
+        blob.upload_from_file(
+            file_object,
+            rewind=size is not None,
+            size=size,
             content_type=content_type)
 
         url = blob.public_url
 
-        return {"public_url": url}
+        return {"public_url": url, "name": file_name}
+
+    def save_files(self, files, container_folder=None, prefix_folder=None, bucket_name=None):
+        """Sube varios archivos en paralelo (GCS_UPLOAD_THREADS hilos, mismo cliente).
+
+        `files` es una lista de pares (file_object, file_name); regresa los
+        resultados de `save_file` en el mismo orden.
+        """
+        files = list(files)
+        if not files:
+            return []
+        threads = min(getattr(settings, "GCS_UPLOAD_THREADS", 4), len(files))
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="gcs-upload") as executor:
+            futures = [
+                executor.submit(self.save_file, file_object, file_name, container_folder, prefix_folder, bucket_name)
+                for file_object, file_name in files
+            ]
+            return [future.result() for future in futures]
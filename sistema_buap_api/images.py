@@ -0,0 +1,281 @@
+import io
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from sistema_buap_api import metrics, models
+from sistema_buap_api.file_storage.factory import FileStorageFactory
+from sistema_buap_api.file_storage.file_system_storage import IMMUTABLE_CACHE
+
+
+logger = logging.getLogger(__name__)
+
+# Firmas de los formatos aceptados: (prefijo, desplazamiento) -> (extensión, content type).
+SIGNATURES = (
+    (b"\xff\xd8\xff", 0, ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", 0, ".png", "image/png"),
+    (b"GIF87a", 0, ".gif", "image/gif"),
+    (b"GIF89a", 0, ".gif", "image/gif"),
+    (b"WEBP", 8, ".webp", "image/webp"),
+)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_sizes():
+    """Lados máximos de las miniaturas en pixeles, de mayor a menor (IMAGE_THUMBNAIL_SIZES)."""
+    return sorted(getattr(settings, "IMAGE_THUMBNAIL_SIZES", (160, 480, 1024)), reverse=True)
+
+
+def sniff(file_object):
+    """(extensión, content type) según los primeros bytes, o None si no es un formato aceptado."""
+    head = file_object.read(16)
+    file_object.seek(0)
+    for prefix, offset, extension, content_type in SIGNATURES:
+        if head[offset:offset + len(prefix)] == prefix:
+            if extension == ".webp" and not head.startswith(b"RIFF"):
+                continue
+            return extension, content_type
+    return None
+
+
+def validate(file_object):
+    # Solo tamaño y firma: Pillow no se carga en la petición. Si la imagen está
+    # dañada lo descubre el pool de miniaturas y la marca con status ERROR.
+    limit = getattr(settings, "IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+    if file_object.size > limit:
+        raise ValidationError(f"La imagen pesa más de {limit // (1024 * 1024)} MiB.")
+    kind = sniff(file_object)
+    if kind is None:
+        raise ValidationError("Formato no soportado: se aceptan JPEG, PNG, GIF y WEBP.")
+    return kind
+
+
+def store(owner, file_object):
+    """Sube al storage el original de una imagen de `owner` (Equipo o Lab).
+
+    Es I/O de red con GCS, así que va antes y fuera de la transacción que
+    crea la Imagen (`attach`). Regresa lo que `attach` necesita; si la
+    transacción no llega a confirmarse, `discard` borra lo subido.
+    """
+    extension, content_type = validate(file_object)
+    saved = FileStorageFactory.create().save_file(
+        file_object,
+        f"{uuid.uuid4().hex}{extension}",
+        container_folder=f"imagenes/{owner._meta.model_name}/{owner.pk}",
+        cache_control=IMMUTABLE_CACHE,
+    )
+    return {"archivo": saved["name"], "url": saved["public_url"], "contentType": content_type, "bytes": file_object.size}
+
+
+def attach(owner, stored):
+    """Crea la Imagen de un original ya subido (`store`) y encarga sus miniaturas.
+
+    Las miniaturas las genera el pool de procesos cuando la transacción
+    confirma. Regresa la Imagen con status PENDIENTE.
+    """
+    owner_field = owner._meta.model_name
+    imagen = models.Imagen.objects.create(**{owner_field: owner}, **stored)
+    metrics.inc("images_uploaded_total", dueno=owner_field)
+    transaction.on_commit(lambda: submit(imagen.pk))
+    return imagen
+
+
+def discard(stored):
+    """Borra originales subidos con `store` que no llegaron a tener Imagen."""
+    names = [item["archivo"] for item in stored if not _is_shared(item["archivo"])]
+    if names:
+        FileStorageFactory.create().delete_files(names)
+
+
+def _is_shared(archivo, exclude_pk=None):
+    # El storage local deduplica por contenido: la misma foto subida a dos
+    # equipos es un solo archivo (y mismas miniaturas), que no se borra
+    # mientras otra imagen lo use.
+    queryset = models.Imagen.objects.filter(archivo=archivo)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.exists()
+
+
+def _delete_files(archivo, names):
+    if not _is_shared(archivo):
+        FileStorageFactory.create().delete_files(names)
+
+
+def schedule_file_cleanup(imagen):
+    """Al confirmar el borrado de `imagen`, borra sus archivos si ninguna otra los usa.
+
+    Receptor de post_delete: cubre tanto `delete_image` como el CASCADE al
+    borrar el Equipo o Lab. Se comprueba al confirmar, cuando las demás
+    imágenes del mismo borrado ya no existen.
+    """
+    names = [imagen.archivo] + [thumbnail["name"] for thumbnail in imagen.miniaturas.values()]
+    transaction.on_commit(lambda: _delete_files(imagen.archivo, names))
+
+
+def new_pool(workers):
+    """ProcessPoolExecutor de `workers` procesos "spawn" con Django configurado.
+
+    El inicializador es `django.setup` y no una función de este módulo: el
+    hijo lo carga antes de configurar Django, y este módulo importa modelos.
+    DJANGO_SETTINGS_MODULE llega al hijo por el entorno.
+    """
+    # Import diferido: multiprocessing no entra al arranque del worker.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    import django
+
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+    )
+
+
+def get_executor():
+    """Pool de procesos de miniaturas, creado al primer uso en cada worker.
+
+    Usa "spawn": un fork de un worker con hilos y conexiones abiertas hereda
+    locks y sockets a medias. Redimensionar ocupa CPU sin soltar el GIL, así
+    que en procesos aparte no frena las peticiones del worker.
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = new_pool(getattr(settings, "IMAGE_THUMBNAIL_WORKERS", 2))
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _reset_executor(broken):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(imagen_id):
+    """Encarga las miniaturas de una imagen; con IMAGE_THUMBNAIL_WORKERS=0 las genera aquí mismo."""
+    if getattr(settings, "IMAGE_THUMBNAIL_WORKERS", 2) <= 0:
+        _count(generate_thumbnails(imagen_id))
+        return
+    from concurrent.futures.process import BrokenProcessPool
+
+    executor = get_executor()
+    try:
+        future = executor.submit(generate_thumbnails, imagen_id)
+    except BrokenProcessPool:
+        # Un hijo murió (p. ej. por memoria) y el pool ya no acepta trabajo:
+        # se reemplaza y la imagen se reintenta una vez.
+        _reset_executor(executor)
+        future = get_executor().submit(generate_thumbnails, imagen_id)
+    future.add_done_callback(_on_done)
+
+
+def _on_done(future):
+    try:
+        status = future.result()
+    except Exception:
+        # La imagen queda PENDIENTE; el comando generate_thumbnails la retoma.
+        logger.exception("Falló el pool de miniaturas")
+        status = models.Imagen.ImagenStatus.ERROR
+    _count(status)
+
+
+def _count(status):
+    if status is not None:
+        metrics.inc("image_thumbnails_total", status=status)
+
+
+def _flatten(image):
+    from PIL import Image
+
+    if image.mode in ("RGB", "L"):
+        return image
+    if image.mode in ("RGBA", "LA", "P"):
+        # JPEG no tiene canal alfa: lo transparente queda sobre blanco.
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_thumbnails(source, sizes, quality=82):
+    """Lee una imagen de `source` y regresa (ancho, alto, [(lado, BytesIO JPEG)]).
+
+    `draft` deja que el decodificador de JPEG entregue directamente una escala
+    1/2, 1/4 u 1/8 cercana a la miniatura mayor, sin decodificar la foto
+    completa; cada miniatura sale de la anterior, no del original.
+    """
+    from PIL import Image, ImageOps
+
+    sizes = sorted(sizes, reverse=True)
+    with Image.open(source) as original:
+        width, height = original.size
+        if original.getexif().get(0x0112) in (5, 6, 7, 8):
+            width, height = height, width
+        original.draft("RGB", (sizes[0], sizes[0]))
+        image = _flatten(ImageOps.exif_transpose(original))
+
+    thumbnails = []
+    for size in sizes:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+        buffer.seek(0)
+        thumbnails.append((size, buffer))
+    return width, height, thumbnails
+
+
+def generate_thumbnails(imagen_id):
+    """Genera y guarda las miniaturas de una imagen; corre en el pool de procesos.
+
+    Regresa el status final, o None si la imagen se borró antes.
+    """
+    close_old_connections()
+    imagen = models.Imagen.objects.filter(pk=imagen_id).first()
+    if imagen is None:
+        return None
+    storage = FileStorageFactory.create()
+    folder = os.path.dirname(imagen.archivo) or None
+    stem = os.path.splitext(os.path.basename(imagen.archivo))[0]
+    try:
+        with storage.open_file(imagen.archivo) as source:
+            width, height, thumbnails = render_thumbnails(
+                source, thumbnail_sizes(), getattr(settings, "IMAGE_THUMBNAIL_QUALITY", 82)
+            )
+        miniaturas = {}
+        for size, buffer in thumbnails:
+            saved = storage.save_file(buffer, f"{stem}_{size}.jpg", container_folder=folder, cache_control=IMMUTABLE_CACHE)
+            miniaturas[str(size)] = {"name": saved["name"], "url": saved["public_url"]}
+    except Exception:
+        logger.exception("No se pudieron generar las miniaturas de la imagen %s", imagen_id)
+        models.Imagen.objects.filter(pk=imagen_id).update(
+            status=models.Imagen.ImagenStatus.ERROR, updated_at=timezone.now()
+        )
+        return models.Imagen.ImagenStatus.ERROR
+
+    updated = models.Imagen.objects.filter(pk=imagen_id).update(
+        ancho=width,
+        alto=height,
+        miniaturas=miniaturas,
+        status=models.Imagen.ImagenStatus.LISTA,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # Se borró mientras se procesaba: las miniaturas recién subidas sobran.
+        if not _is_shared(imagen.archivo, imagen_id):
+            storage.delete_files([thumbnail["name"] for thumbnail in miniaturas.values()])
+        return None
+    return models.Imagen.ImagenStatus.LISTA
@@ -0,0 +1,304 @@
+import datetime
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from sistema_buap_api.bench import summarize
+from sistema_buap_api.seed import SEED_PASSWORD
+
+
+DEFAULT_MIX = {
+    "login": 10,
+    "reservation_create": 20,
+    "list": 45,
+    "approve": 10,
+    "report": 15,
+    "availability": 10,
+}
+
+LIST_PATHS = [
+    "/api/labs/",
+    "/api/equipment/",
+    "/api/reservations/",
+    "/api/reservations/?status=APROBADO",
+    "/api/loans/",
+]
+
+REPORT_PATHS = [
+    "/api/reports/occupancy/",
+    "/api/reports/equipment-usage/",
+    "/api/reports/incidents/",
+]
+
+
+class InProcessTransport:
+    """Llama a la aplicación con el cliente de pruebas de Django, sin red."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        from django.db import close_old_connections
+        from django.test import Client
+
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        if method == "GET":
+            response = client.get(path, **headers)
+        else:
+            response = client.post(path, json.dumps(body or {}), content_type="application/json", **headers)
+        close_old_connections()
+        try:
+            data = json.loads(response.content) if response.content else None
+        except ValueError:
+            data = None
+        return response.status_code, data
+
+
+class HttpTransport:
+    """Envía peticiones HTTP reales, p. ej. a gunicorn."""
+
+    def __init__(self, base_url, host=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.host = host
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Accept": "application/json"}
+        data = None
+        if self.host:
+            headers["Host"] = self.host
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if method != "GET":
+            headers["Content-Type"] = "application/json"
+            data = json.dumps(body or {}).encode()
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            status, content = exc.code, exc.read()
+        try:
+            return status, json.loads(content) if content else None
+        except ValueError:
+            return status, None
+
+
+class VirtualUser:
+    def __init__(self, runner, index):
+        self.runner = runner
+        self.rng = random.Random(index)
+        self.student_email = f"s{runner.seed_value}-alumno{index % runner.students}@buap.mx"
+        self.tech_email = f"s{runner.seed_value}-tecnico{index % runner.tecnicos}@buap.mx"
+        self.student_token, self.student = runner.login(self.student_email)
+        self.tech_token, _ = runner.login(self.tech_email)
+
+    def run_scenario(self, name):
+        return getattr(self, f"scenario_{name}")()
+
+    def scenario_login(self):
+        status, _ = self.runner.transport.request(
+            "POST", "/api/auth/login/", {"email": self.student_email, "password": SEED_PASSWORD}
+        )
+        return status, status == 200
+
+    def scenario_reservation_create(self):
+        # Pocos laboratorios y horarios para que haya traslapes frecuentes.
+        lab = self.rng.choice(self.runner.lab_ids[:3])
+        inicio = self.rng.randint(8, 17)
+        fecha = datetime.date.today() + datetime.timedelta(days=self.rng.randint(1, 5))
+        status, _ = self.runner.transport.request(
+            "POST",
+            "/api/reservations/",
+            {
+                "user": self.student["id"],
+                "lab": lab,
+                "fecha": fecha.isoformat(),
+                "horaInicio": f"{inicio:02d}:00",
+                "horaFin": f"{inicio + 1:02d}:00",
+                "motivo": "Prueba de carga",
+            },
+            self.student_token,
+        )
+        return status, status in {201, 400}
+
+    def scenario_list(self):
+        status, _ = self.runner.transport.request("GET", self.rng.choice(LIST_PATHS), token=self.student_token)
+        return status, status == 200
+
+    def scenario_approve(self):
+        status, data = self.runner.transport.request(
+            "GET", "/api/reservations/?status=PENDIENTE", token=self.tech_token
+        )
+        if status != 200:
+            return status, False
+        rows = data.get("results", []) if isinstance(data, dict) else []
+        if not rows:
+            return status, True
+        reservation = self.rng.choice(rows)
+        status, _ = self.runner.transport.request(
+            "POST", f"/api/reservations/{reservation['id']}/approve/", token=self.tech_token
+        )
+        return status, status in {200, 404}
+
+    def scenario_availability(self):
+        lab = self.rng.choice(self.runner.lab_ids[:3])
+        inicio = self.rng.randint(8, 17)
+        fecha = datetime.date.today() + datetime.timedelta(days=self.rng.randint(1, 5))
+        status, _ = self.runner.transport.request(
+            "GET",
+            f"/api/labs/{lab}/availability/?fecha={fecha.isoformat()}&horaInicio={inicio:02d}:00&horaFin={inicio + 1:02d}:00",
+            token=self.student_token,
+        )
+        return status, status == 200
+
+    def scenario_report(self):
+        status, _ = self.runner.transport.request("GET", self.rng.choice(REPORT_PATHS), token=self.tech_token)
+        return status, status == 200
+
+
+class LoadTest:
+    def __init__(self, transport, size, seed_value=0, mix=None, concurrency=8, duration=30.0, requests=None):
+        self.transport = transport
+        self.seed_value = seed_value
+        self.students = size * 5
+        self.tecnicos = max(1, size // 5)
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.samples = {name: [] for name in self.mix}
+        self.failures = {name: 0 for name in self.mix}
+        self.statuses = {}
+        self._lock = threading.Lock()
+        self._issued = 0
+        self.lab_ids = []
+
+    def login(self, email):
+        status, data = self.transport.request("POST", "/api/auth/login/", {"email": email, "password": SEED_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"No se pudo iniciar sesión como {email} (status {status}). ¿Se sembraron los datos?")
+        return data["access"], data["user"]
+
+    def _next_ticket(self, deadline):
+        with self._lock:
+            if self.requests is not None:
+                if self._issued >= self.requests:
+                    return False
+            elif time.perf_counter() >= deadline:
+                return False
+            self._issued += 1
+            return True
+
+    def _worker(self, user, deadline):
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        while self._next_ticket(deadline):
+            name = user.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, ok = user.run_scenario(name)
+            except Exception:
+                status, ok = "error", False
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.samples[name].append(elapsed)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                if not ok:
+                    self.failures[name] += 1
+
+    def run(self):
+        users = [VirtualUser(self, index) for index in range(self.concurrency)]
+        _, labs = self.transport.request("GET", "/api/labs/", token=users[0].student_token)
+        self.lab_ids = [lab["id"] for lab in labs["results"]]
+
+        started = time.perf_counter()
+        deadline = started + self.duration
+        threads = [threading.Thread(target=self._worker, args=(user, deadline)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        all_samples = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            "wall_seconds": wall,
+            "throughput": len(all_samples) / wall if wall else 0.0,
+            "total": summarize(all_samples),
+            "scenarios": {
+                name: {**summarize(samples), "failures": self.failures[name]}
+                for name, samples in self.samples.items()
+            },
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+        }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Escenario desconocido: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def gunicorn_server(app, workers, worker_class, threads):
+    """Levanta gunicorn sobre la base configurada y entrega (url, Host)."""
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", app,
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--worker-class", worker_class,
+        "--threads", str(threads),
+        "--log-level", "warning",
+    ]
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "sistema_buap_api.settings")}
+    host = settings.ALLOWED_HOSTS[0].lstrip(".") if settings.ALLOWED_HOSTS else "localhost"
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                request = urllib.request.Request(base_url + "/bootstrap/version", headers={"Host": host})
+                urllib.request.urlopen(request, timeout=1)
+                break
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError("gunicorn terminó antes de aceptar conexiones.")
+                time.sleep(0.2)
+        else:
+            raise RuntimeError("gunicorn no respondió a tiempo.")
+        yield base_url, host
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def server_options(asgi, app=None, worker_class=None):
+    if asgi:
+        return app or "sistema_buap_api.asgi:application", worker_class or "uvicorn.workers.UvicornWorker"
+    return app or "sistema_buap_api.wsgi:application", worker_class or "sync"
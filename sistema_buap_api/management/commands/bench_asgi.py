@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sistema_buap_api import seed
+from sistema_buap_api.loadtest import HttpTransport, LoadTest, gunicorn_server, parse_mix, server_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara WSGI (gunicorn sync con hilos) contra ASGI (uvicorn) con los mismos workers: "
+        "throughput y latencia con distintos números de conexiones simultáneas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20, help="Tamaño del dataset (laboratorios).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--levels", default="8,32,64", help="Conexiones simultáneas a probar, separadas por coma.")
+        parser.add_argument("--duration", type=float, default=15.0, help="Segundos por nivel.")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4, help="Hilos por worker WSGI.")
+        parser.add_argument("--mix", default="report=40,availability=40,list=20")
+        parser.add_argument(
+            "--seed-db",
+            action="store_true",
+            help=(
+                "Siembra antes la base configurada (crea un ADMIN con SEED_PASSWORD): solo en bases "
+                "desechables. Sin ella se usan los datos de seed_data."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(value) for value in options["levels"].split(",") if value.strip()]
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["seed_db"]:
+            with transaction.atomic():
+                seed.seed(size=options["size"], seed_value=options["seed"])
+
+        self.stdout.write(f"{options['workers']} workers; WSGI con {options['threads']} hilos por worker; mezcla {mix}")
+        self.stdout.write(
+            f"{'servidor':<9} {'conexiones':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fallas':>7}"
+        )
+        for name, asgi in (("WSGI", False), ("ASGI", True)):
+            app, worker_class = server_options(asgi)
+            try:
+                with gunicorn_server(app, options["workers"], worker_class, options["threads"]) as (base_url, host):
+                    for level in levels:
+                        result = LoadTest(
+                            HttpTransport(base_url, host=host),
+                            size=options["size"],
+                            seed_value=options["seed"],
+                            mix=mix,
+                            concurrency=level,
+                            duration=options["duration"],
+                        ).run()
+                        self._print(name, level, result)
+            except RuntimeError as exc:
+                raise CommandError(f"{name}: {exc}") from exc
+
+    def _print(self, name, level, result):
+        total = result["total"]
+        failures = sum(scenario["failures"] for scenario in result["scenarios"].values())
+        self.stdout.write(
+            f"{name:<9} {level:>10} {result['throughput']:>9.1f} {total['p50_ms']:>9.1f} "
+            f"{total['p95_ms']:>9.1f} {total['p99_ms']:>9.1f} {failures:>7}"
+        )
@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from sistema_buap_api import models, seed, serializers
+from sistema_buap_api.bench import test_database
+from sistema_buap_api.middleware.compression import ENCODERS, compress
+
+
+LEVELS = {"gzip": range(1, 10), "br": range(0, 12)}
+
+PAYLOAD_ENDPOINTS = {
+    "lista de laboratorios": "/api/labs/",
+    "lista de reservaciones": "/api/reservations/",
+    "reporte de ocupación": "/api/reports/occupancy/",
+    "reporte de uso de equipos": "/api/reports/equipment-usage/",
+}
+
+
+class Command(BaseCommand):
+    help = "Compara el costo de CPU contra los bytes ahorrados por nivel de gzip/brotli en respuestas típicas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20, help="Laboratorios del dataset sembrado.")
+        parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por nivel.")
+
+    def handle(self, *args, **options):
+        with test_database():
+            payloads = self._payloads(options["size"])
+
+        configured = settings.COMPRESSION_LEVELS.get("application/json", {})
+        self.stdout.write(f"Codificaciones disponibles: {', '.join(ENCODERS)}; niveles JSON actuales: {configured}")
+        for name, content in payloads.items():
+            self.stdout.write(f"\n{name}: {len(content)} bytes")
+            self.stdout.write(f"{'codificación':<13} {'nivel':>5} {'bytes':>9} {'razón':>7} {'ms':>8} {'MB/s':>8}")
+            for encoding in ENCODERS:
+                for level in LEVELS[encoding]:
+                    size, seconds = self._measure(encoding, level, content, options["repeat"])
+                    marker = " *" if configured.get(encoding) == level else ""
+                    self.stdout.write(
+                        f"{encoding:<13} {level:>5} {size:>9} {len(content) / size:>7.2f} "
+                        f"{seconds * 1000:>8.3f} {len(content) / seconds / 1e6:>8.1f}{marker}"
+                    )
+
+    def _payloads(self, size):
+        data = seed.seed(size=size)
+        client = APIClient()
+        client.force_authenticate(data["admin"])
+        payloads = {name: client.get(url).content for name, url in PAYLOAD_ENDPOINTS.items()}
+        # Equivalente a una exportación completa, como la que recibiría una respuesta streaming.
+        reservaciones = models.Reservacion.objects.all()
+        payloads["exportación de reservaciones"] = JSONRenderer().render(
+            serializers.ReservacionSerializer(reservaciones, many=True).data
+        )
+        return payloads
+
+    def _measure(self, encoding, level, content, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            compressed = compress(encoding, level, content)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return len(compressed), timings[len(timings) // 2]
@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+from sistema_buap_api.bench import summarize
+from sistema_buap_api.db_backends.pool import PooledDatabaseWrapperMixin, get_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de obtener conexión por petición: conexión nueva, persistente por hilo "
+        "y pool compartido. Solo ejecuta SELECT 1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--requests", type=int, default=500, help="Peticiones simuladas por modo.")
+        parser.add_argument("--threads", type=int, default=8, help="Hilos del worker simulado.")
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        settings_dict = dict(connections[options["database"]].settings_dict)
+        settings_dict.pop("POOL", None)
+        backend = load_backend(settings_dict["ENGINE"])
+        # El backend sin pool, aunque ENGINE ya sea uno de los de db_backends.
+        base_class = next(
+            cls for cls in backend.DatabaseWrapper.__mro__ if not issubclass(cls, PooledDatabaseWrapperMixin)
+        )
+        modes = {
+            "conexión nueva": {"CONN_MAX_AGE": 0},
+            "persistente": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+            "pool": {"CONN_MAX_AGE": 0, "POOL": {"SIZE": options["pool_size"]}},
+        }
+
+        self.stdout.write(
+            f"Backend: {base_class.__module__}; {options['requests']} peticiones, "
+            f"{options['threads']} hilos, pool de {options['pool_size']}"
+        )
+        self.stdout.write(f"{'modo':<16} {'conexiones':>10} {'media ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9}")
+        for name, overrides in modes.items():
+            result = self._run(base_class, {**settings_dict, **overrides}, options["requests"], options["threads"])
+            self.stdout.write(
+                f"{name:<16} {result['opened']:>10} {result['mean_ms']:>9.3f} {result['p50_ms']:>9.3f} "
+                f"{result['p95_ms']:>9.3f} {result['throughput']:>9.1f}"
+            )
+
+    def _run(self, base_class, settings_dict, total, threads):
+        opened = []
+        lock = threading.Lock()
+
+        class CountingWrapper(base_class):
+            def get_new_connection(self, conn_params):
+                with lock:
+                    opened.append(1)
+                return super().get_new_connection(conn_params)
+
+        wrapper_class = CountingWrapper
+        if "POOL" in settings_dict:
+            wrapper_class = type("PooledWrapper", (PooledDatabaseWrapperMixin, CountingWrapper), {})
+
+        local = threading.local()
+        wrappers = []
+
+        def request(_):
+            wrapper = getattr(local, "wrapper", None)
+            if wrapper is None:
+                wrapper = local.wrapper = wrapper_class(settings_dict, alias="bench_connections")
+                with lock:
+                    wrappers.append(wrapper)
+            started = time.perf_counter()
+            # Lo mismo que hace Django con las señales request_started/request_finished.
+            wrapper.close_if_unusable_or_obsolete()
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            wrapper.close_if_unusable_or_obsolete()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            samples = list(executor.map(request, range(total)))
+        wall = time.perf_counter() - started
+
+        for wrapper in wrappers:
+            # Se cierran desde este hilo, no desde el que las abrió.
+            wrapper.inc_thread_sharing()
+            wrapper.close()
+        if "POOL" in settings_dict:
+            get_pool("bench_connections", settings_dict).close_idle()
+        return {**summarize(samples), "opened": len(opened), "throughput": total / wall}
@@ -0,0 +1,73 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from sistema_buap_api import cypher_utils
+from sistema_buap_api.cypher_utils import CypherUtils
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo por valor de cifrar y descifrar con CypherUtils: derivando la clave en cada "
+        "llamada (como antes), con la clave en caché y con las APIs por lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", default="1000,600000", help="Iteraciones PBKDF2 a comparar, separadas por coma."
+        )
+        parser.add_argument("--values", type=int, default=5000, help="Valores por medición con la clave en caché.")
+        parser.add_argument(
+            "--uncached-values", type=int, default=20, help="Valores por medición derivando la clave en cada llamada."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            costs = [int(value) for value in options["iterations"].split(",") if value.strip()]
+        except ValueError as exc:
+            raise CommandError("--iterations debe ser una lista de enteros.") from exc
+
+        header = f"{'iteraciones':>12} {'sin caché µs':>14} {'en caché µs':>13} {'lote µs':>9} {'mejora':>9}"
+        self.stdout.write("Costo por valor (cifrar + descifrar)")
+        self.stdout.write(header)
+        for cost in costs:
+            with override_settings(
+                CRYPTO_PASSWORD="bench-password",
+                CRYPTO_SALT=os.urandom(8).hex(),
+                CRYPTO_KDF_ITERATIONS=cost,
+                CRYPTO_PREVIOUS_PASSWORDS=[],
+            ):
+                uncached = self._uncached(cost, options["uncached_values"])
+                CypherUtils.cipher()  # la primera derivación no cuenta
+                cached = self._per_call(options["values"])
+                batch = self._batch(options["values"])
+            self.stdout.write(
+                f"{cost:>12} {uncached:>14.1f} {cached:>13.1f} {batch:>9.1f} {uncached / cached:>8.0f}x"
+            )
+
+    def _uncached(self, cost, count):
+        # Lo que hacía cipherFernet antes: derivar la clave en cada llamada.
+        derive = cypher_utils._derive.__wrapped__
+        password, salt, iterations = cypher_utils.key_specs()[0]
+        started = time.perf_counter()
+        for index in range(count):
+            token = derive(password, salt, iterations).encrypt(f"55-{index:08d}".encode())
+            derive(password, salt, iterations).decrypt(token)
+        return (time.perf_counter() - started) / count * 1e6
+
+    def _per_call(self, count):
+        started = time.perf_counter()
+        for index in range(count):
+            CypherUtils.desencripta(CypherUtils.encripta(f"55-{index:08d}"))
+        return (time.perf_counter() - started) / count * 1e6
+
+    def _batch(self, count):
+        values = [f"55-{index:08d}" for index in range(count)]
+        started = time.perf_counter()
+        decrypted = CypherUtils.desencriptaLote(CypherUtils.encriptaLote(values))
+        elapsed = time.perf_counter() - started
+        if decrypted != values:
+            raise CommandError("El descifrado por lote no regresó los valores originales.")
+        return elapsed / count * 1e6
@@ -0,0 +1,88 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from sistema_buap_api import models
+from sistema_buap_api.bench import summarize, test_database
+
+
+class Command(BaseCommand):
+    help = "Mide latencia y throughput de /api/auth/login/ con distintos costos de PBKDF2."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            default="100000,390000,720000",
+            help="Lista de iteraciones PBKDF2 a comparar, separadas por coma.",
+        )
+        parser.add_argument("--requests", type=int, default=50, help="Logins por cada costo.")
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            costs = [int(value) for value in options["iterations"].split(",") if value.strip()]
+        except ValueError as exc:
+            raise CommandError("--iterations debe ser una lista de enteros.") from exc
+
+        with test_database(keepdb=options["keepdb"]):
+            results = [self._run(cost, options["requests"], options["concurrency"]) for cost in costs]
+
+        header = f"{'iteraciones':>12} {'hash ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8}"
+        self.stdout.write(header)
+        for result in results:
+            self.stdout.write(
+                f"{result['iterations']:>12} {result['hash_ms']:>9.1f} {result['p50_ms']:>9.1f} "
+                f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['throughput']:>9.1f} {result['queries']:>8}"
+            )
+
+    def _run(self, cost, total, concurrency):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=cost):
+            email = f"bench-{cost}@buap.mx"
+            password = "bench-password"
+            started = time.perf_counter()
+            hashed = make_password(password)
+            hash_ms = (time.perf_counter() - started) * 1000
+            models.User.objects.filter(email=email).delete()
+            models.User.objects.create(
+                email=email,
+                matricula=f"bench-{cost}",
+                first_name="Bench",
+                last_name="Login",
+                password=hashed,
+            )
+            body = json.dumps({"email": email, "password": password})
+
+            def login(_):
+                client = Client()
+                begin = time.perf_counter()
+                response = client.post("/api/auth/login/", body, content_type="application/json")
+                elapsed = time.perf_counter() - begin
+                connections.close_all()
+                if response.status_code != 200:
+                    raise CommandError(f"Login falló con status {response.status_code}")
+                return elapsed
+
+            with CaptureQueriesContext(connection) as captured:
+                login(None)
+            queries = len(captured)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                samples = list(executor.map(login, range(total)))
+            wall = time.perf_counter() - started
+
+        summary = summarize(samples)
+        return {
+            "iterations": cost,
+            "hash_ms": hash_ms,
+            "throughput": total / wall if wall else 0.0,
+            "queries": queries,
+            **summary,
+        }
@@ -0,0 +1,180 @@
+import socketserver
+import threading
+import time
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from sistema_buap_api.puentes.mail_queue import MailQueue
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo en memoria para medir y probar el envío.
+
+    Acepta cualquier remitente y destinatario, cuenta conexiones y mensajes y,
+    con `fail_every`, responde 421 y cierra la conexión en uno de cada N
+    mensajes para ejercitar los reintentos.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, fail_every=0, delay=0.0):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.fail_every = fail_every
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self.failures = 0
+        self.data_commands = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("latin-1").strip().split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif command in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if server.delay:
+                    time.sleep(server.delay)
+                with server.lock:
+                    server.data_commands += 1
+                    fail = server.fail_every and server.data_commands % server.fail_every == 0
+                    if fail:
+                        server.failures += 1
+                    else:
+                        server.messages += 1
+                if fail:
+                    self.reply("421 Service not available, closing channel")
+                    return
+                self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía una ráfaga de correos a un servidor SMTP local de prueba: un hilo y una conexión "
+        "por correo contra la cola con conexiones persistentes. Con --fail-every prueba los reintentos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=300)
+        parser.add_argument("--workers", type=int, default=2, help="EMAIL_QUEUE_WORKERS de la cola.")
+        parser.add_argument("--batch", type=int, default=20, help="EMAIL_BATCH_SIZE de la cola.")
+        parser.add_argument("--queue-size", type=int, default=100, help="EMAIL_QUEUE_SIZE de la cola.")
+        parser.add_argument("--fail-every", type=int, default=0, help="El servidor corta uno de cada N mensajes.")
+        parser.add_argument("--delay-ms", type=float, default=2.0, help="Latencia simulada del servidor por mensaje.")
+
+    def handle(self, *args, **options):
+        total = options["messages"]
+        self.stdout.write(
+            f"{total} correos, latencia del servidor {options['delay_ms']} ms, "
+            f"corte cada {options['fail_every'] or '-'} mensajes"
+        )
+        self.stdout.write(
+            f"{'modo':<22} {'entregados':>10} {'conexiones':>10} {'cortes':>7} {'hilos máx':>9} {'segundos':>9}"
+        )
+        for name, send in (("hilo por correo", self._thread_per_message), ("cola", self._queued)):
+            # Un servidor por modo: las conexiones rezagadas de un modo no cuentan en el otro.
+            with SMTPStandIn(options["fail_every"], options["delay_ms"] / 1000) as server, override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1",
+                EMAIL_PORT=server.port,
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                EMAIL_USE_TLS=False,
+                EMAIL_QUEUE_SIZE=options["queue_size"],
+                EMAIL_QUEUE_WORKERS=options["workers"],
+                EMAIL_BATCH_SIZE=options["batch"],
+                EMAIL_RETRY_BACKOFF=0.05,
+                EMAIL_QUEUE_PUT_TIMEOUT=2,
+            ):
+                elapsed, peak = self._measure(send, total)
+                self.stdout.write(
+                    f"{name:<22} {server.messages:>10} {server.connections:>10} {server.failures:>7} "
+                    f"{peak:>9} {elapsed:>9.2f}"
+                )
+        if server.messages != total:
+            raise CommandError(f"La cola entregó {server.messages} de {total} correos.")
+
+    def _message(self, index):
+        message = EmailMessage(f"Prueba {index}", "<p>Hola</p>", "noreply@buap.mx", [f"alumno{index}@buap.mx"])
+        message.content_subtype = "html"
+        return message
+
+    def _measure(self, send, total):
+        peak = [threading.active_count()]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.is_set():
+                peak[0] = max(peak[0], threading.active_count())
+                time.sleep(0.002)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            send(total)
+        finally:
+            elapsed = time.perf_counter() - started
+            stop.set()
+            sampler.join()
+        return elapsed, peak[0]
+
+    def _thread_per_message(self, total):
+        # Lo que hacía MailsBridge.send_mail_async: un hilo y una conexión SMTP por correo.
+        def send(index):
+            try:
+                self._message(index).send()
+            except Exception:
+                pass
+
+        threads = [threading.Thread(target=send, args=(index,)) for index in range(total)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _queued(self, total):
+        mail_queue = MailQueue()
+        for index in range(total):
+            mail_queue.enqueue(self._message(index))
+        if not mail_queue.join(timeout=120):
+            raise CommandError("La cola no se vació en 120 segundos.")
@@ -0,0 +1,73 @@
+import datetime
+import io
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+
+from sistema_buap_api import models, parsers, renderers, seed, serializers
+from sistema_buap_api.bench import test_database
+
+
+class Command(BaseCommand):
+    help = "Mide el throughput de los renderers y parsers JSON/MessagePack sobre payloads de 10k filas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with test_database():
+            seed.seed(size=max(1, rows // 10))
+            reservaciones = models.Reservacion.objects.all()[:rows]
+            payloads = {
+                "serializer (strings)": serializers.ReservacionSerializer(reservaciones, many=True).data,
+                "valores nativos": self._native_rows(rows),
+            }
+
+        candidates = [("DRF JSONRenderer", JSONRenderer(), JSONParser()), ("FastJSONRenderer", renderers.FastJSONRenderer(), parsers.FastJSONParser())]
+        if renderers.msgpack is not None:
+            candidates.append(("MessagePackRenderer", renderers.MessagePackRenderer(), parsers.MessagePackParser()))
+        self.stdout.write(f"orjson: {'sí' if renderers.orjson else 'no'}, msgpack: {'sí' if renderers.msgpack else 'no'}")
+
+        for name, data in payloads.items():
+            expected = JSONRenderer().render(data)
+            if renderers.FastJSONRenderer().render(data) != expected:
+                raise CommandError(f"FastJSONRenderer no produce la misma salida que DRF para '{name}'.")
+            self.stdout.write(f"\n{name}: {len(data)} filas")
+            self.stdout.write(f"{'formato':<22} {'bytes':>10} {'render ms':>10} {'filas/s':>11} {'parse ms':>10}")
+            for label, renderer, parser in candidates:
+                body, render_seconds = self._time(lambda: renderer.render(data), options["repeat"])
+                _, parse_seconds = self._time(lambda: parser.parse(io.BytesIO(body), parser_context={}), options["repeat"])
+                self.stdout.write(
+                    f"{label:<22} {len(body):>10} {render_seconds * 1000:>10.2f} "
+                    f"{len(data) / render_seconds:>11.0f} {parse_seconds * 1000:>10.2f}"
+                )
+
+    def _native_rows(self, rows):
+        # Filas como las que arman los reportes: date, time, datetime y Decimal sin convertir.
+        now = timezone.now()
+        return [
+            {
+                "id": index,
+                "fecha": datetime.date(2024, 1, 1) + datetime.timedelta(days=index % 365),
+                "horaInicio": datetime.time(index % 24, 30),
+                "created_at": now - datetime.timedelta(seconds=index),
+                "ocupacion": Decimal("0.75"),
+                "motivo": "Práctica de laboratorio",
+            }
+            for index in range(rows)
+        ]
+
+    def _time(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return result, timings[len(timings) // 2]
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Se ejecuta en un intérprete nuevo: carga la app WSGI como lo hace el
+# servidor y atiende una petición, sin servidor HTTP de por medio.
+STARTUP_SCRIPT = r"""
+import io, json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sistema_buap_api.settings")
+from sistema_buap_api.wsgi import application
+loaded = time.perf_counter()
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": sys.argv[1],
+    "QUERY_STRING": "",
+    "SERVER_NAME": sys.argv[2],
+    "SERVER_PORT": "80",
+    "HTTP_HOST": sys.argv[2],
+    "SERVER_PROTOCOL": "HTTP/1.1",
+    "wsgi.url_scheme": "http",
+    "wsgi.input": io.BytesIO(),
+    "wsgi.errors": sys.stderr,
+}
+statuses = []
+body = b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+done = time.perf_counter()
+print(json.dumps({
+    "app_ms": (loaded - started) * 1000,
+    "response_ms": (done - loaded) * 1000,
+    "status": statuses[0],
+    "modules": sorted(sys.modules),
+}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# `requests` no se incluye: rest_framework.compat lo importa siempre que está instalado.
+DEFAULT_FORBIDDEN = "google.cloud.storage,PIL,concurrent.futures.process"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en frío: tiempo hasta la primera respuesta en un proceso nuevo y "
+        "desglose de -X importtime. Falla si se supera --max-ms o si se importan módulos prohibidos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/bootstrap/version")
+        parser.add_argument("--top", type=int, default=15, help="Módulos y paquetes a listar.")
+        parser.add_argument("--max-ms", type=float, default=1500.0, help="Mediana máxima hasta la primera respuesta.")
+        parser.add_argument(
+            "--forbid",
+            default=DEFAULT_FORBIDDEN,
+            help="Módulos que no deben cargarse al arrancar, separados por coma.",
+        )
+
+    def handle(self, *args, **options):
+        host = settings.ALLOWED_HOSTS[0].lstrip(".") if settings.ALLOWED_HOSTS else "localhost"
+        command = [sys.executable, "-c", STARTUP_SCRIPT, options["path"], host]
+
+        runs = []
+        for _ in range(options["runs"]):
+            started = time.perf_counter()
+            result = self._run(command)
+            result["total_ms"] = (time.perf_counter() - started) * 1000
+            runs.append(result)
+
+        self.stdout.write(f"{options['path']} -> {runs[0]['status']} ({options['runs']} procesos)")
+        for key, label in (
+            ("total_ms", "proceso completo (intérprete + app + respuesta)"),
+            ("app_ms", "carga de la app WSGI"),
+            ("response_ms", "primera respuesta"),
+        ):
+            values = [run[key] for run in runs]
+            self.stdout.write(f"  {label:<50} mediana {statistics.median(values):8.1f} ms  mín {min(values):8.1f} ms")
+
+        self._importtime(command, options["top"])
+
+        failures = []
+        median = statistics.median(run["total_ms"] for run in runs)
+        if median > options["max_ms"]:
+            failures.append(f"arranque de {median:.1f} ms supera el máximo de {options['max_ms']:.1f} ms")
+        forbidden = [name.strip() for name in options["forbid"].split(",") if name.strip()]
+        loaded = sorted(set(forbidden) & set(runs[0]["modules"]))
+        if loaded:
+            failures.append(f"módulos cargados al arrancar: {', '.join(loaded)}")
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Arranque dentro del presupuesto."))
+
+    def _run(self, command, *extra):
+        completed = subprocess.run(
+            [command[0], *extra, *command[1:]],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "PYTHONPATH": str(settings.BASE_DIR)},
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"El proceso de arranque falló:\n{completed.stderr[-2000:]}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result["stderr"] = completed.stderr
+        return result
+
+    def _importtime(self, command, top):
+        result = self._run(command, "-X", "importtime")
+        modules = []
+        packages = {}
+        for line in result["stderr"].splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            own, cumulative, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+            modules.append((cumulative, own, indent, name))
+            package = name.split(".", 1)[0]
+            packages[package] = packages.get(package, 0) + own
+
+        total = sum(packages.values())
+        self.stdout.write(f"\n-X importtime: {len(modules)} módulos, {total / 1000:.1f} ms en total")
+        self.stdout.write(f"{'paquete':<32} {'ms propios':>10}")
+        for package, own in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"{package:<32} {own / 1000:>10.1f}")
+        # Los dos primeros niveles: quién arrastra cada cadena de imports.
+        self.stdout.write(f"\n{'import (2 niveles)':<48} {'ms acumulados':>13}")
+        roots = sorted((entry for entry in modules if entry[2] <= 3), reverse=True)[:top]
+        for cumulative, _, indent, name in roots:
+            self.stdout.write(f"{' ' * (indent - 1) + name:<48} {cumulative / 1000:>13.1f}")
@@ -0,0 +1,327 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+class _Content:
+    """Contenido de un objeto en un archivo temporal, con sus hashes calculados al escribir."""
+
+    def __init__(self):
+        import google_crc32c
+
+        self.file = tempfile.TemporaryFile()
+        self.size = 0
+        self.md5 = hashlib.md5()
+        self.crc32c = google_crc32c.Checksum()
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+        self.md5.update(data)
+        self.crc32c.update(data)
+
+    def read(self, start=0, end=None):
+        self.file.seek(start)
+        return self.file.read(-1 if end is None else end - start + 1)
+
+    def hashes(self):
+        return {
+            "md5Hash": base64.b64encode(self.md5.digest()).decode(),
+            "crc32c": base64.b64encode(self.crc32c.digest()).decode(),
+        }
+
+
+class BucketStandIn(ThreadingHTTPServer):
+    """Servidor en memoria con la parte de la API JSON de GCS que usa el storage.
+
+    Subidas multipart y reanudables, metadatos, descarga, borrado y batch.
+    Cuenta peticiones por tipo para comprobar cuántas hizo el cliente. Guarda
+    el contenido en archivos temporales para que la memoria medida sea la del
+    cliente y no la del servidor.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BucketHandler)
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.sessions = {}
+        self.requests = {}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, kind):
+        with self.lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+OBJECT_PATH = re.compile(r"^(?:/download)?/storage/v1/b/([^/]+)/o/(.+)$")
+UPLOAD_PATH = re.compile(r"^/upload/storage/v1/b/([^/]+)/o$")
+RANGE_HEADER = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+class BucketHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, payload=None, headers=None, raw=None):
+        body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b"")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _store(self, bucket, metadata, content):
+        resource = {
+            "bucket": bucket,
+            "name": metadata["name"],
+            "contentType": metadata.get("contentType") or "application/octet-stream",
+            "size": str(content.size),
+            "generation": str(time.time_ns()),
+            **content.hashes(),
+        }
+        if metadata.get("cacheControl"):
+            resource["cacheControl"] = metadata["cacheControl"]
+        with self.server.lock:
+            self.server.objects[(bucket, metadata["name"])] = (resource, content)
+        return resource
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/batch/storage/v1":
+            return self._batch()
+        match = UPLOAD_PATH.match(url.path)
+        if not match:
+            return self._send(404, {"error": "not found"})
+        bucket = match[1]
+        upload_type = query.get("uploadType", [""])[0]
+        body = self._body()
+        if upload_type == "multipart":
+            self.server.count("multipart")
+            content_type = self.headers["Content-Type"]
+            message = BytesParser(policy=HTTP).parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+            metadata_part, media_part = list(message.iter_parts())
+            metadata = json.loads(metadata_part.get_content())
+            metadata.setdefault("contentType", media_part.get_content_type())
+            content = _Content()
+            content.write(media_part.get_payload(decode=True))
+            return self._send(200, self._store(bucket, metadata, content))
+        if upload_type == "resumable":
+            self.server.count("resumable_start")
+            metadata = json.loads(body or b"{}")
+            metadata.setdefault("name", query.get("name", [""])[0])
+            metadata.setdefault("contentType", self.headers.get("X-Upload-Content-Type"))
+            upload_id = os.urandom(8).hex()
+            with self.server.lock:
+                self.server.sessions[upload_id] = (bucket, metadata, _Content())
+            location = f"{self.server.url}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={upload_id}"
+            return self._send(200, {}, headers={"Location": location})
+        return self._send(400, {"error": "uploadType"})
+
+    def do_PUT(self):
+        query = parse_qs(urlparse(self.path).query)
+        upload_id = query.get("upload_id", [""])[0]
+        if upload_id not in self.server.sessions:
+            return self._send(404, {"error": "upload session"})
+        self.server.count("resumable_chunk")
+        bucket, metadata, content = self.server.sessions[upload_id]
+        content.write(self._body())
+        total = self.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+        if total != "*" and content.size >= int(total):
+            del self.server.sessions[upload_id]
+            return self._send(200, self._store(bucket, metadata, content))
+        return self._send(308, headers={"Range": f"bytes=0-{content.size - 1}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = OBJECT_PATH.match(url.path)
+        key = (match[1], unquote(match[2])) if match else None
+        if key not in self.server.objects:
+            return self._send(404, {"error": {"code": 404, "message": "No such object"}})
+        resource, content = self.server.objects[key]
+        if parse_qs(url.query).get("alt") == ["media"]:
+            self.server.count("download")
+            headers = {"Content-Type": resource["contentType"]}
+            if resource.get("cacheControl"):
+                headers["Cache-Control"] = resource["cacheControl"]
+            byte_range = RANGE_HEADER.match(self.headers.get("Range", ""))
+            if byte_range:
+                # Lecturas parciales de blob.open("rb"): sin X-Goog-Hash, como GCS.
+                start = int(byte_range[1])
+                end = min(int(byte_range[2]) if byte_range[2] else content.size - 1, content.size - 1)
+                headers["Content-Range"] = f"bytes {start}-{end}/{content.size}"
+                return self._send(206, raw=content.read(start, end), headers=headers)
+            headers["X-Goog-Hash"] = f"crc32c={resource['crc32c']},md5={resource['md5Hash']}"
+            return self._send(200, raw=content.read(), headers=headers)
+        return self._send(200, resource)
+
+    def do_DELETE(self):
+        self.server.count("delete")
+        status, payload = self._delete(urlparse(self.path).path)
+        self._send(status, payload)
+
+    def _delete(self, path):
+        match = OBJECT_PATH.match(path)
+        key = (match[1], unquote(match[2])) if match else None
+        with self.server.lock:
+            if self.server.objects.pop(key, None) is None:
+                return 404, {"error": {"code": 404, "message": "No such object"}}
+        return 204, None
+
+    def _batch(self):
+        self.server.count("batch")
+        content_type = self.headers["Content-Type"]
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + self._body()
+        )
+        boundary = "batch_standin"
+        parts = []
+        for index, part in enumerate(message.iter_parts()):
+            request_line = part.get_payload().lstrip().split("\n", 1)[0]
+            method, uri = request_line.split(" ")[:2]
+            if method == "DELETE":
+                status, payload = self._delete(urlparse(uri).path)
+            else:
+                status, payload = 400, {"error": "unsupported"}
+            reason = {204: "No Content", 404: "Not Found"}.get(status, "Bad Request")
+            content = json.dumps(payload) if payload is not None else ""
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{index}>\r\n\r\n"
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n\r\n{content}\r\n"
+            )
+        body = ("".join(parts) + f"--{boundary}--\r\n").encode()
+        self._send(200, raw=body, headers={"Content-Type": f"multipart/mixed; boundary={boundary}"})
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba GoogleCloudBucketStorage contra un servidor de bucket: el servidor en memoria "
+        "incluido (por defecto) o STORAGE_EMULATOR_HOST con --emulator. Mide la memoria de la "
+        "subida por bloques y valida subidas en paralelo y borrado en batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--emulator", action="store_true", help="Usar STORAGE_EMULATOR_HOST (p. ej. fake-gcs-server).")
+        parser.add_argument("--bucket", default="buap-check")
+        parser.add_argument("--size-mb", type=int, default=32, help="Tamaño del archivo grande.")
+        parser.add_argument("--chunk-mb", type=int, default=4, help="GCS_UPLOAD_CHUNK_SIZE en MiB.")
+        parser.add_argument("--files", type=int, default=20, help="Archivos pequeños para save_files/delete_files.")
+
+    def handle(self, *args, **options):
+        try:
+            from sistema_buap_api.file_storage import google_cloud_bucket_storage as gcs
+            gcs._storage()
+        except ImportError:
+            raise CommandError("google-cloud-storage no está instalado.")
+
+        if options["emulator"]:
+            if not os.environ.get("STORAGE_EMULATOR_HOST"):
+                raise CommandError("Definir STORAGE_EMULATOR_HOST para usar --emulator.")
+            self._check(gcs, options, None)
+            return
+        with BucketStandIn() as server:
+            previous = os.environ.get("STORAGE_EMULATOR_HOST")
+            os.environ["STORAGE_EMULATOR_HOST"] = server.url
+            gcs._client = None
+            try:
+                self._check(gcs, options, server)
+            finally:
+                gcs._client = None
+                if previous is None:
+                    os.environ.pop("STORAGE_EMULATOR_HOST", None)
+                else:
+                    os.environ["STORAGE_EMULATOR_HOST"] = previous
+
+    def _check(self, gcs, options, server):
+        bucket = options["bucket"]
+        size = options["size_mb"] * 1024 * 1024
+        with override_settings(GOOGLE_CLOUD_BUCKET=bucket, GCS_UPLOAD_CHUNK_SIZE=options["chunk_mb"] * 1024 * 1024):
+            storage = gcs.GoogleCloudBucketStorage()
+            client = gcs.get_client()
+            if server is None and not client.bucket(bucket).exists():
+                client.create_bucket(bucket)
+
+            with TemporaryUploadedFile("grande.bin", "application/octet-stream", size, None) as upload:
+                block = os.urandom(1024 * 1024)
+                for _ in range(options["size_mb"]):
+                    upload.write(block)
+                upload.seek(0)
+
+                peak_stream, elapsed = self._traced(lambda: storage.save_file(upload, "grande.bin", prefix_folder="check"))
+                # Lo que hacía save_file antes: leer todo el archivo y subirlo de una vez.
+                def read_all():
+                    upload.seek(0)
+                    client.bucket(bucket).blob("check/grande-read.bin").upload_from_string(upload.read())
+                peak_read, elapsed_read = self._traced(read_all)
+
+            downloaded = client.bucket(bucket).blob("check/grande.bin").download_as_bytes()
+            if len(downloaded) != size:
+                raise CommandError(f"El archivo subido mide {len(downloaded)} bytes, se esperaban {size}.")
+            self.stdout.write(f"Archivo de {options['size_mb']} MiB, bloques de {options['chunk_mb']} MiB:")
+            self.stdout.write(f"  {'por bloques':<24} memoria pico {peak_stream / 2**20:7.1f} MiB  {elapsed:6.2f} s")
+            self.stdout.write(f"  {'read() completo':<24} memoria pico {peak_read / 2**20:7.1f} MiB  {elapsed_read:6.2f} s")
+
+            files = [(io.BytesIO(os.urandom(2048)), f"pequeno-{index}.bin") for index in range(options["files"])]
+            started = time.perf_counter()
+            results = storage.save_files(files, prefix_folder="check")
+            self.stdout.write(
+                f"save_files: {len(results)} archivos en {time.perf_counter() - started:.2f} s "
+                f"({getattr(gcs.settings, 'GCS_UPLOAD_THREADS', 4)} hilos)"
+            )
+            names = ["check/grande.bin", "check/grande-read.bin", "check/no-existe.bin"]
+            names += [f"check/pequeno-{index}.bin" for index in range(options["files"])]
+            storage.delete_files(names)
+            left = [name for name in names if client.bucket(bucket).blob(name).exists()]
+            if left:
+                raise CommandError(f"delete_files dejó {len(left)} archivos.")
+            self.stdout.write(f"delete_files: {len(names)} nombres borrados (uno inexistente ignorado)")
+            if server is not None:
+                self.stdout.write(f"Peticiones al servidor: {dict(sorted(server.requests.items()))}")
+        self.stdout.write(self.style.SUCCESS("Storage de bucket correcto."))
+
+    def _traced(self, func):
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1], time.perf_counter() - started
+        finally:
+            tracemalloc.stop()
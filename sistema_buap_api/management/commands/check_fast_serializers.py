@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sistema_buap_api import fastpath, mixins, seed, urls
+from sistema_buap_api.bench import test_database
+from sistema_buap_api.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Contrato del camino rápido de listados: verifica que produce exactamente los mismos bytes "
+        "que cada ModelSerializer y mide la aceleración sobre páginas de 1,000 filas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Filas por página medida.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--min-speedup", type=float, default=3.0)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        renderer = FastJSONRenderer()
+        failures = []
+        with test_database():
+            # Con size=rows todos los modelos listados tienen al menos `rows` filas.
+            seed.seed(size=rows)
+            for prefix, viewset, _ in urls.router.registry:
+                if not issubclass(viewset, mixins.FastListMixin):
+                    continue
+                serializer_class = viewset.serializer_class
+                plan = fastpath.plan_for(serializer_class)
+                if plan is None:
+                    failures.append(f"{prefix}: {serializer_class.__name__} no es compatible con el camino rápido")
+                    continue
+                queryset = viewset.queryset.order_by("pk")
+
+                # Se compara también con una zona horaria distinta de UTC activa.
+                for zone in ("UTC", "America/Mexico_City"):
+                    with timezone.override(zone):
+                        expected = renderer.render(serializer_class(queryset.all(), many=True).data)
+                        actual = renderer.render(plan.serialize(queryset.values_list(*plan.columns)))
+                    if expected != actual:
+                        failures.append(f"{prefix}: la salida difiere del serializer ({zone})")
+
+                # Ambos caminos incluyen la consulta: `.all()` evita reutilizar resultados en caché.
+                slow = self._time(lambda: serializer_class(list(queryset.all()[:rows]), many=True).data, options["repeat"])
+                fast = self._time(lambda: plan.serialize(queryset.values_list(*plan.columns)[:rows]), options["repeat"])
+                speedup = slow / fast
+                line = (
+                    f"{prefix}: serializer {slow * 1000:.1f} ms, camino rápido {fast * 1000:.1f} ms "
+                    f"({speedup:.1f}x) en {rows} filas"
+                )
+                if speedup < options["min_speedup"]:
+                    failures.append(line)
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(self.style.SUCCESS(line))
+
+        if failures:
+            raise CommandError("\n".join(failures))
+
+    def _time(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return timings[len(timings) // 2]
@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.test.utils import override_settings
+
+from sistema_buap_api.file_storage.factory import FileStorageFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba el storage local en un directorio temporal: memoria de la subida, deduplicación, "
+        "escrituras concurrentes del mismo contenido y descarga por /files/ sin leer el archivo en Python."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=int, default=32)
+        parser.add_argument("--writers", type=int, default=8, help="Subidas simultáneas del mismo contenido.")
+
+    def handle(self, *args, **options):
+        root = tempfile.mkdtemp(prefix="file-storage-")
+        try:
+            with override_settings(FILE_STORAGE_BACKEND="filesystem", FILE_STORAGE_ROOT=root, FILE_STORAGE_SENDFILE=""):
+                self._check(root, options)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def _check(self, root, options):
+        storage = FileStorageFactory.create()
+        size = options["size_mb"] * 1024 * 1024
+        with TemporaryUploadedFile("grande.bin", "application/octet-stream", size, None) as upload:
+            block = os.urandom(1024 * 1024)
+            for _ in range(options["size_mb"]):
+                upload.write(block)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            first = storage.save_file(upload, "grande.bin")
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.stdout.write(
+                f"Archivo de {options['size_mb']} MiB guardado en {elapsed:.2f} s, memoria pico {peak / 2**20:.1f} MiB"
+            )
+            second = storage.save_file(upload, "copia.BIN")
+
+        if first["name"] != second["name"]:
+            raise CommandError("El mismo contenido produjo dos claves distintas.")
+
+        # Mismo contenido desde varios hilos: todos terminan con el archivo completo.
+        payload = os.urandom(256 * 1024)
+        with ThreadPoolExecutor(max_workers=options["writers"]) as executor:
+            keys = set(
+                executor.map(
+                    lambda _: storage.save_file(io.BytesIO(payload), "concurrente.png")["name"], range(options["writers"])
+                )
+            )
+        if len(keys) != 1 or open(storage.path(keys.pop()), "rb").read() != payload:
+            raise CommandError("Las escrituras concurrentes no dejaron un único archivo íntegro.")
+
+        stored = [name for _, _, names in os.walk(root) for name in names]
+        leftovers = os.listdir(os.path.join(root, ".tmp"))
+        self.stdout.write(f"Archivos en disco: {len(stored)} (3 subidas del mismo contenido, {options['writers']} concurrentes)")
+        if len(stored) != 2 or leftovers:
+            raise CommandError(f"Se esperaban 2 archivos y ningún temporal; hay {len(stored)} y {len(leftovers)} temporales.")
+
+        host = settings.ALLOWED_HOSTS[0].lstrip(".") if settings.ALLOWED_HOSTS else "localhost"
+        client = Client(HTTP_HOST=host)
+        status, headers, wrapped = self._wsgi_get(first["public_url"], host)
+        if status != "200 OK" or wrapped is None:
+            raise CommandError(f"La descarga respondió {status} sin pasar por wsgi.file_wrapper.")
+        self.stdout.write(
+            f"GET {first['public_url'][:24]}…: {status}, Content-Length {headers['Content-Length']}, "
+            f"enviado por wsgi.file_wrapper ({wrapped}), {headers['Cache-Control']}"
+        )
+        cached = client.get(first["public_url"], HTTP_IF_NONE_MATCH=headers["ETag"])
+        if cached.status_code != 304:
+            raise CommandError(f"If-None-Match respondió {cached.status_code}.")
+        if client.get("/files/../settings.py").status_code != 404:
+            raise CommandError("Una clave inválida no respondió 404.")
+
+        storage.delete_file(first["name"])
+        if storage.exists(first["name"]):
+            raise CommandError("delete_file no borró el archivo.")
+        self.stdout.write(self.style.SUCCESS("Storage local correcto."))
+
+    def _wsgi_get(self, url, host):
+        # Igual que gunicorn: si la respuesta es un archivo, el handler WSGI lo
+        # entrega a wsgi.file_wrapper (sendfile) en lugar de iterarlo en Python.
+        wrapped = []
+
+        class FileWrapper:
+            def __init__(self, filelike, block_size=8192):
+                wrapped.append(type(filelike).__name__)
+                self.filelike = filelike
+
+            def __iter__(self):
+                return iter(lambda: self.filelike.read(1024 * 1024), b"")
+
+            def close(self):
+                self.filelike.close()
+
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": url,
+            "QUERY_STRING": "",
+            "SERVER_NAME": host,
+            "SERVER_PORT": "80",
+            "HTTP_HOST": host,
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.file_wrapper": FileWrapper,
+        }
+        started = []
+        body = get_wsgi_application()(environ, lambda status, headers, exc_info=None: started.append((status, dict(headers))))
+        if hasattr(body, "close"):
+            body.close()
+        status, headers = started[0]
+        return status, headers, wrapped[0] if wrapped else None
@@ -0,0 +1,144 @@
+import os
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from rest_framework.test import APIClient
+
+from sistema_buap_api import seed, urls
+from sistema_buap_api.bench import test_database
+
+
+REPORT_ENDPOINTS = [
+    "/api/reports/occupancy/",
+    "/api/reports/equipment-usage/?from=2000-01-01&to=2100-12-31",
+    "/api/reports/incidents/?from=2000-01-01&to=2100-12-31",
+]
+
+
+class _QueryRecorder:
+    """Guarda cada consulta con los frames del proyecto que la originaron."""
+
+    def __init__(self):
+        self.queries = []
+        self.project_root = str(settings.BASE_DIR)
+
+    def __call__(self, execute, sql, params, many, context):
+        frames = [
+            frame
+            for frame in traceback.extract_stack()[:-1]
+            if frame.filename.startswith(self.project_root)
+            and "site-packages" not in frame.filename
+            and f"{os.sep}management{os.sep}" not in frame.filename
+        ]
+        self.queries.append((sql, frames))
+        return execute(sql, params, many, context)
+
+
+def _rows(response):
+    if response.status_code != 200:
+        return []
+    if isinstance(response.data, dict):
+        return response.data.get("results", [])
+    return response.data
+
+
+def _normalize(sql):
+    sql = re.sub(r"%s(, %s)+", "%s, ...", sql)
+    return re.sub(r"\b\d+\b", "N", sql)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que el número de consultas SQL de cada endpoint del router y de los reportes "
+        "no crezca con el tamaño de los datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--small", type=int, default=2, help="Laboratorios del dataset pequeño.")
+        parser.add_argument("--large", type=int, default=6, help="Laboratorios del dataset grande.")
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        with test_database(keepdb=options["keepdb"]):
+            small = self._measure(options["small"])
+            large = self._measure(options["large"])
+
+        failures = 0
+        for endpoint, (small_status, small_queries, small_rows) in small.items():
+            large_status, large_queries, large_rows = large[endpoint]
+            line = f"{endpoint}: {len(small_queries)} -> {len(large_queries)} consultas"
+            if small_rows is not None:
+                line += f" ({small_rows} -> {large_rows} filas)"
+            if small_status >= 400 or large_status >= 400:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{line} (status {small_status}/{large_status})"))
+            elif small_rows is not None and large_rows <= small_rows:
+                # Con el mismo número de filas la comparación no detecta un N+1.
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{line}: el dataset grande no devuelve más filas"))
+            elif len(large_queries) > len(small_queries):
+                failures += 1
+                self.stdout.write(self.style.ERROR(line))
+                self._explain(small_queries, large_queries)
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        if failures:
+            raise CommandError(f"{failures} endpoint(s) exceden su presupuesto de consultas.")
+
+    def _measure(self, size):
+        results = {}
+        with transaction.atomic(), ExitStack() as pages:
+            data = seed.seed(size=size, seed_value=size)
+            client = APIClient()
+            client.force_authenticate(data["admin"])
+            # Con páginas de PAGE_SIZE ambos datasets llenan la primera página y un
+            # N+1 por fila no se nota: la página debe abarcar todas las filas.
+            registry = urls.router.registry
+            page_size = max(viewset.queryset.model._default_manager.count() for _, viewset, _ in registry)
+            for pagination_class in {viewset.pagination_class for _, viewset, _ in registry}:
+                if pagination_class is not None:
+                    pages.enter_context(mock.patch.object(pagination_class, "page_size", page_size))
+            for prefix, viewset, _ in registry:
+                list_url = f"/api/{prefix}/"
+                results[list_url] = self._request(client, list_url)
+                expandable = getattr(getattr(viewset, "serializer_class", None), "Meta", None)
+                expandable = getattr(expandable, "expandable_fields", None)
+                if expandable:
+                    expand_url = f"{list_url}?expand={','.join(expandable)}"
+                    results[expand_url] = self._request(client, expand_url)
+                response = client.get(list_url)
+                rows = _rows(response)
+                if rows:
+                    detail_url = f"/api/{prefix}/{rows[0]['id']}/"
+                    results[f"/api/{prefix}/{{id}}/"] = self._request(client, detail_url, rows=False)
+            for url in REPORT_ENDPOINTS:
+                results[url] = self._request(client, url, rows=False)
+            transaction.set_rollback(True)
+        return results
+
+    def _request(self, client, url, rows=True):
+        recorder = _QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = client.get(url)
+        return response.status_code, recorder.queries, len(_rows(response)) if rows else None
+
+    def _explain(self, small_queries, large_queries):
+        small_counts = Counter(_normalize(sql) for sql, _ in small_queries)
+        large_counts = Counter(_normalize(sql) for sql, _ in large_queries)
+        reported = set()
+        for sql, frames in large_queries:
+            normalized = _normalize(sql)
+            if normalized in reported or large_counts[normalized] <= small_counts[normalized]:
+                continue
+            reported.add(normalized)
+            self.stdout.write(f"  {small_counts[normalized]} -> {large_counts[normalized]}x {sql}")
+            for frame in frames[-5:]:
+                self.stdout.write(f"      {frame.filename}:{frame.lineno} en {frame.name}: {frame.line}")
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sistema_buap_api import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega los avisos pendientes del outbox en lotes, un correo por usuario. "
+        "Con --interval se queda corriendo y revisa el outbox cada N segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=0, help="Segundos entre vueltas; 0 drena una vez y sale.")
+        parser.add_argument("--purge-days", type=int, default=0, help="Borra los avisos entregados hace más de N días.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            total = sent = failed = unknown = 0
+            # Lotes seguidos mientras haya pendientes; el último viene incompleto.
+            while True:
+                count, batch_sent, batch_failed, batch_unknown = outbox.drain(options["batch_size"])
+                total += count
+                sent += batch_sent
+                failed += batch_failed
+                unknown += batch_unknown
+                if count < options["batch_size"] or batch_failed or batch_unknown:
+                    break
+            if total or not options["interval"]:
+                line = f"{total} avisos: {sent} correos enviados, {failed} fallidos"
+                if unknown:
+                    line += f", {unknown} sin confirmar (reclamados hasta que venza el reclamo)"
+                self.stdout.write(line)
+            if options["purge_days"]:
+                deleted = outbox.purge(options["purge_days"])
+                if deleted:
+                    self.stdout.write(f"{deleted} avisos entregados borrados")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sistema_buap_api import images, models
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las miniaturas de imágenes que quedaron PENDIENTES (p. ej. si el worker se reinició "
+        "antes de procesarlas) y, con --retry-errors, las que fallaron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=300, help="Solo pendientes con más de N segundos (las nuevas las procesa el pool)."
+        )
+        parser.add_argument("--retry-errors", action="store_true", help="Reintenta también las imágenes con status ERROR.")
+        parser.add_argument("--workers", type=int, default=settings.IMAGE_THUMBNAIL_WORKERS)
+
+    def handle(self, *args, **options):
+        statuses = [models.Imagen.ImagenStatus.PENDIENTE]
+        if options["retry_errors"]:
+            statuses.append(models.Imagen.ImagenStatus.ERROR)
+        cutoff = timezone.now() - timedelta(seconds=options["older_than"])
+        ids = list(
+            models.Imagen.objects.filter(status__in=statuses, updated_at__lte=cutoff)
+            .order_by("id")
+            .values_list("pk", flat=True)
+        )
+        if not ids:
+            self.stdout.write("Sin imágenes por procesar")
+            return
+
+        if options["workers"] <= 1:
+            results = [images.generate_thumbnails(pk) for pk in ids]
+        else:
+            with images.new_pool(options["workers"]) as executor:
+                results = list(executor.map(images.generate_thumbnails, ids))
+
+        ready = results.count(models.Imagen.ImagenStatus.LISTA)
+        failed = results.count(models.Imagen.ImagenStatus.ERROR)
+        self.stdout.write(f"{len(ids)} imágenes: {ready} listas, {failed} con error")
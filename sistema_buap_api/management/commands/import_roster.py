@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sistema_buap_api.roster_import import RosterImport
+
+
+class Command(BaseCommand):
+    help = "Importa alumnos y personal desde un archivo CSV o JSON (clave: matrícula/email)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Ruta del archivo CSV o JSON.")
+        parser.add_argument("--format", choices=["csv", "json"], help="Formato del archivo (por defecto según la extensión).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=None, help="Procesos para calcular los hashes de contraseñas.")
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida, no escribe en la base de datos.")
+        parser.add_argument("--report", help="Ruta donde guardar el reporte de errores en JSON.")
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or RosterImport.format_from_name(options["path"])
+        try:
+            with open(options["path"], "rb") as handle:
+                rows = RosterImport.parse(handle.read(), file_format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        importer = RosterImport(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            dry_run=options["dry_run"],
+        )
+        report = importer.run(rows)
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, ensure_ascii=False, indent=2)
+        for error in report["errors"]:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['total']} filas: {report['created']} creados, "
+            f"{report['updated']} actualizados, {len(report['errors'])} con errores"
+            + (" (dry run)" if report["dry_run"] else "")
+        ))
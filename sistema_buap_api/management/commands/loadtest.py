@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sistema_buap_api import seed
+from sistema_buap_api.bench import test_database
+from sistema_buap_api.loadtest import HttpTransport, InProcessTransport, LoadTest, gunicorn_server, parse_mix, server_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga reproducible: siembra datos y reproduce una mezcla de tráfico "
+        "(login, reservaciones con traslapes, listados, aprobaciones y reportes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20, help="Tamaño del dataset (laboratorios).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--concurrency", type=int, default=8, help="Usuarios virtuales simultáneos.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Segundos de prueba.")
+        parser.add_argument("--requests", type=int, default=None, help="Total de peticiones (ignora --duration).")
+        parser.add_argument("--mix", default=None, help="Pesos por escenario, p. ej. login=10,list=50,report=5.")
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument("--url", help="Servidor ya levantado y sembrado con seed_data.")
+        target.add_argument(
+            "--gunicorn", action="store_true", help="Levanta gunicorn sobre la base configurada, ya sembrada."
+        )
+        parser.add_argument("--app", default=None, help="Por defecto wsgi:application, o asgi:application con --asgi.")
+        parser.add_argument("--asgi", action="store_true", help="Con --gunicorn, sirve la app ASGI con workers de uvicorn.")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--worker-class", default=None, help="Por defecto sync, o UvicornWorker con --asgi.")
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument(
+            "--seed-db",
+            action="store_true",
+            help=(
+                "Con --gunicorn, siembra antes la base configurada (crea un ADMIN con SEED_PASSWORD): "
+                "solo en bases desechables. Sin ella se usan los datos de seed_data."
+            ),
+        )
+        parser.add_argument("--json", action="store_true", help="Imprime el resultado en JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"]) if options["mix"] else None
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        def build(transport):
+            return LoadTest(
+                transport,
+                size=options["size"],
+                seed_value=options["seed"],
+                mix=mix,
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                requests=options["requests"],
+            )
+
+        if options["url"]:
+            result = build(HttpTransport(options["url"])).run()
+        elif options["gunicorn"]:
+            if options["seed_db"]:
+                with transaction.atomic():
+                    seed.seed(size=options["size"], seed_value=options["seed"])
+            app, worker_class = server_options(options["asgi"], options["app"], options["worker_class"])
+            try:
+                with gunicorn_server(app, options["workers"], worker_class, options["threads"]) as (base_url, host):
+                    result = build(HttpTransport(base_url, host=host)).run()
+            except RuntimeError as exc:
+                raise CommandError(str(exc)) from exc
+        else:
+            with test_database():
+                seed.seed(size=options["size"], seed_value=options["seed"])
+                result = build(InProcessTransport()).run()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        self._print(result)
+
+    def _print(self, result):
+        self.stdout.write(
+            f"{result['total']['count']} peticiones en {result['wall_seconds']:.1f} s "
+            f"({result['throughput']:.1f} req/s)"
+        )
+        self.stdout.write(f"{'escenario':<20} {'n':>6} {'fallas':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        rows = list(result["scenarios"].items()) + [("total", {**result["total"], "failures": sum(
+            scenario["failures"] for scenario in result["scenarios"].values()
+        )})]
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:<20} {stats['count']:>6} {stats['failures']:>7} {stats['p50_ms']:>9.1f} "
+                f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+            )
+        self.stdout.write(f"status: {result['statuses']}")
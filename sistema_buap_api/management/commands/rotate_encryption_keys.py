@@ -0,0 +1,116 @@
+from cryptography.fernet import InvalidToken
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sistema_buap_api.cypher_utils import CypherUtils
+from sistema_buap_api.encrypted_fields import BlindIndexField
+
+
+def encrypted_columns():
+    """(modelo, campo) de cada EncryptedTextField del proyecto."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if getattr(field, "encrypted", False)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelve a cifrar con la clave actual (CRYPTO_PASSWORD) los valores cifrados con una clave de "
+        "CRYPTO_PREVIOUS_PASSWORDS y recalcula sus índices ciegos. Sin --column recorre todos los "
+        "EncryptedTextField. Se puede interrumpir y repetir: lo ya rotado se salta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--column",
+            action="append",
+            default=[],
+            metavar="APP.MODELO.CAMPO",
+            help="Columna con texto cifrado por CypherUtils; se puede repetir.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--reindex",
+            action="store_true",
+            help="Recalcula los índices ciegos también de lo ya rotado (p. ej. tras cambiar CRYPTO_BLIND_INDEX_KEY).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta lo que habría que rotar.")
+
+    def handle(self, *args, **options):
+        columns = [self._resolve(spec) for spec in options["column"]] or encrypted_columns()
+        if not columns:
+            raise CommandError("No hay campos cifrados; indicar columnas con --column.")
+        for model, field_name in columns:
+            rotated, current, empty = self._rotate(model, field_name, options)
+            verb = "por rotar" if options["dry_run"] else "rotados"
+            self.stdout.write(
+                f"{model._meta.label}.{field_name}: {rotated} {verb}, {current} ya con la clave actual, {empty} vacíos"
+            )
+
+    def _resolve(self, spec):
+        try:
+            app_label, model_name, field_name = spec.split(".")
+            model = apps.get_model(app_label, model_name)
+            model._meta.get_field(field_name)
+        except (ValueError, LookupError) as exc:
+            raise CommandError(f"Columna inválida: {spec}") from exc
+        return model, field_name
+
+    def _rotate(self, model, field_name, options):
+        field = model._meta.get_field(field_name)
+        indexes = [
+            index for index in model._meta.concrete_fields
+            if isinstance(index, BlindIndexField) and index.source == field_name
+        ]
+        rotated = current = empty = 0
+        last_pk = None
+        while True:
+            # Paginación por pk: cada lote es una consulta de rango y las filas
+            # actualizadas no cambian el orden de las siguientes.
+            queryset = model._base_manager.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            rows = list(queryset.values_list("pk", field_name)[:options["batch_size"]])
+            if not rows:
+                return rotated, current, empty
+            last_pk = rows[-1][0]
+            pending = []
+            for pk, value in rows:
+                if not value:
+                    empty += 1
+                elif CypherUtils.esClaveActual(value):
+                    current += 1
+                    if options["reindex"] and indexes:
+                        pending.append((pk, value))
+                else:
+                    rotated += 1
+                    pending.append((pk, value))
+            if pending and not options["dry_run"]:
+                self._write(model, field, indexes, pending)
+
+    def _write(self, model, field, indexes, pending):
+        try:
+            if getattr(field, "encrypted", False):
+                # El campo cifra al guardar: se le asigna el texto plano y con él
+                # se recalculan los índices ciegos.
+                plaintexts = CypherUtils.desencriptaLote([value for _, value in pending])
+                updates = []
+                for (pk, _), plaintext in zip(pending, plaintexts):
+                    obj = model(pk=pk, **{field.name: plaintext})
+                    for index in indexes:
+                        setattr(obj, index.attname, index.compute(plaintext))
+                    updates.append(obj)
+                update_fields = [field.name] + [index.name for index in indexes]
+            else:
+                updates = [model(pk=pk, **{field.name: CypherUtils.rota(value)}) for pk, value in pending]
+                update_fields = [field.name]
+        except InvalidToken as exc:
+            raise CommandError(
+                f"{model._meta.label}: ninguna clave configurada descifra {field.name} en los pk {pending[0][0]}…{pending[-1][0]}."
+            ) from exc
+        with transaction.atomic():
+            model._base_manager.bulk_update(updates, update_fields)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from sistema_buap_api import seed
+
+
+class Command(BaseCommand):
+    help = "Siembra la base de datos configurada con datos de prueba realistas (para pruebas de carga)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20, help="Número de laboratorios; el resto escala con él.")
+        parser.add_argument("--seed", type=int, default=0, help="Semilla; también prefija emails y matrículas.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            data = seed.seed(size=options["size"], seed_value=options["seed"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(data['labs'])} laboratorios, {len(data['equipos'])} equipos, "
+            f"{len(data['alumnos'])} alumnos y {len(data['tecnicos'])} técnicos creados."
+        ))
+        self.stdout.write(f"Admin: {data['admin'].email} / contraseña: {data['password']}")
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sistema_buap_api import reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Programa en el outbox los recordatorios de reservaciones aprobadas y de devolución de "
+        "préstamos (REMINDER_WINDOWS horas antes). Con --interval se queda corriendo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.REMINDER_BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=0, help="Segundos entre vueltas; 0 corre una vez y sale.")
+        parser.add_argument("--purge-days", type=int, default=0, help="Borra el registro de recordatorios de más de N días.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            result = reminders.schedule(batch_size=options["batch_size"])
+            total = sum(result.values())
+            if total or not options["interval"]:
+                detail = ", ".join(f"{tipo.lower()} {window} h: {count}" for (tipo, window), count in result.items())
+                self.stdout.write(f"{total} recordatorios programados ({detail})")
+            if options["purge_days"]:
+                reminders.purge(options["purge_days"])
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
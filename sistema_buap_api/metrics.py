@@ -0,0 +1,316 @@
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+DESCRIPTIONS = {
+    "http_requests_total": ("counter", "Peticiones HTTP por ruta, método y status."),
+    "http_request_duration_seconds": ("histogram", "Latencia de las peticiones HTTP."),
+    "http_db_queries": ("histogram", "Consultas SQL por petición."),
+    "http_db_query_seconds_total": ("counter", "Tiempo acumulado en consultas SQL."),
+    "http_response_size_bytes": ("histogram", "Tamaño de las respuestas HTTP."),
+    "http_compression_input_bytes_total": ("counter", "Bytes de respuesta antes de comprimir."),
+    "http_compression_output_bytes_total": ("counter", "Bytes de respuesta después de comprimir."),
+    "db_replica_failures_total": ("counter", "Réplicas de lectura marcadas como caídas."),
+    "db_replica_fallbacks_total": ("counter", "Lecturas enviadas al primario por no haber réplicas sanas."),
+    "db_pool_size": ("gauge", "Conexiones máximas del pool por worker."),
+    "db_pool_connections": ("gauge", "Conexiones del pool en uso y libres."),
+    "db_pool_checkouts_total": ("counter", "Conexiones entregadas por el pool, reutilizadas o nuevas."),
+    "db_pool_discarded_total": ("counter", "Conexiones del pool cerradas, por motivo."),
+    "db_pool_wait_seconds_total": ("counter", "Tiempo esperando una conexión libre del pool."),
+    "db_pool_timeouts_total": ("counter", "Peticiones que no obtuvieron conexión del pool a tiempo."),
+    "mail_queue_depth": ("gauge", "Correos esperando en la cola de envío."),
+    "mail_queue_capacity": ("gauge", "Capacidad de la cola de correo por worker."),
+    "mail_sent_total": ("counter", "Correos entregados al servidor SMTP."),
+    "mail_failed_total": ("counter", "Correos descartados por rechazo o tras agotar los reintentos."),
+    "mail_retries_total": ("counter", "Reintentos de envío tras un fallo temporal de SMTP."),
+    "mail_queue_overflow_total": ("counter", "Correos enviados por quien los encoló porque la cola estaba llena."),
+    "outbox_recorded_total": ("counter", "Avisos escritos en el outbox, por tipo."),
+    "outbox_delivered_total": ("counter", "Avisos del outbox entregados por correo."),
+    "outbox_failed_total": ("counter", "Avisos del outbox cuyo correo falló (se reintentan)."),
+    "reminders_scheduled_total": ("counter", "Recordatorios programados, por tipo y ventana en horas."),
+    "reminders_conflicts_total": ("counter", "Lotes de recordatorios que chocaron con otro programador y se releyeron."),
+    "file_storage_dedup_total": ("counter", "Archivos subidos cuyo contenido ya estaba en el storage local."),
+    "images_uploaded_total": ("counter", "Imágenes subidas, por dueño (equipo o lab)."),
+    "image_thumbnails_total": ("counter", "Imágenes procesadas por el pool de miniaturas, por status final."),
+    "reservation_overlaps_rejected_total": ("counter", "Reservaciones rechazadas por traslape de horario."),
+    "loans_approved_total": ("counter", "Préstamos aprobados."),
+    "stock_shortfalls_total": ("counter", "Solicitudes que superan la cantidad disponible de un equipo."),
+}
+
+
+# Contadores e histogramas acumulados de los workers que ya terminaron.
+RETIRED_FILE = "metrics_retired.json"
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _merge(counters, histograms, snapshot):
+    for name, labels, value in snapshot["counters"]:
+        key = _key(name, labels)
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, data in snapshot["histograms"]:
+        key = _key(name, labels)
+        merged = histograms.get(key)
+        if merged is None:
+            histograms[key] = {**data, "counts": list(data["counts"])}
+            continue
+        merged["counts"] = [a + b for a, b in zip(merged["counts"], data["counts"])]
+        merged["sum"] += data["sum"]
+        merged["count"] += data["count"]
+
+
+def _read(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(directory, name, data):
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(descriptor, "w") as handle:
+        json.dump(data, handle)
+    os.replace(temp_path, os.path.join(directory, name))
+
+
+@contextmanager
+def _directory_lock(directory):
+    # Dos scrapes a la vez no deben plegar dos veces el mismo archivo.
+    import fcntl
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".metrics.lock"), "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class Registry:
+    """Métricas en memoria de un proceso.
+
+    Con METRICS_DIR configurado, cada proceso vuelca su estado a un archivo
+    propio cada METRICS_FLUSH_SECONDS (desde un hilo, aunque no reciba
+    peticiones) y el endpoint /metrics suma los archivos de todos los
+    workers. Los archivos de workers que terminaron se pliegan en uno solo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._flushed_at = 0.0
+        self._flusher_pid = None
+
+    def inc(self, name, value=1, **labels):
+        self._ensure_flusher()
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets, **labels):
+        self._ensure_flusher()
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0, "count": 0}
+            for position, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][position] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def register_collector(self, collector):
+        """`collector()` devuelve una lista de (nombre, labels, valor) medidos al momento."""
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        gauges = []
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                gauges.append([name, labels, value])
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, dict(labels), {**histogram, "counts": list(histogram["counts"])}]
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+                "gauges": gauges,
+            }
+
+    def _ensure_flusher(self):
+        # Un hilo por proceso: tras un fork el hijo no lo hereda y arranca el suyo.
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        interval = max(1, getattr(settings, "METRICS_FLUSH_SECONDS", 5))
+        threading.Thread(target=self._flush_periodically, args=(directory, interval), name="metrics-flush", daemon=True).start()
+        # Lo contado desde el último volcado no se pierde al reciclar el worker.
+        atexit.register(self._flush_quietly, directory)
+
+    def _flush_periodically(self, directory, interval):
+        while True:
+            time.sleep(interval)
+            self._flush_quietly(directory)
+
+    def _flush_quietly(self, directory):
+        try:
+            self.flush(directory)
+        except OSError:
+            pass
+
+    def maybe_flush(self):
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        now = time.monotonic()
+        if now - self._flushed_at < getattr(settings, "METRICS_FLUSH_SECONDS", 5):
+            return
+        self.flush(directory)
+
+    def flush(self, directory):
+        self._flushed_at = time.monotonic()
+        _write(directory, f"metrics_{os.getpid()}.json", self.snapshot())
+
+    def collect(self):
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return [self.snapshot()]
+        self.flush(directory)
+        with _directory_lock(directory):
+            self._retire_dead(directory)
+            snapshots = [_read(path) for path in glob.glob(os.path.join(directory, "metrics_*.json"))]
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    def _retire_dead(self, directory):
+        """Pliega los archivos de procesos muertos en RETIRED_FILE y los borra.
+
+        Con `max_requests` gunicorn recicla workers y cada uno deja su
+        archivo: sin plegarlos, cada scrape leería más archivos.
+        """
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        dead = []
+        for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+            if path == retired_path:
+                continue
+            snapshot = _read(path)
+            if snapshot is None or snapshot["pid"] == os.getpid() or _process_alive(snapshot["pid"]):
+                continue
+            dead.append((path, snapshot))
+        if not dead:
+            return
+        counters, histograms = {}, {}
+        for snapshot in [_read(retired_path) or {"counters": [], "histograms": []}, *(snapshot for _, snapshot in dead)]:
+            _merge(counters, histograms, snapshot)
+        _write(directory, RETIRED_FILE, {
+            "pid": None,
+            "counters": [[name, dict(labels), value] for (name, labels), value in counters.items()],
+            "histograms": [[name, dict(labels), data] for (name, labels), data in histograms.items()],
+            "gauges": [],
+        })
+        for path, _ in dead:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def render(self):
+        counters = {}
+        histograms = {}
+        gauges = {}
+        for snapshot in self.collect():
+            _merge(counters, histograms, snapshot)
+            # Los gauges de workers que ya terminaron no reflejan el estado actual.
+            if snapshot["pid"] is not None and (snapshot["pid"] == os.getpid() or _process_alive(snapshot["pid"])):
+                for name, labels, value in snapshot["gauges"]:
+                    key = _key(name, labels)
+                    gauges[key] = gauges.get(key, 0) + value
+
+        lines = []
+        described = set()
+
+        def describe(name, default_type):
+            if name in described:
+                return
+            described.add(name)
+            metric_type, help_text = DESCRIPTIONS.get(name, (default_type, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), value in sorted(counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            describe(name, "gauge")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), data in sorted(histograms.items()):
+            describe(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(data["buckets"], data["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {data['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(data['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
@@ -0,0 +1,220 @@
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from sistema_buap_api import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se negocia gzip.
+    brotli = None
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib crudo.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+
+
+def compress(encoding, level, data):
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(data) + encoder.finish()
+
+
+def accepted_encodings(header):
+    """Devuelve {codificación: q} a partir de Accept-Encoding."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Comprime respuestas con brotli o gzip según Accept-Encoding.
+
+    Omite respuestas pequeñas, las que ya traen Content-Encoding, los
+    archivos que el servidor envía con `wsgi.file_wrapper` y los tipos de
+    contenido sin nivel configurado en COMPRESSION_LEVELS. Las respuestas
+    streaming se comprimen por bloques sin cargarlas completas en memoria.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, "COMPRESSION_ENABLED", True)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 512)
+        self.flush_bytes = getattr(settings, "COMPRESSION_STREAM_FLUSH_BYTES", 16384)
+        self.levels = getattr(settings, "COMPRESSION_LEVELS", {})
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self.enabled or response.has_header("Content-Encoding"):
+            return response
+        # FileResponse con archivo: comprimirlo lo pasaría bloque a bloque por
+        # Python y perdería el envío directo del servidor (sendfile).
+        if getattr(response, "file_to_stream", None) is not None:
+            return response
+
+        levels = self._levels_for(response.get("Content-Type", ""))
+        if not levels:
+            return response
+        # Vary aplica aunque esta respuesta no se comprima: otra sí podría.
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.status_code in {204, 304} or request.method == "HEAD":
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        encoding = self._negotiate(request.headers.get("Accept-Encoding", ""), levels)
+        if encoding is None:
+            return response
+
+        level = levels[encoding]
+        if response.streaming:
+            if getattr(response, "is_async", False):
+                response.streaming_content = self._compress_async(response.streaming_content, encoding, level)
+            else:
+                response.streaming_content = self._compress_stream(response.streaming_content, encoding, level)
+            del response["Content-Length"]
+        else:
+            content = response.content
+            compressed = compress(encoding, level, content)
+            if len(compressed) >= len(content):
+                return response
+            self._record(encoding, len(content), len(compressed))
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # El cuerpo ya no es idéntico byte a byte: la ETag pasa a ser débil.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    def _levels_for(self, content_type):
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        if media_type in self.levels:
+            # Un tipo listado manda sobre el comodín, también con {} (no comprimir).
+            levels = self.levels[media_type]
+        else:
+            levels = self.levels.get(media_type.split("/", 1)[0] + "/*")
+        if not levels:
+            return None
+        return {encoding: level for encoding, level in levels.items() if encoding in ENCODERS}
+
+    def _negotiate(self, header, levels):
+        accepted = accepted_encodings(header)
+        wildcard = accepted.get("*", 0.0)
+        best, best_quality = None, 0.0
+        # Preferencia del servidor en empate: brotli antes que gzip.
+        for encoding in ("br", "gzip"):
+            if encoding not in levels:
+                continue
+            quality = accepted.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _compress_stream(self, chunks, encoding, level):
+        encoder = ENCODERS[encoding](level)
+        pending = raw = sent = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            raw += len(chunk)
+            pending += len(chunk)
+            data = encoder.compress(chunk)
+            # Vacía el compresor periódicamente para que el cliente reciba
+            # datos mientras se generan, sin perder razón de compresión por fila.
+            if pending >= self.flush_bytes:
+                data += encoder.flush()
+                pending = 0
+            if data:
+                sent += len(data)
+                yield data
+        data = encoder.finish()
+        sent += len(data)
+        self._record(encoding, raw, sent)
+        yield data
+
+    async def _compress_async(self, chunks, encoding, level):
+        encoder = ENCODERS[encoding](level)
+        pending = raw = sent = 0
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            raw += len(chunk)
+            pending += len(chunk)
+            data = encoder.compress(chunk)
+            if pending >= self.flush_bytes:
+                data += encoder.flush()
+                pending = 0
+            if data:
+                sent += len(data)
+                yield data
+        data = encoder.finish()
+        sent += len(data)
+        self._record(encoding, raw, sent)
+        yield data
+
+    def _record(self, encoding, raw, sent):
+        metrics.inc("http_compression_input_bytes_total", raw, encoding=encoding)
+        metrics.inc("http_compression_output_bytes_total", sent, encoding=encoding)
@@ -0,0 +1,123 @@
+import contextvars
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from sistema_buap_api import metrics
+
+
+class _QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Estadísticas de la petición en curso. Viaja con el contexto, así que también
+# cuenta las consultas que una vista async ejecuta en otros hilos.
+_current_stats = contextvars.ContextVar("request_query_stats", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def _wrap_connections():
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(_record_query))
+    return stack
+
+
+@contextmanager
+def track_queries():
+    """Cuenta para la petición en curso las consultas de las conexiones de este hilo.
+
+    Las conexiones son por hilo: lo usa cada hilo que hace trabajo de la
+    petición (el de la petición y los del pool de las vistas async). El
+    wrapper se quita al salir, en orden LIFO como espera execute_wrapper().
+    """
+    if _current_stats.get() is None:
+        yield
+        return
+    with _wrap_connections():
+        yield
+
+
+class MetricsMiddleware:
+    """Registra latencia, consultas SQL, tamaño y status por ruta y método."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = _QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with track_queries():
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self._record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats = _QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            # Vistas y middleware síncronos corren en el hilo thread-sensitive
+            # de la petición: ahí se instala el wrapper y ahí mismo se quita.
+            wrapped = await sync_to_async(_wrap_connections, thread_sensitive=True)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrapped.close, thread_sensitive=True)()
+        finally:
+            _current_stats.reset(token)
+        self._record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def _record(self, request, response, elapsed, stats):
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else "<unmatched>"
+        registry = metrics.registry
+        registry.inc("http_requests_total", route=route, method=request.method, status=response.status_code)
+        registry.observe("http_request_duration_seconds", elapsed, metrics.LATENCY_BUCKETS, route=route, method=request.method)
+        registry.observe("http_db_queries", stats.count, metrics.QUERY_BUCKETS, route=route, method=request.method)
+        registry.inc("http_db_query_seconds_total", stats.seconds, route=route, method=request.method)
+        if response.has_header("Content-Length"):
+            size = int(response["Content-Length"])
+        elif not response.streaming:
+            size = len(response.content)
+        else:
+            size = None
+        if size is not None:
+            registry.observe("http_response_size_bytes", size, metrics.SIZE_BUCKETS, route=route, method=request.method)
+        registry.maybe_flush()
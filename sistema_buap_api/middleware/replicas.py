@@ -0,0 +1,122 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from sistema_buap_api import db_router
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+PIN_COOKIE = "primary_pin"
+
+
+def _check_pin_cache():
+    # LocMemCache es por proceso: con varios workers, una escritura atendida
+    # por uno no fija las lecturas que atiende otro. DummyCache no fija nunca.
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if not isinstance(backend, (LocMemCache, DummyCache)):
+        return
+    message = (
+        "REPLICA_DATABASES requiere una caché compartida entre workers (CACHE_REDIS_URL) para "
+        f"fijar al primario a los clientes JWT tras escribir; la caché actual es {type(backend).__name__}."
+    )
+    if not settings.DEBUG:
+        raise ImproperlyConfigured(message)
+    logger.warning(message)
+
+
+def _user_key(request):
+    """Id del usuario del JWT, sin consultar la base (la firma sí se valida)."""
+    header = request.headers.get("Authorization", "")
+    scheme, _, raw = header.partition(" ")
+    if scheme not in api_settings.AUTH_HEADER_TYPES or not raw:
+        return None
+    try:
+        return AccessToken(raw.strip())[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Manda las peticiones de solo lectura a las réplicas.
+
+    Tras una escritura, el usuario queda fijado al primario durante
+    READ_YOUR_WRITES_SECONDS para que lea sus propios cambios aunque la
+    réplica vaya atrasada: por cookie (navegador) y por caché con su id
+    (clientes con JWT). La caché debe ser compartida entre workers: con
+    LocMemCache el middleware no arranca, salvo con DEBUG.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = bool(db_router.replica_aliases())
+        self.window = getattr(settings, "READ_YOUR_WRITES_SECONDS", 5)
+        if self.enabled:
+            _check_pin_cache()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        user_key = _user_key(request)
+        if request.method in SAFE_METHODS:
+            if self._is_pinned(request, user_key):
+                return self.get_response(request)
+            with db_router.replica_reads():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        self._pin(response, user_key)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        user_key = _user_key(request)
+        if request.method in SAFE_METHODS:
+            if await self._ais_pinned(request, user_key):
+                return await self.get_response(request)
+            with db_router.replica_reads():
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        await self._apin(response, user_key)
+        return response
+
+    def _is_pinned(self, request, user_key):
+        if PIN_COOKIE in request.COOKIES:
+            return True
+        return user_key is not None and cache.get(f"primary-pin:{user_key}") is not None
+
+    def _pin(self, response, user_key):
+        if user_key is not None:
+            cache.set(f"primary-pin:{user_key}", 1, self.window)
+        response.set_cookie(PIN_COOKIE, "1", max_age=self.window, httponly=True, samesite="Lax")
+
+    async def _ais_pinned(self, request, user_key):
+        if PIN_COOKIE in request.COOKIES:
+            return True
+        return user_key is not None and await cache.aget(f"primary-pin:{user_key}") is not None
+
+    async def _apin(self, response, user_key):
+        if user_key is not None:
+            await cache.aset(f"primary-pin:{user_key}", 1, self.window)
+        response.set_cookie(PIN_COOKIE, "1", max_age=self.window, httponly=True, samesite="Lax")
@@ -0,0 +1,88 @@
+from django.db import migrations
+
+
+# DDL congelado: esta migración no importa sistema_buap_api.search, que puede
+# cambiar después. Los cambios de índice van en migraciones nuevas (p. ej. 0014).
+SEARCH_INDEXES = {
+    "User": ("first_name", "last_name", "email", "matricula", "departamento", "carrera"),
+    "Lab": ("nombre", "edificio"),
+    "Equipo": ("nombre", "numeroInventario"),
+    "Reservacion": ("motivo",),
+}
+
+
+def _postgresql(qn, table, pk, columns, fields, install):
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] if install else []
+    for field, column in zip(fields, columns):
+        index = qn(f"{table}_{field}_trgm"[:63])
+        if install:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {index} ON {qn(table)} USING gin ((UPPER({qn(column)}::text)) gin_trgm_ops)"
+            )
+        else:
+            statements.append(f"DROP INDEX IF EXISTS {index}")
+    return statements
+
+
+def _mysql(qn, table, pk, columns, fields, install):
+    index = qn(f"{table}_ft"[:64])
+    if install:
+        column_list = ", ".join(qn(column) for column in columns)
+        return [f"ALTER TABLE {qn(table)} ADD FULLTEXT INDEX {index} ({column_list})"]
+    return [f"ALTER TABLE {qn(table)} DROP INDEX {index}"]
+
+
+def _sqlite(qn, table, pk, columns, fields, install):
+    fts = f"{table}_fts"
+    if not install:
+        return [f"DROP TRIGGER IF EXISTS {qn(fts + suffix)}" for suffix in ("_ai", "_ad", "_au")] + [
+            f"DROP TABLE IF EXISTS {qn(fts)}"
+        ]
+    column_list = ", ".join(qn(column) for column in columns)
+    new_values = ", ".join(f"new.{qn(column)}" for column in columns)
+    old_values = ", ".join(f"old.{qn(column)}" for column in columns)
+    delete_old = f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {column_list}) VALUES ('delete', old.{qn(pk)}, {old_values});"
+    insert_new = f"INSERT INTO {qn(fts)}(rowid, {column_list}) VALUES (new.{qn(pk)}, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {qn(fts)} USING fts5({column_list}, "
+        f"content={qn(table)}, content_rowid={qn(pk)}, tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_ai')} AFTER INSERT ON {qn(table)} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_ad')} AFTER DELETE ON {qn(table)} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_au')} AFTER UPDATE ON {qn(table)} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')",
+    ]
+
+
+STATEMENTS = {"postgresql": _postgresql, "mysql": _mysql, "sqlite": _sqlite}
+
+
+def _run(apps, schema_editor, install):
+    connection = schema_editor.connection
+    statements = STATEMENTS.get(connection.vendor)
+    if statements is None:
+        return
+    for model_name, fields in SEARCH_INDEXES.items():
+        model = apps.get_model("sistema_buap_api", model_name)
+        columns = [model._meta.get_field(field).column for field in fields]
+        table, pk = model._meta.db_table, model._meta.pk.column
+        for statement in statements(connection.ops.quote_name, table, pk, columns, fields, install):
+            schema_editor.execute(statement, params=None)
+
+
+def install_search_indexes(apps, schema_editor):
+    _run(apps, schema_editor, install=True)
+
+
+def uninstall_search_indexes(apps, schema_editor):
+    _run(apps, schema_editor, install=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0008_rename_rol_user_role'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_indexes, uninstall_search_indexes),
+    ]
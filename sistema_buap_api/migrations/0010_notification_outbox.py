@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-19 03:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0009_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tipo', models.CharField(choices=[('RESERVACION', 'Reservación'), ('PRESTAMO', 'Préstamo')], max_length=16)),
+                ('objetoId', models.PositiveBigIntegerField()),
+                ('status', models.CharField(max_length=16)),
+                ('detalle', models.JSONField(blank=True, default=dict)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('fechaEnvio', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['fechaEnvio', 'intentos'], name='notificacion_pendiente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-19 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0010_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('RESERVACION', 'Reservación'), ('PRESTAMO', 'Préstamo')], max_length=16)),
+                ('objetoId', models.PositiveBigIntegerField()),
+                ('ventana', models.PositiveSmallIntegerField(help_text='Horas antes del inicio o de la devolución.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='prestamo',
+            index=models.Index(fields=['status', 'fechaDevolucion'], name='prestamo_status_devolucion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservacion',
+            index=models.Index(fields=['status', 'fecha', 'horaInicio'], name='reservacion_status_inicio_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recordatorio',
+            constraint=models.UniqueConstraint(fields=('tipo', 'objetoId', 'ventana'), name='recordatorio_unico'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-19 04:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0011_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Imagen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archivo', models.CharField(max_length=512)),
+                ('url', models.CharField(max_length=1024)),
+                ('contentType', models.CharField(max_length=32)),
+                ('bytes', models.PositiveBigIntegerField()),
+                ('ancho', models.PositiveIntegerField(blank=True, null=True)),
+                ('alto', models.PositiveIntegerField(blank=True, null=True)),
+                ('miniaturas', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('LISTA', 'Lista'), ('ERROR', 'Error')], default='PENDIENTE', max_length=16)),
+                ('equipo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='imagenes', to='sistema_buap_api.equipo')),
+                ('lab', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='imagenes', to='sistema_buap_api.lab')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagen',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('equipo__isnull', False), ('lab__isnull', True)), models.Q(('equipo__isnull', True), ('lab__isnull', False)), _connector='OR'), name='imagen_un_dueno'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-19 04:15
+
+import sistema_buap_api.encrypted_fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0012_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='contactoEmergencia',
+            field=sistema_buap_api.encrypted_fields.EncryptedTextField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='telefono',
+            field=sistema_buap_api.encrypted_fields.EncryptedTextField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='telefonoIndice',
+            field=sistema_buap_api.encrypted_fields.BlindIndexField(normalize=sistema_buap_api.encrypted_fields.digits, source='telefono'),
+        ),
+    ]
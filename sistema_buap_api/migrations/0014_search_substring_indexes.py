@@ -0,0 +1,84 @@
+from django.db import migrations
+
+
+# Motores cuyo índice cambió para buscar subcadenas: FTS5 pasa al tokenizador
+# trigram y el FULLTEXT de MySQL al parser ngram. Los índices pg_trgm no cambian.
+# DDL congelado, como en 0009: no depende de sistema_buap_api.search.
+SEARCH_INDEXES = {
+    "User": ("first_name", "last_name", "email", "matricula", "departamento", "carrera"),
+    "Lab": ("nombre", "edificio"),
+    "Equipo": ("nombre", "numeroInventario"),
+    "Reservacion": ("motivo",),
+}
+
+SQLITE_TOKENIZERS = {"old": "unicode61 remove_diacritics 2", "new": "trigram case_sensitive 0"}
+
+
+def _sqlite(qn, table, pk, columns, version):
+    fts = f"{table}_fts"
+    column_list = ", ".join(qn(column) for column in columns)
+    new_values = ", ".join(f"new.{qn(column)}" for column in columns)
+    old_values = ", ".join(f"old.{qn(column)}" for column in columns)
+    delete_old = f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {column_list}) VALUES ('delete', old.{qn(pk)}, {old_values});"
+    insert_new = f"INSERT INTO {qn(fts)}(rowid, {column_list}) VALUES (new.{qn(pk)}, {new_values});"
+    return [
+        *(f"DROP TRIGGER IF EXISTS {qn(fts + suffix)}" for suffix in ("_ai", "_ad", "_au")),
+        f"DROP TABLE IF EXISTS {qn(fts)}",
+        f"CREATE VIRTUAL TABLE {qn(fts)} USING fts5({column_list}, "
+        f"content={qn(table)}, content_rowid={qn(pk)}, tokenize='{SQLITE_TOKENIZERS[version]}')",
+        f"CREATE TRIGGER {qn(fts + '_ai')} AFTER INSERT ON {qn(table)} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {qn(fts + '_ad')} AFTER DELETE ON {qn(table)} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {qn(fts + '_au')} AFTER UPDATE ON {qn(table)} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')",
+    ]
+
+
+def _mysql(qn, table, pk, columns, version):
+    index = qn(f"{table}_ft"[:64])
+    column_list = ", ".join(qn(column) for column in columns)
+    statements = [f"ALTER TABLE {qn(table)} DROP INDEX {index}"]
+    if version == "old":
+        return statements + [f"ALTER TABLE {qn(table)} ADD FULLTEXT INDEX {index} ({column_list})"]
+    # Con stopwords, ngram descarta todo n-grama que contenga una ("a", "i",
+    # ...) y las subcadenas con esas letras no se encuentran.
+    return statements + [
+        "SET @previous_stopword = @@SESSION.innodb_ft_enable_stopword",
+        "SET SESSION innodb_ft_enable_stopword = 0",
+        f"ALTER TABLE {qn(table)} ADD FULLTEXT INDEX {index} ({column_list}) WITH PARSER ngram",
+        "SET SESSION innodb_ft_enable_stopword = @previous_stopword",
+    ]
+
+
+STATEMENTS = {"sqlite": _sqlite, "mysql": _mysql}
+
+
+def _rebuild(apps, schema_editor, version):
+    connection = schema_editor.connection
+    statements = STATEMENTS.get(connection.vendor)
+    if statements is None:
+        return
+    for model_name, fields in SEARCH_INDEXES.items():
+        model = apps.get_model("sistema_buap_api", model_name)
+        columns = [model._meta.get_field(field).column for field in fields]
+        table, pk = model._meta.db_table, model._meta.pk.column
+        for statement in statements(connection.ops.quote_name, table, pk, columns, version):
+            schema_editor.execute(statement, params=None)
+
+
+def rebuild_search_indexes(apps, schema_editor):
+    _rebuild(apps, schema_editor, "new")
+
+
+def restore_search_indexes(apps, schema_editor):
+    _rebuild(apps, schema_editor, "old")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0013_user_contact_encrypted'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_indexes, restore_search_indexes),
+    ]
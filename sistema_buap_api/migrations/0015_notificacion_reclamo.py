@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-19 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sistema_buap_api', '0014_search_substring_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='reclamadoHasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
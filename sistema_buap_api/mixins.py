@@ -0,0 +1,339 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import parse_etags, patch_cache_control, patch_vary_headers
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from sistema_buap_api import fastpath, images
+from sistema_buap_api.serializers import ImagenSerializer
+
+
+def _resolve_lookup(instance, lookup):
+    value = instance
+    for attr in lookup.split("__"):
+        if value is None:
+            return None
+        value = getattr(value, attr)
+    return value
+
+
+class ConditionalGetMixin:
+    """ETag y GET condicional para viewsets de modelos con `updated_at`.
+
+    La ETag de un listado sale de una sola consulta agregada sobre el queryset
+    ya filtrado (MAX(updated_at) y COUNT) más los parámetros de la petición;
+    la de un detalle, del `updated_at` del objeto. Si el cliente ya tiene esa
+    versión se responde 304 sin serializar nada.
+    """
+
+    etag_timestamp_field = "updated_at"
+
+    def get_etag_timestamps(self):
+        """Lookups de timestamps que cambian con la representación.
+
+        None desactiva la ETag, p. ej. si se incrusta un modelo sin timestamp.
+        """
+        return [self.etag_timestamp_field]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        timestamps = self.get_etag_timestamps()
+        if timestamps is None:
+            return self.list_response(queryset)
+        summary = queryset.order_by().aggregate(
+            total=Count("pk"),
+            **{f"last_{index}": Max(lookup) for index, lookup in enumerate(timestamps)},
+        )
+        parts = [summary[f"last_{index}"] for index in range(len(timestamps))]
+        etag = self._make_etag(request, "list", summary["total"], *parts)
+        if self._is_not_modified(request, etag):
+            return self._not_modified(etag)
+        return self._with_etag(self.list_response(queryset), etag)
+
+    def list_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        timestamps = self.get_etag_timestamps()
+        if timestamps is None:
+            return Response(self.get_serializer(instance).data)
+        parts = [_resolve_lookup(instance, lookup) for lookup in timestamps]
+        etag = self._make_etag(request, "detail", instance.pk, *parts)
+        if self._is_not_modified(request, etag):
+            return self._not_modified(etag)
+        return self._with_etag(Response(self.get_serializer(instance).data), etag)
+
+    def _make_etag(self, request, kind, *parts):
+        # La representación depende del usuario (los alumnos solo ven lo suyo),
+        # de los parámetros (filtros, búsqueda, página) y del formato negociado.
+        media_type = getattr(request, "accepted_media_type", "") or ""
+        key = "|".join(
+            str(part)
+            for part in (
+                self.queryset.model._meta.label,
+                kind,
+                getattr(request.user, "pk", ""),
+                media_type,
+                request.META.get("QUERY_STRING", ""),
+                *parts,
+            )
+        )
+        return '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    def _is_not_modified(self, request, etag):
+        if request.method not in {"GET", "HEAD"}:
+            return False
+        header = request.headers.get("If-None-Match")
+        if not header:
+            return False
+        # Comparación débil: la compresión puede haber marcado la ETag como W/.
+        candidates = {tag.removeprefix("W/") for tag in parse_etags(header)}
+        return "*" in candidates or etag in candidates
+
+    def _not_modified(self, etag):
+        return self._with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+    def _with_etag(self, response, etag):
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+class FastListMixin:
+    """Listados de solo lectura sin ModelSerializer.
+
+    Lee la página con `.values_list()` y arma cada fila con los conversores
+    precompilados de `fastpath`, con la misma salida que el serializer. Si el
+    serializer tiene campos no planos se usa el camino normal. Va antes de
+    ConditionalGetMixin, que es quien llama a `list_response`.
+    """
+
+    def list_response(self, queryset):
+        # Los campos del serializer que usaría la vista (p. ej. tras ?fields=).
+        fields = self.get_serializer().fields
+        if any(isinstance(field, serializers.BaseSerializer) for field in fields.values()):
+            return super().list_response(queryset)
+        plan = fastpath.plan_for(self.get_serializer_class(), tuple(fields))
+        if plan is None:
+            return super().list_response(queryset)
+        rows = queryset.values_list(*plan.columns)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(rows))
+
+
+def _split_param(value):
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+
+class SparseFieldsetMixin:
+    """`?fields=` y `?omit=` en listados y detalles.
+
+    Los nombres se validan contra `sparse_allowlist()` del serializer. La
+    selección recorta la respuesta y también las columnas de la consulta
+    (`.only()`; el camino rápido usa `.values_list()` con las mismas).
+    """
+
+    sparse_actions = {"list", "retrieve"}
+
+    def get_sparse_fields(self):
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self._parse_sparse_fields()
+        return self._sparse_fields
+
+    def _parse_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        fields = _split_param(params.get("fields"))
+        omit = _split_param(params.get("omit"))
+        if not fields and not omit:
+            return None
+        allowed = self.get_serializer_class().sparse_allowlist()
+        unknown = sorted(set(fields + omit) - set(allowed))
+        if unknown:
+            raise ValidationError({
+                "fields": f"Campos no permitidos: {', '.join(unknown)}. Disponibles: {', '.join(allowed)}."
+            })
+        return tuple(name for name in allowed if (not fields or name in fields) and name not in omit)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = self._sparse_columns(fields)
+        if columns is None:
+            return queryset
+        # Las respuestas solo llevan el pk de las relaciones: los JOIN sobran
+        # y además select_related no puede atravesar un campo diferido.
+        return queryset.select_related(None).only(*columns)
+
+    def _sparse_columns(self, fields):
+        serializer = self.get_serializer()
+        columns = set()
+        for name in fields:
+            field = serializer.fields[name]
+            if not _is_model_column(serializer.Meta.model, field.source):
+                return None
+            columns.add(field.source)
+            if isinstance(field, serializers.BaseSerializer):
+                # Relación incrustada con ?expand=: sus columnas viajan en el JOIN.
+                related_model = field.Meta.model
+                for child in field.fields.values():
+                    if child.write_only:
+                        continue
+                    if not _is_model_column(related_model, child.source):
+                        return None
+                    columns.add(f"{field.source}__{child.source}")
+        # La ETag lee los timestamps: se cargan siempre para no diferirlos.
+        if hasattr(self, "get_etag_timestamps"):
+            columns.update(self.get_etag_timestamps() or ())
+        return sorted(columns)
+
+
+def _is_model_column(model, source):
+    if source == "*" or "." in source:
+        return False
+    try:
+        model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class ExpandMixin:
+    """`?expand=lab,user` incrusta relaciones en lugar de sus ids.
+
+    Las relaciones válidas son las de `Meta.expandable_fields` del serializer
+    y se resuelven con select_related: un solo JOIN por página, sin importar
+    cuántas filas tenga. Va antes de SparseFieldsetMixin y ConditionalGetMixin.
+    """
+
+    expand_actions = {"list", "retrieve"}
+
+    def get_expand_fields(self):
+        if not hasattr(self, "_expand_fields"):
+            self._expand_fields = self._parse_expand_fields()
+        return self._expand_fields
+
+    def _parse_expand_fields(self):
+        if self.action not in self.expand_actions:
+            return ()
+        names = _split_param(self.request.query_params.get("expand"))
+        allowed = tuple(getattr(self.get_serializer_class().Meta, "expandable_fields", {}))
+        unknown = sorted(set(names) - set(allowed))
+        if unknown:
+            raise ValidationError({
+                "expand": f"Relaciones no expandibles: {', '.join(unknown)}. Disponibles: {', '.join(allowed)}."
+            })
+        return tuple(name for name in allowed if name in names)
+
+    def get_serializer(self, *args, **kwargs):
+        expand = self.get_expand_fields()
+        if expand:
+            kwargs.setdefault("expand", expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def _expanded_sources(self):
+        # Solo las relaciones que siguen en la respuesta (?fields= puede quitarlas).
+        fields = self.get_serializer().fields
+        return [
+            fields[name].source
+            for name in self.get_expand_fields()
+            if isinstance(fields.get(name), serializers.BaseSerializer)
+        ]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.get_expand_fields():
+            return queryset
+        sources = self._expanded_sources()
+        return queryset.select_related(*sources) if sources else queryset
+
+    def get_etag_timestamps(self):
+        timestamps = super().get_etag_timestamps()
+        if timestamps is None or not self.get_expand_fields():
+            return timestamps
+        model = self.get_serializer_class().Meta.model
+        timestamps = list(timestamps)
+        for source in self._expanded_sources():
+            related_model = model._meta.get_field(source).related_model
+            try:
+                related_model._meta.get_field(self.etag_timestamp_field)
+            except FieldDoesNotExist:
+                # Sin timestamp no se puede saber si cambió lo incrustado.
+                return None
+            timestamps.append(f"{source}__{self.etag_timestamp_field}")
+        return timestamps
+
+
+class ImageAttachmentMixin:
+    """Imágenes de un Equipo o Lab en `{id}/images/`.
+
+    GET lista las imágenes del objeto, POST (multipart, campo `imagen`, una o
+    varias) las sube y DELETE `{id}/images/{image_id}/` borra una. Las
+    miniaturas se generan fuera de la petición: una imagen recién subida
+    responde con status PENDIENTE y sin miniaturas.
+    """
+
+    image_write_actions = {"upload_images", "delete_image"}
+
+    @action(detail=True, methods=["get"], url_path="images")
+    def images(self, request, pk=None):
+        owner = self.get_object()
+        queryset = owner.imagenes.order_by("id")
+        return Response(ImagenSerializer(queryset, many=True, context=self.get_serializer_context()).data)
+
+    @images.mapping.post
+    def upload_images(self, request, pk=None):
+        owner = self.get_object()
+        uploads = request.FILES.getlist("imagen")
+        if not uploads:
+            raise ValidationError({"imagen": "Adjunta al menos una imagen."})
+        # Se validan todas antes de subir la primera: un rechazo no deja
+        # archivos sueltos en el storage.
+        try:
+            for upload in uploads:
+                images.validate(upload)
+        except DjangoValidationError as exc:
+            raise ValidationError({"imagen": exc.messages}) from exc
+        # Las subidas van antes de la transacción: no la tienen abierta
+        # durante la red y, si falla algo, lo ya subido se borra.
+        stored = []
+        try:
+            for upload in uploads:
+                stored.append(images.store(owner, upload))
+            with transaction.atomic():
+                created = [images.attach(owner, item) for item in stored]
+        except BaseException:
+            images.discard(stored)
+            raise
+        data = ImagenSerializer(created, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["delete"], url_path=r"images/(?P<image_id>[0-9]+)")
+    def delete_image(self, request, pk=None, image_id=None):
+        owner = self.get_object()
+        imagen = get_object_or_404(owner.imagenes, pk=image_id)
+        # Los archivos los borra el receptor post_delete al confirmar.
+        imagen.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from sistema_buap_api.encrypted_fields import BlindIndexField, EncryptedModelMixin, EncryptedQuerySet, EncryptedTextField, digits
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -10,7 +12,7 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager.from_queryset(EncryptedQuerySet)):
     def create_user(self, email, matricula, password=None, **extra_fields):
         if not email:
             raise ValueError("El email es obligatorio")
@@ -29,7 +31,7 @@ class UserManager(BaseUserManager):
         return self.create_user(email, matricula, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(EncryptedModelMixin, AbstractUser):
     class UserRole(models.TextChoices):
         ADMIN = "ADMIN", "Admin"
         TECNICO = "TECNICO", "Tecnico"
@@ -41,6 +43,11 @@ class User(AbstractUser):
     role = models.CharField(max_length=16, choices=UserRole.choices, default=UserRole.ESTUDIANTE)
     departamento = models.CharField(max_length=255, blank=True)
     carrera = models.CharField(max_length=255, blank=True)
+    # Datos de contacto cifrados en reposo; telefonoIndice permite buscar por
+    # teléfono con User.objects.filter_blind(telefono=...).
+    telefono = EncryptedTextField(max_length=32, blank=True, default="")
+    telefonoIndice = BlindIndexField(source="telefono", normalize=digits)
+    contactoEmergencia = EncryptedTextField(max_length=255, blank=True, default="")
 
     objects = UserManager()
 
@@ -111,6 +118,7 @@ class Reservacion(TimeStampedModel):
 
     class Meta:
         ordering = ["-fecha", "-horaInicio"]
+        indexes = [models.Index(fields=["status", "fecha", "horaInicio"], name="reservacion_status_inicio_idx")]
 
     def __str__(self):
         return f"Reservation #{self.pk}"
@@ -134,6 +142,89 @@ class Prestamo(TimeStampedModel):
 
     class Meta:
         ordering = ["-fechaPrestamo"]
+        indexes = [models.Index(fields=["status", "fechaDevolucion"], name="prestamo_status_devolucion_idx")]
+
+    def __str__(self):
+        return f"Loan #{self.pk}"
+
+class Notificacion(TimeStampedModel):
+    """Outbox de avisos por correo.
+
+    Se escribe en la misma transacción que el cambio de status que la origina
+    y la entrega después `drain_outbox`, fuera de la petición.
+    """
+
+    class Tipo(models.TextChoices):
+        RESERVACION = "RESERVACION", "Reservación"
+        PRESTAMO = "PRESTAMO", "Préstamo"
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notificaciones")
+    tipo = models.CharField(max_length=16, choices=Tipo.choices)
+    objetoId = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=16)
+    detalle = models.JSONField(default=dict, blank=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    fechaEnvio = models.DateTimeField(null=True, blank=True)
+    # Un drenador tomó el aviso y lo está enviando; nadie más lo toma hasta
+    # esta fecha (OUTBOX_CLAIM_SECONDS), aunque el envío no termine.
+    reclamadoHasta = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["fechaEnvio", "intentos"], name="notificacion_pendiente_idx")]
+
+    def __str__(self):
+        return f"Notificacion #{self.pk} {self.tipo} {self.objetoId} -> {self.status}"
+
+
+class Recordatorio(models.Model):
+    """Recordatorio ya programado: uno por objeto y ventana, nunca dos."""
+
+    tipo = models.CharField(max_length=16, choices=Notificacion.Tipo.choices)
+    objetoId = models.PositiveBigIntegerField()
+    ventana = models.PositiveSmallIntegerField(help_text="Horas antes del inicio o de la devolución.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tipo", "objetoId", "ventana"], name="recordatorio_unico"),
+        ]
+
+    def __str__(self):
+        return f"Recordatorio {self.tipo} {self.objetoId} ({self.ventana} h)"
+
+
+class Imagen(TimeStampedModel):
+    """Imagen de un equipo o un laboratorio, guardada en el storage de archivos.
+
+    `archivo` es el nombre en el storage; `miniaturas` mapea el lado máximo en
+    pixeles a {"name", "url"} y lo llena el pool de miniaturas (images.py).
+    """
+
+    class ImagenStatus(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        LISTA = "LISTA", "Lista"
+        ERROR = "ERROR", "Error"
+
+    equipo = models.ForeignKey(Equipo, on_delete=models.CASCADE, null=True, blank=True, related_name="imagenes")
+    lab = models.ForeignKey(Lab, on_delete=models.CASCADE, null=True, blank=True, related_name="imagenes")
+    archivo = models.CharField(max_length=512)
+    url = models.CharField(max_length=1024)
+    contentType = models.CharField(max_length=32)
+    bytes = models.PositiveBigIntegerField()
+    ancho = models.PositiveIntegerField(null=True, blank=True)
+    alto = models.PositiveIntegerField(null=True, blank=True)
+    miniaturas = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=ImagenStatus.choices, default=ImagenStatus.PENDIENTE)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(equipo__isnull=False, lab__isnull=True) | models.Q(equipo__isnull=True, lab__isnull=False),
+                name="imagen_un_dueno",
+            ),
+        ]
 
     def __str__(self):
-        return f"Loan #{self.pk}"
\ No newline at end of file
+        return f"Imagen #{self.pk} [{self.status}]"
@@ -0,0 +1,186 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+from sistema_buap_api import metrics, models
+
+
+STATUS_LABELS = {
+    models.Notificacion.Tipo.RESERVACION: dict(models.Reservacion.ReservacionStatus.choices),
+    models.Notificacion.Tipo.PRESTAMO: dict(models.Prestamo.PrestamoStatus.choices),
+}
+
+
+def record_reservation(reservacion):
+    """Agrega al outbox el cambio de status de una reservación.
+
+    Debe llamarse dentro de la transacción que guarda el cambio: si esta se
+    revierte, el aviso también. Usa solo datos ya cargados (lab por
+    select_related), así que cuesta un INSERT.
+    """
+    detalle = {
+        "lab": reservacion.lab.nombre,
+        "fecha": reservacion.fecha.isoformat(),
+        "horaInicio": reservacion.horaInicio.strftime("%H:%M"),
+        "horaFin": reservacion.horaFin.strftime("%H:%M"),
+    }
+    if reservacion.razonCancelacion:
+        detalle["razonCancelacion"] = reservacion.razonCancelacion
+    return _record(reservacion.user_id, models.Notificacion.Tipo.RESERVACION, reservacion, detalle)
+
+
+def record_loan(prestamo):
+    """Agrega al outbox el cambio de status de un préstamo (ver `record_reservation`)."""
+    detalle = {
+        "equipo": prestamo.equipo.nombre,
+        "cantidad": prestamo.cantidad,
+        "fechaPrestamo": prestamo.fechaPrestamo.isoformat(),
+        "fechaDevolucion": prestamo.fechaDevolucion.isoformat(),
+    }
+    return _record(prestamo.user_id, models.Notificacion.Tipo.PRESTAMO, prestamo, detalle)
+
+
+def _record(user_id, tipo, instance, detalle):
+    notificacion = models.Notificacion.objects.create(
+        user_id=user_id,
+        tipo=tipo,
+        objetoId=instance.pk,
+        status=instance.status,
+        detalle=detalle,
+    )
+    metrics.inc("outbox_recorded_total", tipo=tipo)
+    return notificacion
+
+
+def claim_seconds():
+    # Debe cubrir la espera más larga de send_messages_sync: un aviso cuyo
+    # envío no terminó a tiempo no se vuelve a tomar antes de que venza.
+    wait = settings.EMAIL_TIMEOUT * (settings.EMAIL_MAX_RETRIES + 1) + 60
+    return max(getattr(settings, "OUTBOX_CLAIM_SECONDS", 900), 2 * wait)
+
+
+def _claim(batch_size, now):
+    """Toma un lote de avisos pendientes y lo marca como reclamado; transacción corta."""
+    # Solo avisos con OUTBOX_DELAY_SECONDS de antigüedad: los cambios seguidos
+    # de un mismo usuario alcanzan a juntarse en un solo correo.
+    queryset = models.Notificacion.objects.select_related("user").filter(
+        Q(reclamadoHasta__isnull=True) | Q(reclamadoHasta__lte=now),
+        fechaEnvio__isnull=True,
+        intentos__lt=getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5),
+        created_at__lte=now - timedelta(seconds=getattr(settings, "OUTBOX_DELAY_SECONDS", 30)),
+    )
+    features = connections[DEFAULT_DB_ALIAS].features
+    if features.has_select_for_update_skip_locked:
+        # Varios drenadores a la vez se reparten los avisos en lugar de duplicarlos.
+        of = ("self",) if features.has_select_for_update_of else ()
+        queryset = queryset.select_for_update(skip_locked=True, of=of)
+    with transaction.atomic():
+        batch = list(queryset.order_by("id")[:batch_size])
+        if batch:
+            models.Notificacion.objects.filter(pk__in=[notificacion.pk for notificacion in batch]).update(
+                reclamadoHasta=now + timedelta(seconds=claim_seconds())
+            )
+    return batch
+
+
+def render(user, notificaciones):
+    """Asunto y cuerpo HTML de un solo correo con todos los avisos del usuario."""
+    items = []
+    for notificacion in notificaciones:
+        detalle = notificacion.detalle
+        status = STATUS_LABELS[notificacion.tipo].get(notificacion.status, notificacion.status)
+        if detalle.get("recordatorio"):
+            # Recordatorios de reminders.schedule: la ventana en lugar del status.
+            status = f"Recordatorio: en las próximas {detalle['recordatorio']} h"
+        if notificacion.tipo == models.Notificacion.Tipo.RESERVACION:
+            text = format_html(
+                "Reservación de {} el {} de {} a {}: <strong>{}</strong>",
+                detalle.get("lab"),
+                detalle.get("fecha"),
+                detalle.get("horaInicio"),
+                detalle.get("horaFin"),
+                status,
+            )
+            if detalle.get("razonCancelacion"):
+                text = format_html("{} ({})", text, detalle["razonCancelacion"])
+        else:
+            text = format_html(
+                "Préstamo de {} ({} unidades) del {} al {}: <strong>{}</strong>",
+                detalle.get("equipo"),
+                detalle.get("cantidad"),
+                detalle.get("fechaPrestamo"),
+                detalle.get("fechaDevolucion"),
+                status,
+            )
+        items.append((text,))
+
+    if len(notificaciones) == 1:
+        subject = "Actualización de tu solicitud"
+    else:
+        subject = f"{len(notificaciones)} actualizaciones de tus solicitudes"
+    body = format_html(
+        "<p>Hola {}:</p><ul>{}</ul><p>Sistema de laboratorios BUAP</p>",
+        user.first_name or user.email,
+        format_html_join("", "<li>{}</li>", items),
+    )
+    return subject, body
+
+
+def drain(batch_size=200):
+    """Entrega un lote del outbox: un correo por usuario con todos sus avisos.
+
+    El lote se reclama en una transacción corta y el correo sale fuera de
+    ella: la espera por SMTP no deja filas bloqueadas en notificacion. Los
+    avisos entregados se marcan con `fechaEnvio`; a los que fallan se les
+    suma un intento y se reintentan en la siguiente vuelta hasta
+    OUTBOX_MAX_ATTEMPTS. Si la espera vence sin resultado, el aviso queda
+    reclamado hasta que vence el reclamo en lugar de reenviarse de
+    inmediato. Regresa (avisos, correos enviados, correos fallidos, correos
+    sin resultado).
+    """
+    from sistema_buap_api.puentes.mail import MailsBridge
+
+    batch = _claim(batch_size, timezone.now())
+    by_user = defaultdict(list)
+    for notificacion in batch:
+        by_user[notificacion.user_id].append(notificacion)
+
+    groups = list(by_user.values())
+    messages = []
+    for notificaciones in groups:
+        user = notificaciones[0].user
+        subject, body = render(user, notificaciones)
+        messages.append(
+            MailsBridge.build_message(subject, "", settings.DEFAULT_FROM_EMAIL, user.email, html_message_custom=body)
+        )
+    delivered = MailsBridge.send_messages_sync(messages) if messages else []
+
+    sent_ids, failed_ids = [], []
+    for notificaciones, ok in zip(groups, delivered):
+        if ok is not None:
+            (sent_ids if ok else failed_ids).extend(notificacion.pk for notificacion in notificaciones)
+    with transaction.atomic():
+        if sent_ids:
+            models.Notificacion.objects.filter(pk__in=sent_ids).update(fechaEnvio=timezone.now(), reclamadoHasta=None)
+        if failed_ids:
+            models.Notificacion.objects.filter(pk__in=failed_ids).update(
+                intentos=F("intentos") + 1, reclamadoHasta=None
+            )
+
+    sent_mails = delivered.count(True)
+    failed_mails = delivered.count(False)
+    metrics.inc("outbox_delivered_total", len(sent_ids))
+    metrics.inc("outbox_failed_total", len(failed_ids))
+    return len(batch), sent_mails, failed_mails, len(delivered) - sent_mails - failed_mails
+
+
+def purge(days):
+    """Borra los avisos entregados hace más de `days` días."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = models.Notificacion.objects.filter(fechaEnvio__lt=cutoff).delete()
+    return deleted
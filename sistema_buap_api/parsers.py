@@ -0,0 +1,41 @@
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from sistema_buap_api import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser que usa orjson cuando está instalado y el cuerpo viene en UTF-8."""
+
+    renderer_class = renderers.FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rechaza NaN e Infinity igual que el modo estricto de DRF.
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = "application/msgpack"
+    renderer_class = renderers.MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
@@ -1,12 +1,13 @@
 from django.conf import settings
-from django.http import HttpResponse, Http404
 from django.core.mail import EmailMessage
-from rest_framework import status
-from rest_framework.response import Response
-from django.core.mail import EmailMessage
-import datetime
-import os
-import threading
+
+from sistema_buap_api.puentes.mail_queue import mail_queue
+
+# Vocales acentuadas a entidades HTML, en una sola pasada.
+HTML_ACCENTS = str.maketrans({
+    "á": "&aacute;", "é": "&eacute;", "í": "&iacute;", "ó": "&oacute;", "ú": "&uacute;",
+    "Á": "&Aacute;", "É": "&Eacute;", "Í": "&Iacute;", "Ó": "&Oacute;", "Ú": "&Uacute;",
+})
 
 class MailsBridge:
 
@@ -14,30 +15,38 @@ class MailsBridge:
     def send_mail_async(subject=None,reply_email=None, from_email=None,to_email=None,cc=None,bcc=None,html_message=None):
 
         if html_message:
-            html_message = html_message.replace("á","&aacute;")
-            html_message = html_message.replace("é","&eacute;")
-            html_message = html_message.replace("í","&iacute;")
-            html_message = html_message.replace("ó","&oacute;")
-            html_message = html_message.replace("ú","&uacute;")
-            html_message = html_message.replace("Á","&Aacute;")
-            html_message = html_message.replace("É","&Eacute;")
-            html_message = html_message.replace("Í","&Iacute;")
-            html_message = html_message.replace("Ó","&Oacute;")
-            html_message = html_message.replace("Ú","&Uacute;")
-
-        send_thread = threading.Thread(target=MailsBridge.send_mail_sync, args=(subject, reply_email, from_email, to_email, cc, bcc, html_message))
-        send_thread.start() 
+            html_message = html_message.translate(HTML_ACCENTS)
+
+        # La cola de correo (puentes.mail_queue) lo entrega con una conexión SMTP
+        # compartida y reintentos, en lugar de abrir un hilo y una conexión por correo.
+        mail_queue.enqueue(MailsBridge.build_message(subject, reply_email, from_email, to_email, cc, bcc, html_message))
 
     @staticmethod
     def send_mail_sync(subject=None,reply_email=None, from_email=None,to_email=None,cc=None,bcc=None,html_message_custom=None):
+        """Encola el correo y espera a que se entregue; regresa True si salió."""
+        msg = MailsBridge.build_message(subject, reply_email, from_email, to_email, cc, bcc, html_message_custom)
+        return mail_queue.enqueue(msg, wait=True, timeout=settings.EMAIL_TIMEOUT * (settings.EMAIL_MAX_RETRIES + 1) + 60)
+
+    @staticmethod
+    def send_messages_sync(messages):
+        """Entrega varios EmailMessage a la vez por la cola; regresa si salió cada uno (None: sin resultado aún)."""
+        return mail_queue.enqueue_many(messages, timeout=settings.EMAIL_TIMEOUT * (settings.EMAIL_MAX_RETRIES + 1) + 60)
+
+    @staticmethod
+    def build_message(subject=None,reply_email=None, from_email=None,to_email=None,cc=None,bcc=None,html_message_custom=None):
 
         headers = {}
-        if reply_email!="":
+        if reply_email:
             headers = {'Reply-To': reply_email}
-            
-        if cc:
-            msg = EmailMessage(subject, html_message_custom, from_email, [to_email], bcc=[bcc], headers=headers, cc=[cc])
-        else:
-            msg = EmailMessage(subject, html_message_custom, from_email, [to_email], bcc=[bcc], headers=headers)
+
+        msg = EmailMessage(
+            subject,
+            html_message_custom,
+            from_email,
+            [to_email],
+            bcc=[bcc] if bcc else None,
+            headers=headers,
+            cc=[cc] if cc else None,
+        )
         msg.content_subtype = "html"
-        res = msg.send()
\ No newline at end of file
+        return msg
@@ -0,0 +1,221 @@
+import logging
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from sistema_buap_api import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_permanent(exc):
+    """Rechazos 5xx del servidor o de todos los destinatarios: reintentar no los arregla."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+class _Envelope:
+    __slots__ = ("message", "done", "sent", "finished")
+
+    def __init__(self, message, wait=False):
+        self.message = message
+        self.done = threading.Event() if wait else None
+        self.sent = False
+        self.finished = False
+
+    def finish(self, sent):
+        self.sent = sent
+        self.finished = True
+        if self.done is not None:
+            self.done.set()
+
+
+class MailQueue:
+    """Cola acotada de correos atendida por unos pocos hilos.
+
+    Cada hilo mantiene abierta su conexión SMTP mientras haya trabajo (se
+    cierra tras EMAIL_CONNECTION_IDLE_SECONDS sin correos), toma hasta
+    EMAIL_BATCH_SIZE mensajes por vuelta y reintenta los fallos temporales
+    con backoff exponencial. Si la cola está llena, quien encola espera
+    EMAIL_QUEUE_PUT_TIMEOUT segundos y después envía él mismo: la ráfaga se
+    frena en el origen en lugar de perder correos o crecer sin límite.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._workers = []
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _setting(self, name, default):
+        return getattr(settings, name, default)
+
+    def _ensure_started(self):
+        # Tras un fork (workers de gunicorn) los hilos del padre no existen; un
+        # hilo que murió por un error inesperado también se reemplaza.
+        if self._pid == os.getpid() and all(worker.is_alive() for worker in self._workers):
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._setting("EMAIL_QUEUE_SIZE", 1000))
+                self._workers = [None] * self._setting("EMAIL_QUEUE_WORKERS", 2)
+                self._pid = os.getpid()
+            for index, worker in enumerate(self._workers):
+                if worker is not None and worker.is_alive():
+                    continue
+                if worker is not None:
+                    logger.error("El hilo %s de la cola de correo murió; se reinicia", worker.name)
+                worker = threading.Thread(target=self._work, name=f"mail-{index}", daemon=True)
+                worker.start()
+                self._workers[index] = worker
+
+    def enqueue(self, message, wait=False, timeout=None):
+        """Encola un EmailMessage. Con `wait=True` espera la entrega y dice si salió."""
+        envelope = self._put(message, wait)
+        if wait:
+            envelope.done.wait(timeout)
+        return envelope.sent
+
+    def enqueue_many(self, messages, timeout=None):
+        """Encola varios mensajes, espera a que se entreguen y regresa si salió cada uno.
+
+        True si se entregó, False si falló y None si al vencer `timeout` aún
+        no había resultado (puede entregarse después).
+        """
+        envelopes = [self._put(message, wait=True) for message in messages]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for envelope in envelopes:
+            envelope.done.wait(None if deadline is None else max(0, deadline - time.monotonic()))
+        return [envelope.sent if envelope.finished else None for envelope in envelopes]
+
+    def _put(self, message, wait):
+        self._ensure_started()
+        envelope = _Envelope(message, wait=wait)
+        try:
+            self._queue.put(envelope, timeout=self._setting("EMAIL_QUEUE_PUT_TIMEOUT", 2))
+        except queue.Full:
+            metrics.inc("mail_queue_overflow_total")
+            self.deliver([envelope])
+        return envelope
+
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0
+
+    def join(self, timeout=None):
+        """Espera a que la cola quede vacía (para comandos y pruebas)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue is not None and self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _work(self):
+        connection = None
+        idle = self._setting("EMAIL_CONNECTION_IDLE_SECONDS", 30)
+        batch_size = self._setting("EMAIL_BATCH_SIZE", 20)
+        while True:
+            try:
+                first = self._queue.get(timeout=idle)
+            except queue.Empty:
+                connection = self._close(connection)
+                continue
+            batch = [first]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection = self.deliver(batch, connection)
+            except Exception:
+                # Un error fuera de send_messages (p. ej. al abrir la conexión
+                # con una configuración inválida) no debe matar al hilo.
+                logger.exception("Error inesperado al enviar %d correos", len(batch))
+                connection = self._close(connection)
+                for envelope in batch:
+                    if not envelope.finished:
+                        metrics.inc("mail_failed_total")
+                        envelope.finish(False)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def deliver(self, envelopes, connection=None):
+        """Envía los mensajes por `connection` (o una nueva) y la devuelve abierta."""
+        pending = list(envelopes)
+        retries = self._setting("EMAIL_MAX_RETRIES", 3)
+        backoff = self._setting("EMAIL_RETRY_BACKOFF", 1.0)
+        attempt = 0
+        own_connection = connection is None and threading.current_thread() not in self._workers
+        while pending:
+            try:
+                if connection is None:
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                while pending:
+                    envelope = pending[0]
+                    try:
+                        connection.send_messages([envelope.message])
+                    except smtplib.SMTPException as exc:
+                        if not is_permanent(exc):
+                            raise
+                        logger.warning("Correo rechazado (%s): %s", exc, envelope.message.subject)
+                        metrics.inc("mail_failed_total")
+                        envelope.finish(False)
+                    except OSError:
+                        raise
+                    except Exception:
+                        # Mensaje inválido (p. ej. BadHeaderError por un salto de
+                        # línea en el asunto): se descarta solo ese correo.
+                        logger.exception("No se pudo enviar el correo: %r", envelope.message.subject)
+                        metrics.inc("mail_failed_total")
+                        envelope.finish(False)
+                    else:
+                        metrics.inc("mail_sent_total")
+                        envelope.finish(True)
+                    pending.pop(0)
+                    attempt = 0
+            except (smtplib.SMTPException, OSError):
+                connection = self._close(connection)
+                attempt += 1
+                if attempt > retries:
+                    logger.exception("No se pudieron enviar %d correos tras %d intentos", len(pending), attempt)
+                    metrics.inc("mail_failed_total", len(pending))
+                    for envelope in pending:
+                        envelope.finish(False)
+                    return None
+                metrics.inc("mail_retries_total")
+                time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        if own_connection:
+            return self._close(connection)
+        return connection
+
+    def _close(self, connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return None
+
+
+mail_queue = MailQueue()
+
+
+def _collect():
+    return [
+        ("mail_queue_depth", {}, mail_queue.depth()),
+        ("mail_queue_capacity", {}, getattr(settings, "EMAIL_QUEUE_SIZE", 1000)),
+    ]
+
+
+metrics.registry.register_collector(_collect)
@@ -0,0 +1,163 @@
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from sistema_buap_api import metrics, models
+
+
+def windows():
+    """Ventanas de recordatorio en horas, de mayor a menor (REMINDER_WINDOWS)."""
+    return sorted(getattr(settings, "REMINDER_WINDOWS", (24, 1)), reverse=True)
+
+
+def _ranges(now):
+    # Cada ventana cubre lo que empieza entre la siguiente ventana más corta y
+    # ella: con 24 y 1, (now+1h, now+24h] y (now, now+1h]. Así una reservación
+    # hecha con poca anticipación recibe solo el recordatorio que le toca.
+    hours = windows()
+    for index, window in enumerate(hours):
+        lower = hours[index + 1] if index + 1 < len(hours) else 0
+        yield window, now + timedelta(hours=lower), now + timedelta(hours=window)
+
+
+def _loan_due_time():
+    return time.fromisoformat(getattr(settings, "LOAN_DUE_TIME", "18:00"))
+
+
+def reservations_due(start, end):
+    """Reservaciones aprobadas que empiezan en (start, end], en hora local.
+
+    Un rango sobre (status, fecha, horaInicio): usa el índice
+    reservacion_status_inicio_idx y lee solo las filas de la ventana.
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    return (
+        models.Reservacion.objects.filter(
+            status=models.Reservacion.ReservacionStatus.APROBADO,
+            fecha__range=(start.date(), end.date()),
+        )
+        .filter(Q(fecha__gt=start.date()) | Q(horaInicio__gt=start.time()))
+        .filter(Q(fecha__lt=end.date()) | Q(horaInicio__lte=end.time()))
+        .order_by("fecha", "horaInicio", "pk")
+        .values("pk", "user_id", "fecha", "horaInicio", "horaFin", "lab__nombre")
+    )
+
+
+def loans_due(start, end):
+    """Préstamos aprobados cuya devolución (fechaDevolucion a LOAN_DUE_TIME) cae en (start, end]."""
+    due_time = _loan_due_time()
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    first = start.date() if due_time > start.time() else start.date() + timedelta(days=1)
+    last = end.date() if due_time <= end.time() else end.date() - timedelta(days=1)
+    return (
+        models.Prestamo.objects.filter(
+            status=models.Prestamo.PrestamoStatus.APROBADO,
+            fechaDevolucion__range=(first, last),
+        )
+        .order_by("fechaDevolucion", "pk")
+        .values("pk", "user_id", "cantidad", "fechaPrestamo", "fechaDevolucion", "equipo__nombre")
+    )
+
+
+def _reservation_notice(row, window):
+    return models.Notificacion(
+        user_id=row["user_id"],
+        tipo=models.Notificacion.Tipo.RESERVACION,
+        objetoId=row["pk"],
+        status=models.Reservacion.ReservacionStatus.APROBADO,
+        detalle={
+            "recordatorio": window,
+            "lab": row["lab__nombre"],
+            "fecha": row["fecha"].isoformat(),
+            "horaInicio": row["horaInicio"].strftime("%H:%M"),
+            "horaFin": row["horaFin"].strftime("%H:%M"),
+        },
+    )
+
+
+def _loan_notice(row, window):
+    return models.Notificacion(
+        user_id=row["user_id"],
+        tipo=models.Notificacion.Tipo.PRESTAMO,
+        objetoId=row["pk"],
+        status=models.Prestamo.PrestamoStatus.APROBADO,
+        detalle={
+            "recordatorio": window,
+            "equipo": row["equipo__nombre"],
+            "cantidad": row["cantidad"],
+            "fechaPrestamo": row["fechaPrestamo"].isoformat(),
+            "fechaDevolucion": row["fechaDevolucion"].isoformat(),
+        },
+    )
+
+
+def _schedule(tipo, window, rows, build, batch_size):
+    scheduled = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            scheduled += _schedule_batch(tipo, window, batch, build)
+            batch = []
+    if batch:
+        scheduled += _schedule_batch(tipo, window, batch, build)
+    return scheduled
+
+
+def _schedule_batch(tipo, window, rows, build, attempts=3):
+    ids = [row["pk"] for row in rows]
+    for _ in range(attempts):
+        try:
+            # atomic() abre un savepoint si ya hay una transacción: un choque
+            # solo revierte este lote.
+            with transaction.atomic():
+                sent = set(
+                    models.Recordatorio.objects.filter(tipo=tipo, ventana=window, objetoId__in=ids).values_list(
+                        "objetoId", flat=True
+                    )
+                )
+                pending = [row for row in rows if row["pk"] not in sent]
+                if not pending:
+                    return 0
+                models.Recordatorio.objects.bulk_create(
+                    [models.Recordatorio(tipo=tipo, objetoId=row["pk"], ventana=window) for row in pending]
+                )
+                models.Notificacion.objects.bulk_create([build(row, window) for row in pending])
+        except IntegrityError:
+            # Otro programador registró parte del lote entre la lectura y la
+            # inserción (recordatorio_unico): se relee `sent` y se reintenta.
+            # Si sigue chocando, el lote queda para la siguiente vuelta.
+            metrics.inc("reminders_conflicts_total", tipo=tipo, ventana=window)
+            continue
+        metrics.inc("reminders_scheduled_total", len(pending), tipo=tipo, ventana=window)
+        return len(pending)
+    return 0
+
+
+def schedule(now=None, batch_size=500):
+    """Programa en el outbox los recordatorios que vencen ahora.
+
+    Por cada ventana hace una consulta de rango por tipo, así que el costo
+    depende de cuántas reservaciones y préstamos caen en la ventana y no del
+    total de futuros. Regresa {(tipo, ventana): programados}.
+    """
+    now = now or timezone.now()
+    result = {}
+    for window, start, end in _ranges(now):
+        result[(models.Notificacion.Tipo.RESERVACION, window)] = _schedule(
+            models.Notificacion.Tipo.RESERVACION, window, reservations_due(start, end), _reservation_notice, batch_size
+        )
+        result[(models.Notificacion.Tipo.PRESTAMO, window)] = _schedule(
+            models.Notificacion.Tipo.PRESTAMO, window, loans_due(start, end), _loan_notice, batch_size
+        )
+    return result
+
+
+def purge(days):
+    """Borra el registro de recordatorios programados hace más de `days` días."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = models.Recordatorio.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
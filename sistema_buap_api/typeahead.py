@@ -0,0 +1,171 @@
+import bisect
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from sistema_buap_api import models
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(char for char in text if not unicodedata.combining(char)).lower().strip()
+
+
+class PrefixIndex:
+    """Índice de prefijos en memoria (lista ordenada + bisect) por proceso.
+
+    Cada entrada es (clave, tipo, id). Se indexa el valor completo de cada
+    campo y cada palabra, de modo que "digi" encuentra "Osciloscopio Digital".
+    """
+
+    SOURCES = {
+        "equipo": (models.Equipo, ("nombre", "numeroInventario")),
+        "lab": (models.Lab, ("nombre", "edificio")),
+    }
+
+    def __init__(self):
+        self._keys = []
+        self._keys_by_item = {}
+        self._payloads = {}
+        self._watermarks = {}
+        self._lock = threading.RLock()
+        # Solo un hilo a la vez reconstruye o refresca; ver maybe_refresh().
+        self._maintenance_lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+
+    @staticmethod
+    def _payload(kind, obj):
+        if kind == "equipo":
+            return {
+                "type": kind,
+                "id": obj.pk,
+                "nombre": obj.nombre,
+                "numeroInventario": obj.numeroInventario,
+                "lab": obj.lab_id,
+            }
+        return {"type": kind, "id": obj.pk, "nombre": obj.nombre, "edificio": obj.edificio}
+
+    @staticmethod
+    def _keys_for(kind, obj, fields):
+        keys = set()
+        for field in fields:
+            value = normalize(getattr(obj, field))
+            if not value:
+                continue
+            keys.add(value)
+            keys.update(word for word in value.split() if word)
+        return [(key, kind, obj.pk) for key in keys]
+
+    def _remove(self, item):
+        for entry in self._keys_by_item.pop(item, ()):
+            position = bisect.bisect_left(self._keys, entry)
+            if position < len(self._keys) and self._keys[position] == entry:
+                del self._keys[position]
+        self._payloads.pop(item, None)
+
+    def _add(self, kind, obj, fields):
+        item = (kind, obj.pk)
+        self._remove(item)
+        entries = self._keys_for(kind, obj, fields)
+        for entry in entries:
+            bisect.insort(self._keys, entry)
+        self._keys_by_item[item] = entries
+        self._payloads[item] = self._payload(kind, obj)
+
+    def rebuild(self):
+        keys = []
+        keys_by_item = {}
+        payloads = {}
+        watermarks = {}
+        for kind, (model, fields) in self.SOURCES.items():
+            latest = None
+            for obj in model.objects.all().order_by():
+                entries = self._keys_for(kind, obj, fields)
+                keys.extend(entries)
+                keys_by_item[(kind, obj.pk)] = entries
+                payloads[(kind, obj.pk)] = self._payload(kind, obj)
+                if latest is None or obj.updated_at > latest:
+                    latest = obj.updated_at
+            watermarks[kind] = latest
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._keys_by_item = keys_by_item
+            self._payloads = payloads
+            self._watermarks = watermarks
+            self._rebuilt_at = self._refreshed_at = time.monotonic()
+
+    def refresh(self):
+        """Aplica solo los registros con updated_at posterior a la última carga."""
+        for kind, (model, fields) in self.SOURCES.items():
+            watermark = self._watermarks.get(kind)
+            changed = model.objects.all().order_by("updated_at")
+            if watermark is not None:
+                # >= para no perder filas guardadas en el mismo instante que la marca.
+                changed = changed.filter(updated_at__gte=watermark)
+            changed = list(changed)
+            if not changed:
+                continue
+            with self._lock:
+                for obj in changed:
+                    self._add(kind, obj, fields)
+                self._watermarks[kind] = changed[-1].updated_at
+        self._refreshed_at = time.monotonic()
+
+    def discard(self, kind, pk):
+        with self._lock:
+            self._remove((kind, pk))
+
+    def _pending_work(self):
+        now = time.monotonic()
+        if not self._rebuilt_at or now - self._rebuilt_at >= getattr(settings, "TYPEAHEAD_REBUILD_SECONDS", 900):
+            # Las reconstrucciones completas también recogen borrados hechos en otros procesos.
+            return self.rebuild
+        if now - self._refreshed_at >= getattr(settings, "TYPEAHEAD_REFRESH_SECONDS", 5):
+            return self.refresh
+        return None
+
+    def maybe_refresh(self):
+        """Reconstruye o refresca el índice si toca, sin que varios hilos lo hagan a la vez.
+
+        Mientras un hilo actualiza, los demás responden con el índice que ya
+        hay. Solo la primera carga, sin nada que servir, hace esperar.
+        """
+        if self._pending_work() is None:
+            return
+        acquired = self._maintenance_lock.acquire(blocking=not self._rebuilt_at)
+        if not acquired:
+            return
+        try:
+            # Otro hilo pudo haber terminado mientras se esperaba el lock.
+            work = self._pending_work()
+            if work is not None:
+                work()
+        finally:
+            self._maintenance_lock.release()
+
+    def search(self, prefix, limit=10, kinds=None):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, (prefix,))
+            keys = self._keys
+            while position < len(keys) and len(results) < limit:
+                key, kind, pk = keys[position]
+                if not key.startswith(prefix):
+                    break
+                position += 1
+                if (kinds and kind not in kinds) or (kind, pk) in seen:
+                    continue
+                seen.add((kind, pk))
+                results.append(self._payloads[(kind, pk)])
+        return results
+
+
+index = PrefixIndex()
@@ -3,7 +3,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from sistema_buap_api.views import auth, bootstrap, equipment, labs, loans, reservations, reports, users
+from sistema_buap_api.views import auth, autocomplete, availability, bootstrap, equipment, files, labs, loans, metrics, reservations, reports, users
 
 router = DefaultRouter()
 router.register("users", users.UserViewSet, basename="user")
@@ -16,6 +16,8 @@ router.register("loans", loans.LoanViewSet, basename="loan")
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("bootstrap/version", bootstrap.VersionView.as_view()),
+    path("metrics", metrics.MetricsView.as_view(), name="metrics"),
+    path("files/<str:key>", files.FileDownloadView.as_view(), name="file_download"),
 
     path("api/auth/login/", auth.CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
@@ -26,5 +28,8 @@ urlpatterns = [
     path("api/reports/occupancy/", reports.OccupancyReportView.as_view(), name="report_occupancy"),
     path("api/reports/equipment-usage/",reports.EquipmentUsageReportView.as_view(), name="report_equipment_usage",),
     path("api/reports/incidents/",reports.IncidentReportView.as_view(), name="report_incidents",),
+    path("api/labs/<int:pk>/availability/", availability.LabAvailabilityView.as_view(), name="lab_availability"),
+    path("api/equipment/<int:pk>/availability/", availability.EquipmentAvailabilityView.as_view(), name="equipment_availability"),
+    path("api/autocomplete/", autocomplete.AutocompleteView.as_view(), name="autocomplete"),
     path("api/", include(router.urls)),
 ]
@@ -1,49 +1,59 @@
+from django.contrib.auth.models import update_last_login
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from sistema_buap_api import models, serializers
 
 
+USER_PAYLOAD_FIELDS = tuple(
+    field for field in serializers.UserSerializer.Meta.fields if field != "password"
+)
+
+
+def build_user_payload(user):
+    # Mismo contenido que UserSerializer(user).data, sin instanciar el serializer.
+    return {field: getattr(user, field) for field in USER_PAYLOAD_FIELDS}
+
+
+def build_login_payload(user, refresh):
+    access = str(refresh.access_token)
+    return {
+        "refresh": str(refresh),
+        "access": access,
+        "user": build_user_payload(user),
+        "token": access,
+        "role": user.role.lower(),
+    }
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = models.User.USERNAME_FIELD
 
+    def __init__(self, *args, **kwargs):
+        data = kwargs.get("data")
+        if data is not None and "username" in data and self.username_field not in data:
+            kwargs["data"] = {
+                self.username_field: data.get("username"),
+                "password": data.get("password"),
+            }
+        super().__init__(*args, **kwargs)
+
     def validate(self, attrs):
-        if 'username' in attrs and 'email' not in attrs:
-            attrs['email'] = attrs.pop('username')
-        return super().validate(attrs)
+        # El usuario autenticado se reutiliza para la respuesta: una sola consulta.
+        TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return build_login_payload(self.user, refresh)
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
-    def post(self, request, *args, **kwargs):
-        data = request.data.copy()
-        if 'username' in data and 'email' not in data:
-            data['email'] = data['username']
-        
-        request._full_data = data
-        
-        response = super().post(request, *args, **kwargs)
-        
-        if response.status_code == 200:
-            email = data.get('email') or data.get('username')
-            user = models.User.objects.filter(email=email).first()
-            
-            if user:
-                user_data = serializers.UserSerializer(user).data
-                response_data = response.data.copy() if isinstance(response.data, dict) else {}
-                response_data.update({
-                    'user': user_data,
-                    'token': response_data.get('access'),  
-                    'role': user.role.lower(),  
-                })
-                response.data = response_data
-        
-        return response
-
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
@@ -0,0 +1,25 @@
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from sistema_buap_api import typeahead
+
+
+class AutocompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        prefix = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), self.max_limit)
+        except ValueError as exc:
+            raise ValidationError({"limit": "Debe ser un entero."}) from exc
+        kinds = {kind for kind in request.query_params.get("types", "").split(",") if kind}
+        unknown = kinds - set(typeahead.PrefixIndex.SOURCES)
+        if unknown:
+            raise ValidationError({"types": f"Tipos inválidos: {', '.join(sorted(unknown))}."})
+
+        typeahead.index.maybe_refresh()
+        return Response(typeahead.index.search(prefix, limit=limit, kinds=kinds or None))
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from sistema_buap_api import availability
+from sistema_buap_api.async_views import AsyncAPIView
+
+
+def _parse(value, fmt, field, message):
+    try:
+        return datetime.strptime(value, fmt)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError({field: message}) from exc
+
+
+class LabAvailabilityView(AsyncAPIView):
+    """GET ?fecha=YYYY-MM-DD[&horaInicio=HH:MM&horaFin=HH:MM]"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request, pk):
+        params = request.query_params
+        fecha = _parse(params.get("fecha"), "%Y-%m-%d", "fecha", "Formato inválido. Use YYYY-MM-DD.").date()
+        horaInicio = horaFin = None
+        if params.get("horaInicio") or params.get("horaFin"):
+            horaInicio = _parse(params.get("horaInicio"), "%H:%M", "horaInicio", "Formato inválido. Use HH:MM.").time()
+            horaFin = _parse(params.get("horaFin"), "%H:%M", "horaFin", "Formato inválido. Use HH:MM.").time()
+            if horaInicio >= horaFin:
+                raise ValidationError("La hora de inicio debe ser menor que la hora de fin.")
+        return Response(await self.sync(availability.lab_availability, pk, fecha, horaInicio, horaFin))
+
+
+class EquipmentAvailabilityView(AsyncAPIView):
+    """GET ?cantidad=N"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request, pk):
+        try:
+            cantidad = int(request.query_params.get("cantidad", 1))
+        except ValueError as exc:
+            raise ValidationError({"cantidad": "Debe ser un entero."}) from exc
+        if cantidad <= 0:
+            raise ValidationError({"cantidad": "La cantidad debe ser mayor que cero."})
+        return Response(await self.sync(availability.equipment_availability, pk, cantidad))
@@ -1,18 +1,25 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, viewsets
+from rest_framework import permissions, viewsets
 
-from sistema_buap_api import models, permissions as custom_permissions, serializers
+from sistema_buap_api import mixins, models, permissions as custom_permissions, search, serializers
 
 
-class EquipmentViewSet(viewsets.ModelViewSet):
+class EquipmentViewSet(
+    mixins.ImageAttachmentMixin,
+    mixins.ExpandMixin,
+    mixins.SparseFieldsetMixin,
+    mixins.FastListMixin,
+    mixins.ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.Equipo.objects.select_related("lab").all().order_by("nombre")
     serializer_class = serializers.EquipoSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [search.FullTextSearchFilter, DjangoFilterBackend]
     search_fields = ["nombre", "numeroInventario"]
     filterset_fields = ["status", "lab"]
 
     def get_permissions(self):
-        if self.action in {"create", "update", "partial_update", "destroy"}:
+        if self.action in {"create", "update", "partial_update", "destroy"} | self.image_write_actions:
             permission_classes = [custom_permissions.IsAdminOrTech]
         else:
             permission_classes = [permissions.IsAuthenticated]
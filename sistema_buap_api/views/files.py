@@ -0,0 +1,48 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import quote_etag
+from django.views import View
+
+from sistema_buap_api.file_storage.file_system_storage import IMMUTABLE_CACHE, KEY_PATTERN, FileSystemStorage
+
+
+class FileDownloadView(View):
+    """Descarga de archivos del storage local (FILE_STORAGE_BACKEND=filesystem).
+
+    Con FILE_STORAGE_SENDFILE=nginx (X-Accel-Redirect) o apache (X-Sendfile)
+    el servidor web envía el archivo; si no, FileResponse lo pasa a
+    `wsgi.file_wrapper`, que en gunicorn usa sendfile sin copiarlo en Python.
+    """
+
+    def get(self, request, key, *args, **kwargs):
+        if not KEY_PATTERN.match(key):
+            raise Http404()
+        storage = FileSystemStorage()
+        path = storage.path(key)
+        if not os.path.isfile(path):
+            raise Http404()
+
+        etag = quote_etag(key.split(".", 1)[0])
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = self._file_response(path, key)
+        response["ETag"] = etag
+        response["Cache-Control"] = IMMUTABLE_CACHE
+        return response
+
+    def _file_response(self, path, key):
+        mode = getattr(settings, "FILE_STORAGE_SENDFILE", "")
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        if mode == "nginx":
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = settings.FILE_STORAGE_ACCEL_PREFIX + os.path.relpath(path, settings.FILE_STORAGE_ROOT)
+            return response
+        if mode == "apache":
+            response = HttpResponse(content_type=content_type)
+            response["X-Sendfile"] = path
+            return response
+        return FileResponse(open(path, "rb"), content_type=content_type)
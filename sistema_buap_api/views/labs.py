@@ -1,18 +1,24 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, viewsets
+from rest_framework import permissions, viewsets
 
-from sistema_buap_api import models, permissions as custom_permissions, serializers
+from sistema_buap_api import mixins, models, permissions as custom_permissions, search, serializers
 
 
-class LabViewSet(viewsets.ModelViewSet):
+class LabViewSet(
+    mixins.ImageAttachmentMixin,
+    mixins.SparseFieldsetMixin,
+    mixins.FastListMixin,
+    mixins.ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.Lab.objects.all().order_by("nombre")
     serializer_class = serializers.LabSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [search.FullTextSearchFilter, DjangoFilterBackend]
     search_fields = ["nombre", "edificio"]
     filterset_fields = ["status", "tipo"]
 
     def get_permissions(self):
-        if self.action in {"create", "update", "partial_update", "destroy"}:
+        if self.action in {"create", "update", "partial_update", "destroy"} | self.image_write_actions:
             permission_classes = [custom_permissions.IsAdminOrTech]
         else:
             permission_classes = [permissions.IsAuthenticated]
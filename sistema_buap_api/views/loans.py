@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
@@ -5,10 +6,16 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from sistema_buap_api import models, permissions as custom_permissions, serializers
+from sistema_buap_api import metrics, mixins, models, outbox, permissions as custom_permissions, serializers
 
 
-class LoanViewSet(viewsets.ModelViewSet):
+class LoanViewSet(
+    mixins.ExpandMixin,
+    mixins.SparseFieldsetMixin,
+    mixins.FastListMixin,
+    mixins.ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.Prestamo.objects.select_related("equipo", "user").all()
     serializer_class = serializers.PrestamoSerializer
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
@@ -63,6 +70,7 @@ class LoanViewSet(viewsets.ModelViewSet):
         if equipo.status != models.Equipo.EquipoStatus.DISPONIBLE:
             raise ValidationError({"equipo": "El equipo no está disponible."})
         if equipo.cantidadDisponible < cantidad:
+            metrics.inc("stock_shortfalls_total")
             raise ValidationError({"cantidad": "Cantidad solicitada supera disponibilidad."})
     
     def _ensure_pending(self, prestamo):
@@ -75,11 +83,16 @@ class LoanViewSet(viewsets.ModelViewSet):
         self._ensure_pending(prestamo)
         equipo = prestamo.equipo
         if equipo.cantidadDisponible < prestamo.cantidad:
+            metrics.inc("stock_shortfalls_total")
             raise ValidationError({"detail": "No hay unidades suficientes para aprobar."})
         equipo.cantidadDisponible -= prestamo.cantidad
-        equipo.save(update_fields=["cantidadDisponible", "updated_at"])
         prestamo.status = models.Prestamo.PrestamoStatus.APROBADO
-        prestamo.save(update_fields=["status", "updated_at"])
+        # Inventario, status y aviso al usuario en una sola transacción.
+        with transaction.atomic():
+            equipo.save(update_fields=["cantidadDisponible", "updated_at"])
+            prestamo.save(update_fields=["status", "updated_at"])
+            outbox.record_loan(prestamo)
+        metrics.inc("loans_approved_total")
         return Response(self.get_serializer(prestamo).data)
 
     @action(detail=True, methods=["post"], url_path="reject")
@@ -87,7 +100,9 @@ class LoanViewSet(viewsets.ModelViewSet):
         prestamo = self.get_object()
         self._ensure_pending(prestamo)
         prestamo.status = models.Prestamo.PrestamoStatus.RECHAZADO
-        prestamo.save(update_fields=["status", "updated_at"])
+        with transaction.atomic():
+            prestamo.save(update_fields=["status", "updated_at"])
+            outbox.record_loan(prestamo)
         return Response(self.get_serializer(prestamo).data)
     
     @action(detail=True, methods=["post"], url_path="return")
@@ -100,17 +115,19 @@ class LoanViewSet(viewsets.ModelViewSet):
         danado = bool(request.data.get("danado", False))
         prestamo.fechaEntrega = timezone.localdate()
         prestamo.danado = danado
-        if danado:
-            prestamo.status = models.Prestamo.PrestamoStatus.DANADO
-            prestamo.equipo.status = models.Equipo.EquipoStatus.MANTENIMIENTO
-            prestamo.equipo.save(update_fields=["status", "updated_at"])
-        else:
-            prestamo.status = models.Prestamo.PrestamoStatus.DEVUELTO
-            equipo = prestamo.equipo
-            equipo.cantidadDisponible = min(
-                equipo.cantidadTotal,
-                equipo.cantidadDisponible + prestamo.cantidad,
-            )
-            equipo.save(update_fields=["cantidadDisponible", "updated_at"])
-        prestamo.save(update_fields=["status", "fechaEntrega", "danado", "updated_at"])
+        with transaction.atomic():
+            if danado:
+                prestamo.status = models.Prestamo.PrestamoStatus.DANADO
+                prestamo.equipo.status = models.Equipo.EquipoStatus.MANTENIMIENTO
+                prestamo.equipo.save(update_fields=["status", "updated_at"])
+            else:
+                prestamo.status = models.Prestamo.PrestamoStatus.DEVUELTO
+                equipo = prestamo.equipo
+                equipo.cantidadDisponible = min(
+                    equipo.cantidadTotal,
+                    equipo.cantidadDisponible + prestamo.cantidad,
+                )
+                equipo.save(update_fields=["cantidadDisponible", "updated_at"])
+            prestamo.save(update_fields=["status", "fechaEntrega", "danado", "updated_at"])
+            outbox.record_loan(prestamo)
         return Response(self.get_serializer(prestamo).data)
\ No newline at end of file
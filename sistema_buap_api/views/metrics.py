@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from sistema_buap_api import metrics
+
+
+class MetricsView(View):
+    """Exposición en formato de texto de Prometheus.
+
+    Requiere `Authorization: Bearer <METRICS_TOKEN>`. Sin METRICS_TOKEN solo
+    responde con DEBUG activo; en producción el endpoint no existe (404).
+    """
+
+    def get(self, request, *args, **kwargs):
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if not token:
+            if not settings.DEBUG:
+                return HttpResponse(status=404)
+        elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=401)
+        return HttpResponse(metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -5,94 +5,105 @@ from django.db.models import Count
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
 from sistema_buap_api import models, permissions as custom_permissions
+from sistema_buap_api.async_views import AsyncAPIView
 
 
-class BaseReportView(APIView):
+class BaseReportView(AsyncAPIView):
     permission_classes = [custom_permissions.IsAdminOrTech]
 
 
-class OccupancyReportView(BaseReportView):
-    def get(self, request, *args, **kwargs):
-        # Filtros de query params
-        date_from = request.query_params.get("date_from")
-        date_to = request.query_params.get("date_to")
-        lab_id = request.query_params.get("lab")
-        status = request.query_params.get("status")
-        
-        reservaciones = models.Reservacion.objects.filter(
-            status=models.Reservacion.ReservacionStatus.APROBADO
-        )
-        
-        if date_from:
-            reservaciones = reservaciones.filter(fecha__gte=date_from)
-        if date_to:
-            reservaciones = reservaciones.filter(fecha__lte=date_to)
-        if lab_id:
-            reservaciones = reservaciones.filter(lab_id=lab_id)
-        if status:
-            reservaciones = reservaciones.filter(status=status)
+def occupancy_data(params):
+    # Filtros de query params
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    lab_id = params.get("lab")
+    status = params.get("status")
+    
+    reservaciones = models.Reservacion.objects.filter(
+        status=models.Reservacion.ReservacionStatus.APROBADO
+    ).select_related("lab")
+    
+    if date_from:
+        reservaciones = reservaciones.filter(fecha__gte=date_from)
+    if date_to:
+        reservaciones = reservaciones.filter(fecha__lte=date_to)
+    if lab_id:
+        reservaciones = reservaciones.filter(lab_id=lab_id)
+    if status:
+        reservaciones = reservaciones.filter(status=status)
+    
+    data = []
+    for reserva in reservaciones:
+        hora_inicio = datetime.combine(datetime.min, reserva.horaInicio)
+        hora_fin = datetime.combine(datetime.min, reserva.horaFin)
+        delta = hora_fin - hora_inicio
+        horas_reservadas = delta.total_seconds() / 3600
         
-        data = []
-        for reserva in reservaciones:
-            hora_inicio = datetime.combine(datetime.min, reserva.horaInicio)
-            hora_fin = datetime.combine(datetime.min, reserva.horaFin)
-            delta = hora_fin - hora_inicio
-            horas_reservadas = delta.total_seconds() / 3600
-            
-            data.append({
-                "labId": reserva.lab.id,
-                "nombreLab": reserva.lab.nombre,  
-                "fecha": reserva.fecha.strftime("%Y-%m-%d"),
-                "horasReservadas": round(horas_reservadas, 2),
-                "estadoReserva": reserva.status
-            })
-        
-        return Response(data)
+        data.append({
+            "labId": reserva.lab.id,
+            "nombreLab": reserva.lab.nombre,  
+            "fecha": reserva.fecha.strftime("%Y-%m-%d"),
+            "horasReservadas": round(horas_reservadas, 2),
+            "estadoReserva": reserva.status
+        })
+    return data
+
+
+def equipment_usage_data(start_date, end_date):
+    loans = models.Prestamo.objects.filter(
+        status__in=[
+            models.Prestamo.PrestamoStatus.APROBADO,
+            models.Prestamo.PrestamoStatus.DEVUELTO,
+            models.Prestamo.PrestamoStatus.DANADO,
+        ],
+        fechaPrestamo__range=(start_date, end_date),
+    )
+    aggregated = loans.values("equipo_id", "equipo__nombre").annotate(prestamos_totales=Count("id"))
+    return [
+        {
+            "equipo_id": item["equipo_id"],
+            "equipo_name": item["equipo__nombre"],
+            "prestamos_totales": item["prestamos_totales"],
+        }
+        for item in aggregated
+    ]
+
+
+def incident_data(fechaInicio, fechaFin):
+    incidentes = models.Prestamo.objects.filter(
+        status=models.Prestamo.PrestamoStatus.DANADO,
+        fechaEntrega__range=(fechaInicio, fechaFin),
+    ).select_related("equipo")
+    return [
+        {
+            "loan_id": loan.id,
+            "nombre": loan.equipo.nombre,
+            "tipo_dano": "DANADO" if loan.danado else "DEVUELTO",
+            "reported_at": loan.updated_at.isoformat(),
+        }
+        for loan in incidentes
+    ]
+
+
+# Las consultas corren en el pool de hilos (ver AsyncAPIView): bajo ASGI un
+# reporte lento no ocupa un worker mientras espera a la base.
+class OccupancyReportView(BaseReportView):
+    async def get(self, request, *args, **kwargs):
+        return Response(await self.sync(occupancy_data, request.query_params))
 
 
 class EquipmentUsageReportView(BaseReportView):
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         start_date, end_date = _parse_date_range(request)
-        loans = models.Prestamo.objects.filter(
-            status__in=[
-                models.Prestamo.PrestamoStatus.APROBADO,
-                models.Prestamo.PrestamoStatus.DEVUELTO,
-                models.Prestamo.PrestamoStatus.DANADO,
-            ],
-            fechaPrestamo__range=(start_date, end_date),
-        )
-        aggregated = loans.values("equipo_id", "equipo__nombre").annotate(prestamos_totales=Count("id"))
-        data = [
-            {
-                "equipo_id": item["equipo_id"],
-                "equipo_name": item["equipo__nombre"],
-                "prestamos_totales": item["prestamos_totales"],
-            }
-            for item in aggregated
-        ]
-        return Response(data)
+        return Response(await self.sync(equipment_usage_data, start_date, end_date))
 
 
 class IncidentReportView(BaseReportView):
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         fechaInicio, fechaFin = _parse_date_range(request)
-        incidentes = models.Prestamo.objects.filter(
-            status=models.Prestamo.PrestamoStatus.DANADO,
-            fechaEntrega__range=(fechaInicio, fechaFin),
-        ).select_related("equipo")
-        data = [
-            {
-                "loan_id": loan.id,
-                "nombre": loan.equipo.nombre,
-                "tipo_dano": "DANADO" if loan.danado else "DEVUELTO",
-                "reported_at": loan.updated_at.isoformat(),
-            }
-            for loan in incidentes
-        ]
-        return Response(data)
+        return Response(await self.sync(incident_data, fechaInicio, fechaFin))
 
 
 def _parse_period(period: str | None):
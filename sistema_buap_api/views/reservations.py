@@ -1,20 +1,26 @@
 from datetime import datetime
 
-from django.db.models import Q
+from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from sistema_buap_api import models, permissions as custom_permissions, serializers
+from sistema_buap_api import availability, metrics, mixins, models, outbox, permissions as custom_permissions, search, serializers
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(
+    mixins.ExpandMixin,
+    mixins.SparseFieldsetMixin,
+    mixins.FastListMixin,
+    mixins.ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.Reservacion.objects.select_related("lab", "user").all()
     serializer_class = serializers.ReservacionSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [search.FullTextSearchFilter, DjangoFilterBackend]
     filterset_fields = ["status", "lab", "user", "fecha"]
     search_fields = ["motivo"]
 
@@ -92,25 +98,19 @@ class ReservationViewSet(viewsets.ModelViewSet):
             raise ValidationError({"lab": "El laboratorio no está disponible."})
         if fecha < timezone.localdate():
             raise ValidationError({"fecha": "No se puede reservar con fecha pasada."})
-        overlaps = models.Reservacion.objects.filter(
-            lab=lab,
-            fecha=fecha,
-            status__in=[
-                models.Reservacion.ReservacionStatus.PENDIENTE,
-                models.Reservacion.ReservacionStatus.APROBADO,
-            ],
-        )
-        if instance is not None:
-            overlaps = overlaps.exclude(pk=instance.pk)
-        overlaps = overlaps.filter(
-            Q(horaInicio__lt=horaFin) & Q(horaFin__gt=horaInicio)
+        overlaps = availability.overlapping_reservations(
+            lab, fecha, horaInicio, horaFin, exclude_pk=instance.pk if instance is not None else None
         )
         if overlaps.exists():
+            metrics.inc("reservation_overlaps_rejected_total")
             raise ValidationError("El laboratorio ya está reservado en ese horario.")
 
-    def _set_status(self, reservacion, status_value):
+    def _set_status(self, reservacion, status_value, update_fields=("status", "updated_at")):
+        # El aviso al usuario se escribe en la misma transacción que el cambio.
         reservacion.status = status_value
-        reservacion.save(update_fields=["status", "updated_at"])
+        with transaction.atomic():
+            reservacion.save(update_fields=list(update_fields))
+            outbox.record_reservation(reservacion)
         return reservacion
 
     @action(detail=True, methods=["post"])
@@ -137,7 +137,10 @@ class ReservationViewSet(viewsets.ModelViewSet):
         reservacion.motivo = motivo
         razonCancelacion = request.data.get("razonCancelacion", "")
         reservacion.razonCancelacion = razonCancelacion
-        self._set_status(reservacion, models.Reservacion.ReservacionStatus.CANCELADO)
-        reservacion.save(update_fields=["motivo", "razonCancelacion", "status", "updated_at"])
+        self._set_status(
+            reservacion,
+            models.Reservacion.ReservacionStatus.CANCELADO,
+            update_fields=("motivo", "razonCancelacion", "status", "updated_at"),
+        )
         serializer = self.get_serializer(reservacion)
         return Response(serializer.data)
\ No newline at end of file
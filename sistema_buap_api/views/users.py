@@ -1,18 +1,21 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import parsers, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from sistema_buap_api import models, permissions as custom_permissions, serializers
+from sistema_buap_api import mixins, models, parsers as custom_parsers, permissions as custom_permissions, search, serializers
+from sistema_buap_api.roster_import import RosterImport
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(mixins.SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = models.User.objects.all().order_by("id")
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [search.FullTextSearchFilter, DjangoFilterBackend]
     search_fields = ["first_name", "last_name", "email", "matricula", "departamento", "carrera"]
     filterset_fields = ["role"]
 
     def get_permissions(self):
-        if self.action in {"list", "retrieve", "create", "update", "partial_update", "destroy"}:
+        if self.action in {"list", "retrieve", "create", "update", "partial_update", "destroy", "import_roster"}:
             permission_classes = [custom_permissions.IsAdmin]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -21,7 +24,7 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             return serializers.UserRegistrationSerializer
-        return serializers.UserSerializer
+        return serializers.UserContactSerializer
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -29,3 +32,31 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({"detail": "No puedes eliminar tu propio usuario."}, status=status.HTTP_400_BAD_REQUEST)
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[parsers.MultiPartParser, custom_parsers.FastJSONParser],
+    )
+    def import_roster(self, request):
+        dry_run = str(request.query_params.get("dry_run", "")).lower() in {"1", "true"}
+        archivo = request.FILES.get("file")
+        try:
+            if archivo is not None:
+                file_format = request.data.get("format") or RosterImport.format_from_name(archivo.name)
+                rows = RosterImport.parse(archivo.read(), file_format)
+            elif isinstance(request.data, list):
+                rows = request.data
+            else:
+                rows = request.data.get("users")
+        except ValueError as exc:
+            raise ValidationError({"file": str(exc)}) from exc
+        if not isinstance(rows, list):
+            raise ValidationError({"detail": "Envíe un archivo CSV/JSON o una lista de usuarios."})
+
+        # Sin pool de procesos dentro de un worker web con hilos; los rosters
+        # grandes van por `manage.py import_roster --workers N`.
+        report = RosterImport(workers=1, dry_run=dry_run).run(rows)
+        response_status = status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED
+        return Response(report, status=response_status)